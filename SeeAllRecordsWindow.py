@@ -1,11 +1,21 @@
 import sys
 import sqlite3
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QLabel, QComboBox, QTextEdit, QPushButton,
-    QMessageBox, QHBoxLayout, QLineEdit
+    QApplication, QWidget, QVBoxLayout, QLabel, QComboBox, QTableView, QPushButton,
+    QMessageBox, QHBoxLayout, QLineEdit, QAbstractItemView, QProgressBar
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
+
+from categories import category_id
+from db import get_connection
+from money import parse_money, to_paise
+from records_model import ALL_MODULES, DATE_COLUMN, RecordsModel
+from schema import entry_content_hash
+from workers import TaskRunner
+
+SEARCH_DEBOUNCE_MS = 200
+QUERY_TIMEOUT = 30
 
 
 class SeeAllRecordsWindow(QWidget):
@@ -43,7 +53,7 @@ class SeeAllRecordsWindow(QWidget):
         top_layout.addWidget(module_label)
 
         self.module_combo = QComboBox()
-        self.module_combo.addItems(["capital", "income", "expenses", "assets", "liabilities"])
+        self.module_combo.addItems(["capital", "income", "expenses", "assets", "liabilities", ALL_MODULES])
         self.module_combo.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 8px; font-size: 14px;")
         self.module_combo.setFixedWidth(180)
         self.module_combo.currentIndexChanged.connect(self.on_filters_changed)
@@ -56,18 +66,39 @@ class SeeAllRecordsWindow(QWidget):
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Enter search text")
         self.search_input.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 6px; font-size: 14px;")
-        self.search_input.textChanged.connect(self.on_filters_changed)
+        # Searching waits for a pause in typing instead of querying per keystroke
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.fetch_records)
+        self.search_input.textChanged.connect(self.search_timer.start)
         top_layout.addWidget(self.search_input)
 
         top_layout.addStretch()
         main_layout.addLayout(top_layout)
 
-        # Records display
-        self.records_display = QTextEdit()
-        self.records_display.setReadOnly(True)
-        self.records_display.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 8px; font-size: 14px;")
+        # Records display; rows are loaded page by page as the view scrolls
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumHeight(8)
+        self.progress_bar.setTextVisible(False)
+        self.query_runner = TaskRunner(self, self.progress_bar, QUERY_TIMEOUT)
+        self.records_model = RecordsModel(self.query_runner, self)
+        self.records_model.error.connect(self.show_fetch_error)
+        self.records_view = QTableView()
+        self.records_view.setModel(self.records_model)
+        self.records_view.setFont(QFont("Segoe UI", 11))
+        self.records_view.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; font-size: 14px;")
+        self.records_view.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.records_view.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.records_view.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.records_view.verticalHeader().setVisible(False)
+        self.records_view.horizontalHeader().setStretchLastSection(True)
+        self.records_view.horizontalHeader().setSortIndicator(DATE_COLUMN, Qt.DescendingOrder)
+        self.records_view.setSortingEnabled(True)
+        self.records_view.clicked.connect(self.select_record)
         main_layout.addWidget(QLabel("Records:"))
-        main_layout.addWidget(self.records_display)
+        main_layout.addWidget(self.records_view)
+        main_layout.addWidget(self.progress_bar)
 
         control_layout = QHBoxLayout()
         control_layout.addWidget(QLabel("Entry ID:"))
@@ -123,10 +154,20 @@ class SeeAllRecordsWindow(QWidget):
 
         self.fetch_records()
 
+    def reset(self):
+        # The window is reused; reopening it shows the current records.
+        self.search_timer.stop()
+        self.search_input.blockSignals(True)
+        self.search_input.clear()
+        self.search_input.blockSignals(False)
+        self.entry_id_input.clear()
+        self.fetch_records()
+
     def go_back(self):
         self.close()
 
     def on_filters_changed(self):
+        self.search_timer.stop()
         self.fetch_records()
 
     def fetch_records(self):
@@ -135,63 +176,30 @@ class SeeAllRecordsWindow(QWidget):
         if not self.store_id:
             QMessageBox.warning(self, "Error", "No store selected.")
             return
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-
-            table_columns = {
-                "expenses": ("id, date, amount, category", ["ID", "Date", "Amount", "Category"]),
-                "assets": ("id, date, asset_name, value, category", ["ID", "Date", "Asset Name", "Value", "Category"]),
-                "liabilities": ("id, date, liability_name, amount, category", ["ID", "Date", "Liability Name", "Amount", "Category"]),
-                "capital": ("id, date, amount, description", ["ID", "Date", "Amount", "Description"]),
-                "income": ("id, date, amount, description", ["ID", "Date", "Amount", "Description"])
-            }
-            columns_str, headers = table_columns[module]
-
-            # Build SQL with optional search filter on textual columns
-            base_query = f"SELECT {columns_str} FROM {module} WHERE store_id=?"
-            params = [self.store_id]
-
-            # Determine which columns are searchable (date is not searched)
-            search_columns = []
-            if module in ("expenses"):
-                search_columns = ["category"]
-            elif module in ("assets"):
-                search_columns = ["asset_name", "category"]
-            elif module in ("liabilities"):
-                search_columns = ["liability_name", "category"]
-            elif module in ("capital", "income"):
-                search_columns = ["description"]
-            # If search text is present, construct WHERE search conditions joined by OR
-            if search_text:
-                search_conditions = " OR ".join([f"{col} LIKE ?" for col in search_columns])
-                base_query += f" AND ({search_conditions})"
-                params.extend([f"%{search_text}%"] * len(search_columns))
-
-            c.execute(base_query, params)
-            results = c.fetchall()
-            conn.close()
-
-            if not results:
-                self.records_display.setText("No records found for the selected module.")
-                return
-
-            display_text = ""
-            for row in results:
-                for label, item in zip(headers, row):
-                    display_text += f"{label}: {item if item else ''}\n"
-                display_text += "-" * 30 + "\n"
-            self.records_display.setFont(QFont("Segoe UI", 11))
-            self.records_display.setText(display_text)
-
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Database Error", f"Failed to fetch records: {e}")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"An unexpected error occurred: {e}")
+        if module != self.records_model.table:
+            # Column positions differ per module, so switching modules goes
+            # back to the default newest-first order.
+            header = self.records_view.horizontalHeader()
+            header.blockSignals(True)
+            header.setSortIndicator(DATE_COLUMN, Qt.DescendingOrder)
+            header.blockSignals(False)
+            # Searching every module lists the best matches first
+            header.setSortIndicatorShown(module != ALL_MODULES)
+            self.search_input.setPlaceholderText(
+                "Search every module" if module == ALL_MODULES else "Enter search text")
+        self.records_model.load(module, self.store_id, search_text)
+
+    def show_fetch_error(self, error):
+        QMessageBox.warning(self, "Database Error", f"Failed to fetch records: {error}")
+
+    def select_record(self, index):
+        self.entry_id_input.setText(str(self.records_model.entry_id(index.row())))
 
     def edit_entry(self):
         module = self.module_combo.currentText()
+        if module == ALL_MODULES:
+            QMessageBox.warning(self, "Select Module", "Please select the entry's module to edit it.")
+            return
         entry_id = self.entry_id_input.text().strip()
         new_amount = self.amount_input.text().strip()
         new_description = self.description_input.text().strip()
@@ -207,44 +215,53 @@ class SeeAllRecordsWindow(QWidget):
             return
 
         try:
-            new_amount_f = float(new_amount)
+            new_amount_f = parse_money(new_amount)
             if new_amount_f < 0:
                 raise ValueError("Amount cannot be negative")
+            new_paise = to_paise(new_amount_f)
         except ValueError:
             QMessageBox.warning(self, "Invalid Input", "Please enter a valid positive number for amount/value.")
             return
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-
-            if module == "expenses":
-                c.execute("UPDATE expenses SET amount=?, category=? WHERE id=? AND store_id=?", 
-                          (new_amount_f, new_description, entry_id, self.store_id))
-            elif module == "assets":
-                c.execute("UPDATE assets SET value=?, asset_name=?, category=? WHERE id=? AND store_id=?", 
-                          (new_amount_f, new_description, new_description, entry_id, self.store_id))
-            elif module == "liabilities":
-                c.execute("UPDATE liabilities SET amount=?, liability_name=?, category=? WHERE id=? AND store_id=?", 
-                          (new_amount_f, new_description, new_description, entry_id, self.store_id))
-            else:
-                c.execute(f"UPDATE {module} SET amount=?, description=? WHERE id=? AND store_id=?", 
-                          (new_amount_f, new_description, entry_id, self.store_id))
+        # An expense's text is its category, which must be one already on the
+        # list; categories are added in the Categories window, not by typos.
+        if module == "expenses":
+            try:
+                new_category_id = category_id(module, new_description)
+            except ValueError as e:
+                QMessageBox.warning(self, "Unknown Category", f"{e}. Add it under Categories first.")
+                return
 
+        try:
+            conn = get_connection()
+            with conn:
+                c = conn.cursor()
+                if module == "expenses":
+                    changes = {"amount": new_paise, "category_id": new_category_id}
+                elif module == "assets":
+                    changes = {"value": new_paise, "asset_name": new_description}
+                elif module == "liabilities":
+                    changes = {"amount": new_paise, "liability_name": new_description}
+                else:
+                    changes = {"amount": new_paise, "description": new_description}
+                changes["content_hash"] = entry_content_hash(conn, module, entry_id, changes)
+                assignments = ", ".join(f"{column}=?" for column in changes)
+                c.execute(f"UPDATE {module} SET {assignments} WHERE id=? AND store_id=?",
+                          (*changes.values(), entry_id, self.store_id))
             if c.rowcount == 0:
                 QMessageBox.warning(self, "Not Found", "Entry ID not found or does not belong to current store.")
             else:
-                conn.commit()
                 QMessageBox.information(self, "Updated", "Entry updated successfully.")
                 self.fetch_records()
-            conn.close()
 
         except sqlite3.Error as e:
             QMessageBox.warning(self, "Error", f"Failed to update entry: {e}")
 
     def delete_entry(self):
         module = self.module_combo.currentText()
+        if module == ALL_MODULES:
+            QMessageBox.warning(self, "Select Module", "Please select the entry's module to delete it.")
+            return
         entry_id = self.entry_id_input.text().strip()
 
         if not entry_id:
@@ -262,18 +279,14 @@ class SeeAllRecordsWindow(QWidget):
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             try:
-                conn = sqlite3.connect('database.db')
-                c = conn.cursor()
-                c.execute("PRAGMA foreign_keys = ON")
-
-                c.execute(f"DELETE FROM {module} WHERE id=? AND store_id=?", (entry_id, self.store_id))
+                conn = get_connection()
+                with conn:
+                    c = conn.execute(f"DELETE FROM {module} WHERE id=? AND store_id=?", (entry_id, self.store_id))
                 if c.rowcount == 0:
                     QMessageBox.warning(self, "Not Found", "Entry ID not found or does not belong to current store.")
                 else:
-                    conn.commit()
                     QMessageBox.information(self, "Deleted", "Entry deleted successfully.")
                     self.fetch_records()
-                conn.close()
             except sqlite3.Error as e:
                 QMessageBox.warning(self, "Error", f"Failed to delete entry: {e}")
 
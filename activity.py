@@ -0,0 +1,123 @@
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QProgressBar
+)
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt
+
+from journal import FEED_PAGE_SIZE, journal_page
+from schema import ensure_schema
+from workers import TaskRunner
+
+QUERY_TIMEOUT = 30
+
+
+def load_activity_page(store_id, user_id, after, token):
+    return journal_page(store_id, user_id, limit=FEED_PAGE_SIZE, after=after)
+
+
+class ActivityWindow(QWidget):
+    def __init__(self, store_id=None, user_id=None):
+        super().__init__()
+        self.store_id = store_id
+        self.user_id = user_id
+        self.cursor = None
+        self.setWindowTitle("Activity")
+        self.setGeometry(500, 200, 700, 600)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setStyleSheet("background-color: #f0f4f7;")
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        back_layout = QHBoxLayout()
+        back_button = QPushButton("Back")
+        back_button.setFont(QFont("Segoe UI", 10))
+        back_button.setStyleSheet("background-color: #3498db; color: white; border-radius: 3px; padding: 2px 8px;")
+        back_button.clicked.connect(self.go_back)
+        back_layout.addWidget(back_button)
+        back_layout.addStretch()
+        layout.addLayout(back_layout)
+
+        title = QLabel("Activity")
+        title.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        layout.addWidget(title)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels(["Date", "Module", "Amount/Value", "Details"])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setStyleSheet("background-color: white; font-size: 13px;")
+        layout.addWidget(self.table)
+
+        self.more_button = QPushButton("Load More")
+        self.more_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.more_button.setStyleSheet("""
+            QPushButton {
+                background-color: #2980b9;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #3498db;
+            }
+        """)
+        self.more_button.clicked.connect(self.load_more)
+        layout.addWidget(self.more_button, alignment=Qt.AlignCenter)
+
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        self.page_runner = TaskRunner(self, self.progress_bar, timeout=QUERY_TIMEOUT)
+        self.load_first_page()
+
+    def go_back(self):
+        self.close()
+
+    def reset(self):
+        # The window is reused; reopening it starts again from the newest entry.
+        self.load_first_page()
+
+    def load_first_page(self):
+        if self.store_id is None:
+            QMessageBox.warning(self, "Error", "No store selected.")
+            return
+        self.table.setRowCount(0)
+        self.cursor = None
+        self.request_page()
+
+    def load_more(self):
+        if self.cursor is not None:
+            self.request_page()
+
+    def request_page(self):
+        self.more_button.setEnabled(False)
+        self.page_runner.run(load_activity_page, self.store_id, self.user_id, self.cursor,
+                             on_result=self.page_loaded, on_error=self.page_failed)
+
+    def page_loaded(self, page):
+        entries, self.cursor = page
+        for entry in entries:
+            row = self.table.rowCount()
+            self.table.insertRow(row)
+            value = "" if entry.value is None else f"₹{entry.value:.2f}"
+            for column, text in enumerate([entry.date or "", entry.module.capitalize(), value, entry.label or ""]):
+                self.table.setItem(row, column, QTableWidgetItem(text))
+        self.more_button.setEnabled(self.cursor is not None)
+        self.more_button.setText("Load More" if self.cursor is not None else "No more entries")
+
+    def page_failed(self, error):
+        self.more_button.setEnabled(self.cursor is not None)
+        QMessageBox.warning(self, "Database Error", f"Failed to load activity: {error}")
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    ensure_schema()
+    window = ActivityWindow(store_id=1)
+    window.show()
+    sys.exit(app.exec_())
@@ -1,12 +1,44 @@
 import sys
-import sqlite3
+import datetime
 from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QProgressBar,
+    QComboBox, QDateEdit
 )
 from PyQt5.QtGui import QFont, QPainter
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QDate
 from PyQt5.QtChart import QChart, QChartView, QBarSeries, QBarSet, QValueAxis, QBarCategoryAxis, QPieSeries
 
+from db import get_connection
+from reports import horizon_range, monthly_series
+from summary import load_summary
+from workers import TaskRunner
+
+QUERY_TIMEOUT = 30
+
+# (label, number of months ending with the current one, or a special range)
+HORIZONS = [
+    ("Last 3 Months", 3),
+    ("Last 6 Months", 6),
+    ("Last 12 Months", 12),
+    ("Last 24 Months", 24),
+    ("Last 36 Months", 36),
+    ("Year to Date", "ytd"),
+    ("Custom Range", "custom"),
+]
+DEFAULT_HORIZON = 1
+
+
+def load_analytics_data(store_id, start, end, token):
+    # Runs on a pool thread: the summary for the pie chart and the monthly
+    # income/expense series for the bar chart, both from the reports engine.
+    conn = get_connection()
+    summary = load_summary(store_id, conn=conn)
+    token.check()
+    series = monthly_series(store_id, start, end, conn)
+    # The bars only need rupees to chart precision.
+    return (summary, series.labels, [paise / 100 for paise in series.income],
+            [paise / 100 for paise in series.expenses])
+
 
 class AnalyticsWindow(QWidget):
     def __init__(self, store_id=None):
@@ -37,6 +69,30 @@ class AnalyticsWindow(QWidget):
         back_btn.clicked.connect(self.go_back)
         header_layout.addWidget(back_btn)
         header_layout.addStretch()
+
+        # Trend range selection
+        range_label = QLabel("Range:")
+        range_label.setFont(QFont("Segoe UI", 11))
+        header_layout.addWidget(range_label)
+
+        self.horizon_combo = QComboBox()
+        for label, horizon in HORIZONS:
+            self.horizon_combo.addItem(label, horizon)
+        self.horizon_combo.setCurrentIndex(DEFAULT_HORIZON)
+        self.horizon_combo.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 6px; font-size: 13px;")
+        self.horizon_combo.currentIndexChanged.connect(self.horizon_changed)
+        header_layout.addWidget(self.horizon_combo)
+
+        today = QDate.currentDate()
+        self.start_month = QDateEdit(today.addMonths(-11))
+        self.end_month = QDateEdit(today)
+        for month_edit in (self.start_month, self.end_month):
+            month_edit.setDisplayFormat("MMM yyyy")
+            month_edit.setCalendarPopup(True)
+            month_edit.dateChanged.connect(self.load_analytics)
+            month_edit.hide()
+        header_layout.addWidget(self.start_month)
+        header_layout.addWidget(self.end_month)
         layout.addLayout(header_layout)
 
         title = QLabel("Financial Analytics")
@@ -56,6 +112,12 @@ class AnalyticsWindow(QWidget):
         self.bar_chart_view.setMinimumHeight(300)
         layout.addWidget(self.bar_chart_view)
 
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setMaximumHeight(8)
+        self.progress_bar.setTextVisible(False)
+        layout.addWidget(self.progress_bar)
+        self.query_runner = TaskRunner(self, self.progress_bar, QUERY_TIMEOUT)
+
         # Refresh Button
         refresh_btn = QPushButton("Refresh Analytics")
         refresh_btn.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -75,97 +137,87 @@ class AnalyticsWindow(QWidget):
 
         self.load_analytics()
 
+    def reset(self):
+        # The window is reused; reopening it reloads the charts.
+        self.load_analytics()
+
     def go_back(self):
         self.close()
 
+    def horizon_changed(self):
+        custom = self.horizon_combo.currentData() == "custom"
+        self.start_month.setVisible(custom)
+        self.end_month.setVisible(custom)
+        self.load_analytics()
+
+    def selected_range(self):
+        horizon = self.horizon_combo.currentData()
+        if horizon != "custom":
+            return horizon_range(horizon, datetime.date.today())
+        start = (self.start_month.date().year(), self.start_month.date().month())
+        end = (self.end_month.date().year(), self.end_month.date().month())
+        return min(start, end), max(start, end)
+
     def load_analytics(self):
         if not self.store_id:
             QMessageBox.warning(self, "Error", "No store selected.")
             return
-
-        try:
-            conn = sqlite3.connect("database.db")
-            c = conn.cursor()
-
-            # Pie Chart Data: Summary of totals
-            c.execute("SELECT SUM(amount) FROM income WHERE store_id=?", (self.store_id,))
-            income = c.fetchone()[0] or 0
-            c.execute("SELECT SUM(amount) FROM expenses WHERE store_id=?", (self.store_id,))
-            expenses = c.fetchone()[0] or 0
-            c.execute("SELECT SUM(value) FROM assets WHERE store_id=?", (self.store_id,))
-            assets = c.fetchone()[0] or 0
-            c.execute("SELECT SUM(amount) FROM liabilities WHERE store_id=?", (self.store_id,))
-            liabilities = c.fetchone()[0] or 0
-
-            pie_series = QPieSeries()
-            if income > 0:
-                pie_series.append("Income", income)
-            if expenses > 0:
-                pie_series.append("Expenses", expenses)
-            if assets > 0:
-                pie_series.append("Assets", assets)
-            if liabilities > 0:
-                pie_series.append("Liabilities", liabilities)
-
-            pie_chart = QChart()
-            pie_chart.addSeries(pie_series)
-            pie_chart.setTitle("Financial Summary")
-            pie_chart.legend().setAlignment(Qt.AlignBottom)
-            self.pie_chart_view.setChart(pie_chart)
-
-            # Bar Chart: Monthly income and expenses for past 6 months
-            import datetime
-            from dateutil.relativedelta import relativedelta
-            today = datetime.date.today()
-            categories = []
-            income_set = QBarSet("Income")
-            expenses_set = QBarSet("Expenses")
-
-            for i in range(5, -1, -1):
-                month = today - relativedelta(months=i)
-                categories.append(month.strftime("%b %Y"))
-                month_start = month.replace(day=1).strftime("%Y-%m-%d")
-                next_month = month + relativedelta(months=1)
-                month_end = next_month.replace(day=1).strftime("%Y-%m-%d")
-
-                c.execute("SELECT SUM(amount) FROM income WHERE store_id=? AND date >= ? AND date < ?",
-                          (self.store_id, month_start, month_end))
-                monthly_income = c.fetchone()[0] or 0
-                income_set.append(monthly_income)
-
-                c.execute("SELECT SUM(amount) FROM expenses WHERE store_id=? AND date >= ? AND date < ?",
-                          (self.store_id, month_start, month_end))
-                monthly_expenses = c.fetchone()[0] or 0
-                expenses_set.append(monthly_expenses)
-
-            bar_series = QBarSeries()
-            bar_series.append(income_set)
-            bar_series.append(expenses_set)
-
-            bar_chart = QChart()
-            bar_chart.addSeries(bar_series)
-            bar_chart.setTitle("Monthly Income vs Expenses (Last 6 Months)")
-            bar_chart.setAnimationOptions(QChart.SeriesAnimations)
-
-            axis_x = QBarCategoryAxis()
-            axis_x.append(categories)
-            bar_chart.addAxis(axis_x, Qt.AlignBottom)
-            bar_series.attachAxis(axis_x)
-
-            axis_y = QValueAxis()
-            axis_y.setRange(0, max(max(income_set), max(expenses_set), 1000))
-            bar_chart.addAxis(axis_y, Qt.AlignLeft)
-            bar_series.attachAxis(axis_y)
-
-            bar_chart.legend().setVisible(True)
-            bar_chart.legend().setAlignment(Qt.AlignBottom)
-
-            self.bar_chart_view.setChart(bar_chart)
-            conn.close()
-
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed loading analytics: {e}")
-
+        start, end = self.selected_range()
+        self.query_runner.run(load_analytics_data, self.store_id, start, end,
+                              on_result=self.show_analytics, on_error=self.analytics_failed)
+
+    def analytics_failed(self, error):
+        QMessageBox.warning(self, "Error", f"Failed loading analytics: {error}")
+
+    def show_analytics(self, data):
+        summary, labels, income, expenses = data
+
+        # Pie Chart Data: Summary of totals
+        pie_series = QPieSeries()
+        if summary.income > 0:
+            pie_series.append("Income", summary.income)
+        if summary.expenses > 0:
+            pie_series.append("Expenses", summary.expenses)
+        if summary.assets > 0:
+            pie_series.append("Assets", summary.assets)
+        if summary.liabilities > 0:
+            pie_series.append("Liabilities", summary.liabilities)
+
+        pie_chart = QChart()
+        pie_chart.addSeries(pie_series)
+        pie_chart.setTitle("Financial Summary")
+        pie_chart.legend().setAlignment(Qt.AlignBottom)
+        self.pie_chart_view.setChart(pie_chart)
+
+        # Bar Chart: Monthly income and expenses for past 6 months
+        income_set = QBarSet("Income")
+        expenses_set = QBarSet("Expenses")
+        income_set.append(income)
+        expenses_set.append(expenses)
+
+        bar_series = QBarSeries()
+        bar_series.append(income_set)
+        bar_series.append(expenses_set)
+
+        bar_chart = QChart()
+        bar_chart.addSeries(bar_series)
+        bar_chart.setTitle(f"Monthly Income vs Expenses ({labels[0]} - {labels[-1]})")
+        bar_chart.setAnimationOptions(QChart.SeriesAnimations)
+
+        axis_x = QBarCategoryAxis()
+        axis_x.append(labels)
+        bar_chart.addAxis(axis_x, Qt.AlignBottom)
+        bar_series.attachAxis(axis_x)
+
+        axis_y = QValueAxis()
+        axis_y.setRange(0, max(max(income), max(expenses), 1000))
+        bar_chart.addAxis(axis_y, Qt.AlignLeft)
+        bar_series.attachAxis(axis_y)
+
+        bar_chart.legend().setVisible(True)
+        bar_chart.legend().setAlignment(Qt.AlignBottom)
+
+        self.bar_chart_view.setChart(bar_chart)
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
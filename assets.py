@@ -1,36 +1,27 @@
 import sys
-import sqlite3
+import functools
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QDateEdit, QComboBox
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QDate
 
+from batch_entry import BatchEntryWindow
+from form import EntryFormMixin
+from money import parse_money
+from schema import ensure_schema
+from window_manager import get_window_manager
+
+
+class AssetsWindow(EntryFormMixin, QWidget):
+    category_module = "assets"
+    saved_message = "Asset entry saved successfully!"
 
-class AssetsWindow(QWidget):
     def __init__(self, store_id=None):
         super().__init__()
         self.store_id = store_id
         self.setWindowTitle("Assets Module")
         self.setGeometry(500, 200, 500, 450)
         self.setup_ui()
-        self.create_table_if_not_exists()
-
-    def create_table_if_not_exists(self):
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("PRAGMA foreign_keys = ON")
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS assets (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                asset_name TEXT,
-                value REAL,
-                category TEXT,
-                store_id INTEGER,
-                FOREIGN KEY(store_id) REFERENCES stores(id)
-            )
-        """)
-        conn.commit()
-        conn.close()
+        self.connect_writer()
 
     def setup_ui(self):
         self.setStyleSheet("background-color: #f0f4f7;")
@@ -85,7 +76,7 @@ class AssetsWindow(QWidget):
 
         self.category_combo = QComboBox(self)
         self.category_combo.setFont(QFont("Segoe UI", 12))
-        self.category_combo.addItems(["Property", "Vehicle", "Machinery", "Investments", "Other"])
+        self.load_categories()
         self.category_combo.move(180, 230)
         self.category_combo.resize(220, 30)
 
@@ -106,6 +97,26 @@ class AssetsWindow(QWidget):
         self.submit_button.resize(100, 35)
         self.submit_button.clicked.connect(self.save_data)
 
+        self.batch_button = QPushButton("Batch Entry", self)
+        self.batch_button.setFont(QFont("Segoe UI", 11))
+        self.batch_button.setStyleSheet("background-color: #7f8c8d; color: white; border-radius: 5px; padding: 8px;")
+        self.batch_button.move(310, 280)
+        self.batch_button.resize(110, 35)
+        self.batch_button.clicked.connect(self.open_batch)
+
+        self.status_label = QLabel("", self)
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        self.status_label.move(70, 325)
+        self.status_label.resize(360, 30)
+
+    def open_batch(self):
+        get_window_manager().show("batch_assets", functools.partial(BatchEntryWindow, "assets"), self.store_id)
+
+    def clear_inputs(self):
+        self.date_input.setDate(QDate.currentDate())
+        self.name_input.clear()
+        self.value_input.clear()
+
     def go_back(self):
         self.close()  # Close the current window, returning to Dashboard
 
@@ -119,7 +130,7 @@ class AssetsWindow(QWidget):
             QMessageBox.warning(self, "Incomplete", "Please enter all fields.")
             return
         try:
-            value = float(value)
+            value = parse_money(value)
             if value < 0:
                 raise ValueError("Value cannot be negative")
         except ValueError:
@@ -130,24 +141,14 @@ class AssetsWindow(QWidget):
             QMessageBox.warning(self, "Error", "No store selected.")
             return
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("INSERT INTO assets (date, asset_name, value, category, store_id) VALUES (?, ?, ?, ?, ?)",
-                      (date, asset_name, value, category, self.store_id))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Success", "Asset entry saved successfully!")
-            self.date_input.setDate(QDate.currentDate())
-            self.name_input.clear()
-            self.value_input.clear()
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to save entry: {e}")
+        self.submit_entry("assets", {
+            "date": date, "asset_name": asset_name, "value": value, "category": category, "store_id": self.store_id,
+        }, f"{date}, {asset_name}, ₹{value:.2f}")
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    ensure_schema()
     window = AssetsWindow(store_id=1)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,370 @@
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QMessageBox, QTableWidget,
+    QTableWidgetItem, QHeaderView, QAbstractItemView, QAbstractItemDelegate, QStyledItemDelegate,
+    QLineEdit, QCompleter, QShortcut
+)
+from PyQt5.QtGui import QFont, QColor, QKeySequence
+from PyQt5.QtCore import QDate, QEvent, Qt, pyqtSlot
+
+from categories import category_names
+from entry_writer import get_writer
+from importer import parse_date
+from money import parse_money
+from schema import ensure_schema
+
+# Blank rows the grid starts with; moving onto the last row adds another.
+BATCH_ROWS = 10
+
+# Grid columns of each module as (field, header, kind). Date, money and name
+# cells are required; text cells may be left empty.
+BATCH_COLUMNS = {
+    'income': [('date', "Date", 'date'), ('amount', "Amount", 'money'), ('category', "Category", 'category')],
+    'expenses': [('date', "Date", 'date'), ('amount', "Amount", 'money'), ('category', "Category", 'category')],
+    'capital': [('date', "Date", 'date'), ('amount', "Amount", 'money'), ('description', "Description", 'text')],
+    'assets': [('date', "Date", 'date'), ('asset_name', "Asset Name", 'name'), ('value', "Value", 'money'),
+               ('category', "Category", 'category')],
+    'liabilities': [('date', "Date", 'date'), ('liability_name', "Liability Name", 'name'),
+                    ('amount', "Amount", 'money'), ('category', "Category", 'category')],
+}
+
+BATCH_TITLES = {
+    'income': "Batch Income Entry",
+    'expenses': "Batch Expense Entry",
+    'capital': "Batch Capital Entry",
+    'assets': "Batch Asset Entry",
+    'liabilities': "Batch Liability Entry",
+}
+
+VALUE_ROLE = Qt.UserRole
+ERROR_ROLE = Qt.UserRole + 1
+ERROR_COLOR = QColor("#fadbd8")
+
+
+def parse_cell(kind, text, categories=()):
+    text = text.strip()
+    if not text:
+        if kind == 'text':
+            return None
+        if kind == 'category':
+            raise ValueError("Choose a category")
+        raise ValueError("Required")
+    if kind == 'date':
+        return parse_date(text)
+    if kind == 'money':
+        try:
+            value = parse_money(text)
+        except ValueError:
+            raise ValueError("Enter a number") from None
+        if value < 0:
+            raise ValueError("Cannot be negative")
+        return value
+    if kind == 'category':
+        # A unique prefix is enough, so "ele" is read as "Electricity".
+        lowered = text.casefold()
+        exact = [choice for choice in categories if choice.casefold() == lowered]
+        matches = exact or [choice for choice in categories if choice.casefold().startswith(lowered)]
+        if len(matches) != 1:
+            raise ValueError(f"Choose one of: {', '.join(categories)}")
+        return matches[0]
+    return text
+
+
+class BatchDelegate(QStyledItemDelegate):
+    # Enter commits the cell and moves to the next one, as Tab does, and
+    # category cells complete as they are typed, so a batch can be keyed
+    # without touching the mouse.
+    def __init__(self, categories, category_columns, parent=None):
+        super().__init__(parent)
+        self.categories = categories
+        self.category_columns = category_columns
+
+    def createEditor(self, parent, option, index):
+        editor = super().createEditor(parent, option, index)
+        if index.column() in self.category_columns and isinstance(editor, QLineEdit):
+            completer = QCompleter(self.categories, editor)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            completer.setCompletionMode(QCompleter.InlineCompletion)
+            editor.setCompleter(completer)
+        return editor
+
+    def eventFilter(self, editor, event):
+        if (event.type() == QEvent.KeyPress and event.key() in (Qt.Key_Return, Qt.Key_Enter)
+                and not event.modifiers() & Qt.ControlModifier):
+            self.commitData.emit(editor)
+            self.closeEditor.emit(editor, QAbstractItemDelegate.EditNextItem)
+            return True
+        return super().eventFilter(editor, event)
+
+
+class BatchGrid(QTableWidget):
+    def keyPressEvent(self, event):
+        # Enter on a cell that is not being edited moves on as well.
+        if event.key() in (Qt.Key_Return, Qt.Key_Enter) and not event.modifiers():
+            index = self.moveCursor(QAbstractItemView.MoveNext, Qt.NoModifier)
+            if index.isValid():
+                self.setCurrentIndex(index)
+                self.edit(index)
+            return
+        super().keyPressEvent(event)
+
+
+class BatchEntryWindow(QWidget):
+    def __init__(self, table, store_id=None):
+        super().__init__()
+        self.table_name = table
+        self.store_id = store_id
+        self.columns = BATCH_COLUMNS[table]
+        self.categories = category_names(table)
+        self.pending_ticket = None
+        self.pending_count = 0
+        self.setWindowTitle(BATCH_TITLES[table])
+        self.setGeometry(450, 150, 700, 520)
+        self.setup_ui()
+        writer = get_writer()
+        writer.saved.connect(self.batch_saved)
+        writer.failed.connect(self.batch_failed)
+
+    def setup_ui(self):
+        self.setStyleSheet("background-color: #f0f4f7;")
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        back_layout = QHBoxLayout()
+        back_button = QPushButton("Back")
+        back_button.setFont(QFont("Segoe UI", 10))
+        back_button.setStyleSheet("background-color: #3498db; color: white; border-radius: 3px; padding: 2px 8px;")
+        back_button.clicked.connect(self.go_back)
+        back_layout.addWidget(back_button)
+        back_layout.addStretch()
+        layout.addLayout(back_layout)
+
+        title = QLabel(BATCH_TITLES[self.table_name])
+        title.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        layout.addWidget(title)
+
+        hint = QLabel("Enter or Tab: next cell    Ctrl+D: copy from above    "
+                      "Ctrl+Delete: remove row    Ctrl+S: save all")
+        hint.setFont(QFont("Segoe UI", 9))
+        hint.setStyleSheet("color: #7f8c8d;")
+        layout.addWidget(hint)
+
+        self.table = BatchGrid(0, len(self.columns))
+        self.table.setHorizontalHeaderLabels([header for _, header, _ in self.columns])
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.table.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.AnyKeyPressed | QAbstractItemView.EditKeyPressed
+                                   | QAbstractItemView.DoubleClicked | QAbstractItemView.SelectedClicked)
+        self.table.setStyleSheet("background-color: white; font-size: 14px;")
+        category_columns = {column for column, (_, _, kind) in enumerate(self.columns) if kind == 'category'}
+        self.table.setItemDelegate(BatchDelegate(self.categories, category_columns, self.table))
+        self.table.itemChanged.connect(self.cell_changed)
+        self.table.currentCellChanged.connect(self.current_cell_changed)
+        layout.addWidget(self.table)
+
+        button_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        button_layout.addWidget(self.status_label)
+        button_layout.addStretch()
+        self.save_button = QPushButton("Save All")
+        self.save_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.save_button.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #2ecc71;
+            }
+        """)
+        self.save_button.setMinimumSize(110, 35)
+        self.save_button.clicked.connect(self.save_batch)
+        button_layout.addWidget(self.save_button)
+        layout.addLayout(button_layout)
+
+        for keys in ("Ctrl+S", "Ctrl+Return", "Ctrl+Enter"):
+            QShortcut(QKeySequence(keys), self, self.save_batch)
+        QShortcut(QKeySequence("Ctrl+Delete"), self, self.remove_current_row)
+        QShortcut(QKeySequence("Ctrl+D"), self, self.copy_from_above)
+
+        self.reset_grid(QDate.currentDate().toString("yyyy-MM-dd"))
+
+    def reset(self):
+        # The window is reused; reopening it starts a fresh batch unless the
+        # last one is still being saved. The category list is shared with the
+        # delegate, so it is refilled in place.
+        self.categories[:] = category_names(self.table_name)
+        if self.pending_ticket is None:
+            self.reset_grid(QDate.currentDate().toString("yyyy-MM-dd"))
+
+    def go_back(self):
+        self.close()
+
+    def reset_grid(self, default_date):
+        self.default_date = default_date
+        self.table.setRowCount(0)
+        for _ in range(BATCH_ROWS):
+            self.add_row()
+        self.table.setCurrentCell(0, 1)
+        self.table.setFocus()
+        self.update_status()
+
+    def add_row(self):
+        row = self.table.rowCount()
+        # New rows take the date of the row above, since a day's entries
+        # usually share one.
+        date = self.default_date
+        if row:
+            date = self.table.item(row - 1, 0).data(VALUE_ROLE) or date
+        self.table.blockSignals(True)
+        self.table.insertRow(row)
+        for column, (_, _, kind) in enumerate(self.columns):
+            self.table.setItem(row, column, QTableWidgetItem(date if kind == 'date' else ""))
+        self.table.item(row, 0).setData(VALUE_ROLE, date)
+        self.table.blockSignals(False)
+
+    def row_is_blank(self, row):
+        return all(not self.table.item(row, column).text().strip()
+                   for column, (_, _, kind) in enumerate(self.columns) if kind != 'date')
+
+    def validate_row(self, row):
+        blank = self.row_is_blank(row)
+        self.table.blockSignals(True)
+        for column, (_, _, kind) in enumerate(self.columns):
+            item = self.table.item(row, column)
+            value, error = None, None
+            try:
+                value = parse_cell(kind, item.text(), self.categories)
+            except ValueError as e:
+                error = str(e)
+            if kind in ('date', 'category') and value is not None and value != item.text():
+                item.setText(value)
+            item.setData(VALUE_ROLE, value)
+            # Cells of an untouched row are not flagged, only skipped.
+            error = None if blank else error
+            item.setData(ERROR_ROLE, error)
+            item.setBackground(ERROR_COLOR if error else QColor("white"))
+            item.setToolTip(error or "")
+        self.table.blockSignals(False)
+
+    def row_errors(self, row):
+        return [column for column in range(len(self.columns))
+                if self.table.item(row, column).data(ERROR_ROLE)]
+
+    def update_status(self, text=None, error=False):
+        if text is None:
+            ready = invalid = 0
+            for row in range(self.table.rowCount()):
+                if self.row_is_blank(row):
+                    continue
+                if self.row_errors(row):
+                    invalid += 1
+                else:
+                    ready += 1
+            text = f"{ready} ready to save"
+            if invalid:
+                text += f", {invalid} with errors"
+                error = True
+        self.status_label.setText(text)
+        self.status_label.setStyleSheet(f"color: {'#c0392b' if error else '#2c3e50'};")
+
+    def cell_changed(self, item):
+        self.validate_row(item.row())
+        self.update_status()
+
+    def current_cell_changed(self, row, column, previous_row, previous_column):
+        if row == self.table.rowCount() - 1:
+            self.add_row()
+
+    def remove_current_row(self):
+        row = self.table.currentRow()
+        if row < 0:
+            return
+        self.table.removeRow(row)
+        if self.table.rowCount() == 0:
+            self.add_row()
+        self.update_status()
+
+    def copy_from_above(self):
+        row, column = self.table.currentRow(), self.table.currentColumn()
+        if row > 0 and column >= 0:
+            self.table.item(row, column).setText(self.table.item(row - 1, column).text())
+
+    def collect_rows(self):
+        rows = []
+        for row in range(self.table.rowCount()):
+            if self.row_is_blank(row):
+                continue
+            self.validate_row(row)
+            errors = self.row_errors(row)
+            if errors:
+                return None, (row, errors[0])
+            values = {field: self.table.item(row, column).data(VALUE_ROLE)
+                      for column, (field, _, _) in enumerate(self.columns)}
+            values["store_id"] = self.store_id
+            rows.append(values)
+        return rows, None
+
+    def save_batch(self):
+        # Moving focus off an open editor commits what was typed into it.
+        self.table.setFocus()
+        if self.pending_ticket is not None:
+            return
+        if not self.store_id:
+            QMessageBox.warning(self, "Error", "No store selected.")
+            return
+
+        rows, first_error = self.collect_rows()
+        if first_error is not None:
+            self.table.setCurrentCell(*first_error)
+            self.update_status("Fix the highlighted cells before saving.", error=True)
+            return
+        if not rows:
+            self.update_status("Nothing to save yet.")
+            return
+
+        # The whole batch is one writer ticket, saved in a single transaction:
+        # either every row is stored or none is.
+        try:
+            self.pending_ticket = get_writer().submit_many(self.table_name, rows)
+        except ValueError as e:
+            # A category was renamed or removed since the list was loaded.
+            # Reloading it flags the cells that still use the old name.
+            self.categories[:] = category_names(self.table_name)
+            for row in range(self.table.rowCount()):
+                self.validate_row(row)
+            self.update_status(f"Nothing was saved: {e}", error=True)
+            return
+        self.pending_count = len(rows)
+        self.last_date = rows[-1]["date"]
+        self.save_button.setEnabled(False)
+        self.update_status(f"Saving {len(rows)} entries...")
+
+    @pyqtSlot(int, str, int)
+    def batch_saved(self, ticket, table, entry_id):
+        if ticket != self.pending_ticket:
+            return
+        self.pending_ticket = None
+        self.save_button.setEnabled(True)
+        count = self.pending_count
+        self.reset_grid(self.last_date)
+        self.update_status(f"Saved {count} entries.")
+
+    @pyqtSlot(int, str, str)
+    def batch_failed(self, ticket, table, error):
+        if ticket != self.pending_ticket:
+            return
+        self.pending_ticket = None
+        self.save_button.setEnabled(True)
+        self.update_status(f"Nothing was saved: {error}", error=True)
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    ensure_schema()
+    window = BatchEntryWindow('expenses', store_id=1)
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,62 @@
+import threading
+import time
+
+# SQLite calls the progress handler every this many virtual machine
+# instructions; a cancelled or overdue query stops at the next call.
+PROGRESS_HANDLER_INTERVAL = 1000
+
+
+class Cancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self, timeout=None):
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.on_progress = None
+        self._cancelled = False
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def should_stop(self):
+        return self._cancelled or self.expired
+
+    def bind(self, conn):
+        # While bound, the connection checks the token as it runs, so a
+        # cancelled or overdue query stops partway instead of running to
+        # completion.
+        with self._lock:
+            self._conn = conn
+        conn.set_progress_handler(self._progress_handler, PROGRESS_HANDLER_INTERVAL)
+
+    def unbind(self):
+        with self._lock:
+            conn, self._conn = self._conn, None
+        if conn is not None:
+            conn.set_progress_handler(None, 0)
+
+    def _progress_handler(self):
+        return 1 if self.should_stop() else 0
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+
+    def check(self):
+        if self.should_stop():
+            raise Cancelled()
+
+    def report(self, done, total):
+        if self.on_progress is not None:
+            self.on_progress(done, total)
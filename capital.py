@@ -1,34 +1,25 @@
 import sys
-import sqlite3
+import functools
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QDateEdit
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QDate
 
-class CapitalWindow(QWidget):
+from batch_entry import BatchEntryWindow
+from form import EntryFormMixin
+from money import parse_money
+from schema import ensure_schema
+from window_manager import get_window_manager
+
+class CapitalWindow(EntryFormMixin, QWidget):
+    saved_message = "Capital entry saved successfully!"
+
     def __init__(self, store_id=None):
         super().__init__()
         self.store_id = store_id
         self.setWindowTitle("Capital Module")
         self.setGeometry(500, 200, 500, 400)
         self.setup_ui()
-        self.create_table_if_not_exists()
-
-    def create_table_if_not_exists(self):
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("PRAGMA foreign_keys = ON")
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS capital (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                amount REAL,
-                description TEXT,
-                store_id INTEGER,
-                FOREIGN KEY(store_id) REFERENCES stores(id)
-            )
-        """)
-        conn.commit()
-        conn.close()
+        self.connect_writer()
 
     def setup_ui(self):
         self.setStyleSheet("background-color: #f0f4f7;")
@@ -94,6 +85,26 @@ class CapitalWindow(QWidget):
         self.submit_button.resize(100, 35)
         self.submit_button.clicked.connect(self.save_data)
 
+        self.batch_button = QPushButton("Batch Entry", self)
+        self.batch_button.setFont(QFont("Segoe UI", 11))
+        self.batch_button.setStyleSheet("background-color: #7f8c8d; color: white; border-radius: 5px; padding: 8px;")
+        self.batch_button.move(310, 240)
+        self.batch_button.resize(110, 35)
+        self.batch_button.clicked.connect(self.open_batch)
+
+        self.status_label = QLabel("", self)
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        self.status_label.move(70, 285)
+        self.status_label.resize(360, 30)
+
+    def open_batch(self):
+        get_window_manager().show("batch_capital", functools.partial(BatchEntryWindow, "capital"), self.store_id)
+
+    def clear_inputs(self):
+        self.date_input.setDate(QDate.currentDate())
+        self.amount_input.clear()
+        self.desc_input.clear()
+
     def go_back(self):
         self.close()  # Close the current window, returning to Dashboard
 
@@ -106,7 +117,7 @@ class CapitalWindow(QWidget):
             QMessageBox.warning(self, "Incomplete", "Please enter amount.")
             return
         try:
-            amount = float(amount)
+            amount = parse_money(amount)
             if amount < 0:
                 raise ValueError("Amount cannot be negative")
         except ValueError:
@@ -117,23 +128,13 @@ class CapitalWindow(QWidget):
             QMessageBox.warning(self, "Error", "No store selected.")
             return
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("INSERT INTO capital (date, amount, description, store_id) VALUES (?, ?, ?, ?)",
-                      (date, amount, description, self.store_id))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Success", "Capital entry saved successfully!")
-            self.date_input.setDate(QDate.currentDate())
-            self.amount_input.clear()
-            self.desc_input.clear()
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to save entry: {e}")
+        self.submit_entry("capital", {
+            "date": date, "amount": amount, "description": description, "store_id": self.store_id,
+        }, f"{date}, ₹{amount:.2f}, {description}")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    ensure_schema()
     window = CapitalWindow(store_id=1)
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
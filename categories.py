@@ -0,0 +1,124 @@
+import threading
+from collections import namedtuple
+
+from db import get_connection
+from schema import CATEGORY_COLUMNS, transaction
+
+# The category lists of every module, read from the categories table once and
+# kept in memory. Changes made through this module reload them; nothing here
+# imports PyQt.
+
+Category = namedtuple('Category', 'id module name')
+
+# (categories in list order, {id: name}, {(module, casefolded name): id}),
+# or None until first used.
+_index = None
+_lock = threading.Lock()
+
+
+def _load(conn=None):
+    global _index
+    conn = conn or get_connection()
+    categories = [Category(*row) for row in conn.execute("SELECT id, module, name FROM categories ORDER BY id")]
+    index = (categories,
+             {category.id: category.name for category in categories},
+             {(category.module, category.name.casefold()): category.id for category in categories})
+    with _lock:
+        _index = index
+    return index
+
+
+def _current():
+    index = _index
+    return index if index is not None else _load()
+
+
+def invalidate():
+    global _index
+    with _lock:
+        _index = None
+
+
+def module_categories(module):
+    return [category for category in _current()[0] if category.module == module]
+
+
+def category_names(module):
+    return [category.name for category in module_categories(module)]
+
+
+def category_id(module, name):
+    # Matches names ignoring case, as the table does; raises ValueError for a
+    # name the module does not have.
+    try:
+        return _current()[2][(module, name.strip().casefold())]
+    except KeyError:
+        raise ValueError(f"Unknown {module} category '{name}'") from None
+
+
+def category_name(category_id):
+    return _current()[1].get(category_id)
+
+
+def ensure_category(module, name, conn):
+    # The id of ``name``, adding it to the module's list first if needed.
+    # Runs in the caller's transaction, so an import or edit that is rolled
+    # back leaves no new category behind. The cached lists are not touched:
+    # a reload before the commit would cache them without the new names, so
+    # the caller calls invalidate() once its transaction is committed.
+    name = name.strip()
+    conn.execute("INSERT OR IGNORE INTO categories (module, name) VALUES (?, ?)", (module, name))
+    row = conn.execute("SELECT id FROM categories WHERE module = ? AND name = ?", (module, name)).fetchone()
+    return row[0]
+
+
+def _check_name(module, name, conn):
+    name = name.strip()
+    if not name:
+        raise ValueError("Category name cannot be empty.")
+    if CATEGORY_COLUMNS.get(module) is None:
+        raise ValueError(f"{module.capitalize()} entries have no categories.")
+    if conn.execute("SELECT 1 FROM categories WHERE module = ? AND name = ?", (module, name)).fetchone():
+        raise ValueError(f"'{name}' is already a {module} category.")
+    return name
+
+
+def add_category(module, name, conn=None):
+    conn = conn or get_connection()
+    with transaction(conn):
+        name = _check_name(module, name, conn)
+        c = conn.execute("INSERT INTO categories (module, name) VALUES (?, ?)", (module, name))
+    _load(conn)
+    return c.lastrowid
+
+
+def rename_category(category_id, name, conn=None):
+    conn = conn or get_connection()
+    with transaction(conn):
+        row = conn.execute("SELECT module, name FROM categories WHERE id = ?", (category_id,)).fetchone()
+        if row is None:
+            raise ValueError("Category not found.")
+        module, old_name = row
+        if name.strip().casefold() != old_name.casefold():
+            name = _check_name(module, name, conn)
+        conn.execute("UPDATE categories SET name = ? WHERE id = ?", (name.strip(), category_id))
+        # Touching the entries fires their update triggers, which re-index
+        # them for search, relabel them in the journal and move the cached
+        # summaries on to a new version.
+        conn.execute(f"UPDATE {module} SET category_id = category_id WHERE category_id = ?", (category_id,))
+    _load(conn)
+
+
+def remove_category(category_id, conn=None):
+    # Only a category no entry uses can be removed.
+    conn = conn or get_connection()
+    with transaction(conn):
+        row = conn.execute("SELECT module FROM categories WHERE id = ?", (category_id,)).fetchone()
+        if row is None:
+            raise ValueError("Category not found.")
+        module = row[0]
+        used = conn.execute(f"SELECT COUNT(*) FROM {module} WHERE category_id = ?", (category_id,)).fetchone()[0]
+        if used:
+            raise ValueError(f"The category is used by {used} {module} entries; rename it instead.")
+        conn.execute("DELETE FROM categories WHERE id = ?", (category_id,))
+    _load(conn)
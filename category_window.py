@@ -0,0 +1,151 @@
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox, QLineEdit,
+    QListWidget, QListWidgetItem, QMessageBox
+)
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt
+
+from categories import add_category, module_categories, remove_category, rename_category
+from schema import CATEGORY_COLUMNS, ensure_schema
+
+CATEGORY_MODULES = [module for module, column in CATEGORY_COLUMNS.items() if column]
+
+
+class CategoryWindow(QWidget):
+    # Category lists are kept per module and shared by every store.
+    def __init__(self, store_id=None):
+        super().__init__()
+        self.store_id = store_id
+        self.setWindowTitle("Categories")
+        self.setGeometry(500, 200, 450, 500)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setStyleSheet("background-color: #f0f4f7;")
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        back_layout = QHBoxLayout()
+        back_button = QPushButton("Back")
+        back_button.setFont(QFont("Segoe UI", 10))
+        back_button.setStyleSheet("background-color: #3498db; color: white; border-radius: 3px; padding: 2px 8px;")
+        back_button.clicked.connect(self.go_back)
+        back_layout.addWidget(back_button)
+        back_layout.addStretch()
+        layout.addLayout(back_layout)
+
+        title = QLabel("Categories")
+        title.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        layout.addWidget(title)
+
+        self.module_combo = QComboBox()
+        self.module_combo.setFont(QFont("Segoe UI", 12))
+        for module in CATEGORY_MODULES:
+            self.module_combo.addItem(module.capitalize(), module)
+        self.module_combo.currentIndexChanged.connect(lambda: self.load_categories())
+        layout.addWidget(self.module_combo)
+
+        self.category_list = QListWidget()
+        self.category_list.setStyleSheet("background-color: white; font-size: 14px;")
+        self.category_list.currentItemChanged.connect(self.category_selected)
+        layout.addWidget(self.category_list)
+
+        self.name_input = QLineEdit()
+        self.name_input.setFont(QFont("Segoe UI", 12))
+        self.name_input.setPlaceholderText("Category name")
+        self.name_input.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 6px; font-size: 14px;")
+        layout.addWidget(self.name_input)
+
+        button_layout = QHBoxLayout()
+        for text, callback, color in [("Add", self.add_clicked, "#27ae60"),
+                                      ("Rename", self.rename_clicked, "#2980b9"),
+                                      ("Remove", self.remove_clicked, "#c0392b")]:
+            button = QPushButton(text)
+            button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+            button.setStyleSheet(f"background-color: {color}; color: white; border-radius: 5px; padding: 8px;")
+            button.clicked.connect(callback)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+        self.load_categories()
+
+    def go_back(self):
+        self.close()
+
+    def reset(self):
+        self.name_input.clear()
+        self.load_categories()
+
+    def current_module(self):
+        return self.module_combo.currentData()
+
+    def selected_id(self):
+        item = self.category_list.currentItem()
+        return item.data(Qt.UserRole) if item is not None else None
+
+    def load_categories(self, select_id=None):
+        self.category_list.clear()
+        for category in module_categories(self.current_module()):
+            item = QListWidgetItem(category.name)
+            item.setData(Qt.UserRole, category.id)
+            self.category_list.addItem(item)
+            if category.id == select_id:
+                self.category_list.setCurrentItem(item)
+
+    def category_selected(self, item, previous):
+        if item is not None:
+            self.name_input.setText(item.text())
+
+    def add_clicked(self):
+        try:
+            new_id = add_category(self.current_module(), self.name_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to add category: {e}")
+            return
+        self.load_categories(new_id)
+
+    def rename_clicked(self):
+        category_id = self.selected_id()
+        if category_id is None:
+            QMessageBox.warning(self, "Error", "Select a category to rename.")
+            return
+        try:
+            rename_category(category_id, self.name_input.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to rename category: {e}")
+            return
+        self.load_categories(category_id)
+
+    def remove_clicked(self):
+        category_id = self.selected_id()
+        if category_id is None:
+            QMessageBox.warning(self, "Error", "Select a category to remove.")
+            return
+        name = self.category_list.currentItem().text()
+        if QMessageBox.question(self, "Remove Category", f"Remove the category '{name}'?") != QMessageBox.Yes:
+            return
+        try:
+            remove_category(category_id)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        except Exception as e:
+            QMessageBox.critical(self, "Database Error", f"Failed to remove category: {e}")
+            return
+        self.name_input.clear()
+        self.load_categories()
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    ensure_schema()
+    window = CategoryWindow(store_id=1)
+    window.show()
+    sys.exit(app.exec_())
@@ -1,12 +1,116 @@
 import sys
+import os
+import json
 import sqlite3
+from collections import namedtuple
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QHBoxLayout, QVBoxLayout,
-    QComboBox, QMessageBox, QGroupBox, QFrame
+    QComboBox, QMessageBox, QGroupBox, QFrame, QTableWidget, QTableWidgetItem, QHeaderView,
+    QAbstractItemView
 )
 from PyQt5.QtGui import QFont, QPainter, QColor
-from PyQt5.QtCore import Qt, pyqtSignal
-from PyQt5.QtChart import QChart, QChartView, QPieSeries
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+import startup
+from db import get_connection
+from journal import journal_page
+from money import format_money, from_paise
+from summary import StoreSummary, StoreTotals, load_summary, store_breakdown
+from workers import TaskRunner
+
+REFRESH_DEBOUNCE_MS = 150
+REFRESH_TIMEOUT = 15
+LATEST_ENTRIES = 3
+
+# The last snapshot shown is kept next to session.json, so the next launch
+# can draw the dashboard straight away and refresh it in the background.
+SNAPSHOT_FILE = "dashboard_snapshot.json"
+# Bumped whenever the saved layout changes; older files are ignored. Format 2
+# keeps totals in paise; format 3 adds the per-store breakdown.
+SNAPSHOT_FORMAT = 3
+
+# stores holds a StoreTotals per store for "All Stores", and is empty otherwise.
+DashboardSnapshot = namedtuple(
+    'DashboardSnapshot',
+    'store_name summary latest_entries stores'
+)
+
+BREAKDOWN_HEADERS = ["Store", "Income", "Expenses", "Net Profit", "Assets", "Liabilities"]
+
+
+def load_dashboard_snapshot(store_id, user_id, token):
+    # Runs on a pool thread; everything the dashboard shows is gathered here
+    # into an immutable snapshot, and the widget only renders it.
+    conn = get_connection()
+    c = conn.cursor()
+
+    # Fetch store name for chart title
+    store_name = "All Stores"
+    if store_id != 0:
+        c.execute("SELECT store_name FROM stores WHERE id=?", (store_id,))
+        row = c.fetchone()
+        if row:
+            store_name = row[0]
+    token.check()
+
+    summary = load_summary(store_id, user_id, conn)
+    token.check()
+
+    entries, _ = journal_page(store_id, user_id, limit=LATEST_ENTRIES, conn=conn)
+    latest_entries = tuple(
+        (entry.module.capitalize(), entry.date, None if entry.value is None else format_money(entry.value), entry.label)
+        for entry in entries)
+    token.check()
+
+    stores = store_breakdown(user_id, conn) if store_id == 0 else ()
+
+    return DashboardSnapshot(store_name, summary, latest_entries, stores)
+
+
+def save_snapshot(snapshot, store_id, user_id, path=SNAPSHOT_FILE):
+    data = {
+        "format": SNAPSHOT_FORMAT,
+        "store_id": store_id,
+        "user_id": user_id,
+        "store_name": snapshot.store_name,
+        "summary": snapshot.summary._asdict(),
+        "latest_entries": snapshot.latest_entries,
+        "stores": snapshot.stores,
+    }
+    temp_path = path + ".tmp"
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+    except OSError as e:
+        print(f"Could not save dashboard snapshot: {e}")
+
+
+def load_saved_snapshot(store_id, user_id, path=SNAPSHOT_FILE):
+    # Returns None unless the file holds a snapshot of this store for this
+    # user; a damaged file is ignored and replaced by the next refresh.
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        if (data.get("format") != SNAPSHOT_FORMAT or data.get("store_id") != store_id
+                or data.get("user_id") != user_id):
+            return None
+        summary = data["summary"]
+        for field in ("asset_categories", "liability_categories"):
+            summary[field] = tuple(tuple(item) for item in summary[field])
+        return DashboardSnapshot(data["store_name"], StoreSummary(**summary),
+                                 tuple(tuple(entry) for entry in data["latest_entries"]),
+                                 tuple(StoreTotals(*store) for store in data["stores"]))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print(f"Ignoring saved dashboard snapshot: {e}")
+        return None
+
+
+def clear_saved_snapshot(path=SNAPSHOT_FILE):
+    if os.path.exists(path):
+        os.remove(path)
 
 
 class Dashboard(QWidget):
@@ -16,8 +120,14 @@ class Dashboard(QWidget):
         super().__init__()
         self.main_window = main_window
         self.store_id = store_id if store_id is not None else 0
+        self.snapshot = None
         self.setWindowTitle("Dashboard")
         self.setGeometry(500, 200, 950, 650)
+        self.refresh_runner = TaskRunner(self, timeout=REFRESH_TIMEOUT)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DEBOUNCE_MS)
+        self.refresh_timer.timeout.connect(self.start_refresh)
         self.setup_ui()
         if self.main_window:
             self.data_updated.connect(self.refresh_dashboard)
@@ -77,6 +187,8 @@ class Dashboard(QWidget):
             ("Profit/Loss", self.open_profit_loss, "#a9cce3"),
             ("View All Records", self.open_see_all_records, "#f7d9a6"),
             ("Analytics", self.open_analytics, "#f9e79f"),
+            ("Import", self.open_import, "#d5dbdb"),
+            ("Categories", self.open_categories, "#d2b4de"),
         ]
         for text, callback, color in buttons:
             btn = QPushButton(text)
@@ -102,10 +214,14 @@ class Dashboard(QWidget):
         content_layout = QHBoxLayout()
         main_layout.addLayout(content_layout)
 
-        self.chart_view = QChartView()
-        self.chart_view.setRenderHint(QPainter.Antialiasing)
-        self.chart_view.setMinimumWidth(480)
-        content_layout.addWidget(self.chart_view)
+        # The chart view is created when the first chart is drawn, so QtChart
+        # is not loaded until there is data to show.
+        self.chart_view = None
+        self.chart_holder = QWidget()
+        self.chart_holder.setMinimumWidth(480)
+        self.chart_holder.setLayout(QVBoxLayout())
+        self.chart_holder.layout().setContentsMargins(0, 0, 0, 0)
+        content_layout.addWidget(self.chart_holder)
 
         self.legend_group = QGroupBox("Legend")
         self.legend_group.setFixedWidth(200)
@@ -138,6 +254,12 @@ class Dashboard(QWidget):
         self.latest_text.setMinimumWidth(320)
         right_layout.addWidget(self.latest_text)
 
+        activity_btn = QPushButton("More Activity")
+        activity_btn.setFont(QFont("Segoe UI", 10))
+        activity_btn.setStyleSheet("background-color: #d5dbdb; color: black; border-radius: 5px; padding: 6px;")
+        activity_btn.clicked.connect(self.open_activity)
+        right_layout.addWidget(activity_btn)
+
         self.profit_loss_label = QLabel("")
         self.profit_loss_label.setFont(QFont("Segoe UI", 14, QFont.Bold))
         self.profit_loss_label.setAlignment(Qt.AlignCenter)
@@ -154,9 +276,30 @@ class Dashboard(QWidget):
         right_layout.addStretch()
         content_layout.addLayout(right_layout)
 
+        # Per-store totals, shown only for "All Stores".
+        self.breakdown_table = QTableWidget(0, len(BREAKDOWN_HEADERS))
+        self.breakdown_table.setHorizontalHeaderLabels(BREAKDOWN_HEADERS)
+        self.breakdown_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.breakdown_table.verticalHeader().setVisible(False)
+        self.breakdown_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.breakdown_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.breakdown_table.setStyleSheet("background-color: white; font-size: 12px;")
+        self.breakdown_table.setMaximumHeight(220)
+        self.breakdown_table.hide()
+        main_layout.addWidget(self.breakdown_table)
+
         self.load_store_options()
+        # Show the last known numbers at once; the refresh below replaces
+        # them in place if anything has changed since.
+        saved = load_saved_snapshot(self.store_id, self.user_id())
+        if saved is not None:
+            self.render_snapshot(saved)
+            startup.milestone("Saved dashboard shown")
         self.refresh_dashboard()
 
+    def user_id(self):
+        return self.main_window.user_id if self.main_window else None
+
     def logout_placeholder(self):
         QMessageBox.information(self, "Logout", "Logout clicked but no main window available.")
 
@@ -170,8 +313,7 @@ class Dashboard(QWidget):
         if not self.main_window or not hasattr(self.main_window, "user_id"):
             return
         try:
-            conn = sqlite3.connect("database.db")
-            c = conn.cursor()
+            c = get_connection().cursor()
             c.execute("SELECT id, store_name FROM stores WHERE user_id=?", (self.main_window.user_id,))
             stores = c.fetchall()
             self.store_combo.clear()
@@ -185,16 +327,11 @@ class Dashboard(QWidget):
                     if self.store_combo.itemData(i) == self.store_id:
                         self.store_combo.setCurrentIndex(i)
                         break
-            conn.close()
         except sqlite3.Error as e:
             QMessageBox.warning(self, "Error", f"Failed to load stores: {e}")
 
     def update_legend(self, series):
-        while self.legend_layout.count():
-            item = self.legend_layout.takeAt(0)
-            widget = item.widget()
-            if widget:
-                widget.deleteLater()
+        self.clear_legend()
         for slice in series.slices():
             color = slice.color()
             label = slice.label()
@@ -227,175 +364,135 @@ class Dashboard(QWidget):
             QMessageBox.warning(self, "Error", "Store management not available.")
 
     def refresh_dashboard(self):
+        # Bursts of requests (store switches, child windows closing, the
+        # Refresh button) restart the timer and end up as a single load.
+        self.refresh_timer.start()
+
+    def start_refresh(self):
         if self.store_id is None:
+            self.refresh_runner.cancel()
+            self.snapshot = None
             self.latest_text.setText("No store selected.")
-            self.chart_view.setChart(QChart())
+            self.clear_chart()
             self.profit_loss_label.setText("")
-            while self.legend_layout.count():
-                item = self.legend_layout.takeAt(0)
-                widget = item.widget()
-                if widget:
-                    widget.deleteLater()
+            self.clear_legend()
+            self.breakdown_table.hide()
             return
 
-        try:
-            conn = sqlite3.connect("database.db")
-            c = conn.cursor()
+        # A newer refresh cancels the one still in flight
+        self.refresh_runner.run(load_dashboard_snapshot, self.store_id, self.user_id(),
+                                on_result=self.snapshot_loaded, on_error=self.snapshot_failed)
+
+    def snapshot_loaded(self, snapshot):
+        if snapshot != self.snapshot:
+            self.render_snapshot(snapshot)
+            save_snapshot(snapshot, self.store_id, self.user_id())
+        startup.milestone("Dashboard data loaded")
+
+    def snapshot_failed(self, error):
+        QMessageBox.warning(self, "Error", f"Failed to refresh dashboard: {error}")
+
+    def set_chart(self, chart):
+        if self.chart_view is None:
+            from PyQt5.QtChart import QChartView
+            self.chart_view = QChartView()
+            self.chart_view.setRenderHint(QPainter.Antialiasing)
+            self.chart_holder.layout().addWidget(self.chart_view)
+        self.chart_view.setChart(chart)
+
+    def clear_chart(self):
+        if self.chart_view is not None:
+            from PyQt5.QtChart import QChart
+            self.chart_view.setChart(QChart())
 
-            if self.store_id == 0:
-                c.execute("SELECT id FROM stores WHERE user_id=?", (self.main_window.user_id,))
-                store_ids = [str(row[0]) for row in c.fetchall()]
-                if not store_ids:
-                    store_ids = ["-1"]
-                store_filter = f"store_id IN ({','.join(store_ids)})"
-            else:
-                store_filter = "store_id = ?"
+    def clear_legend(self):
+        while self.legend_layout.count():
+            item = self.legend_layout.takeAt(0)
+            widget = item.widget()
+            if widget:
+                widget.deleteLater()
 
-            # Fetch store name for chart title
-            store_name = "All Stores"
-            if self.store_id != 0:
-                c.execute("SELECT store_name FROM stores WHERE id=?", (self.store_id,))
-                row = c.fetchone()
-                if row:
-                    store_name = row[0]
+    def render_snapshot(self, snapshot):
+        from PyQt5.QtChart import QChart, QPieSeries
+        self.snapshot = snapshot
+        summary = snapshot.summary
+        series = QPieSeries()
+
+        # Pie chart colors (unique)
+        # Income: Blue; Expenses: Orange; Assets varying blues; Liabilities varying purples
+        if summary.income > 0:
+            slice = series.append("Income", summary.income)
+            slice.setColor(QColor("#2980b9"))  # Blue
+        if summary.expenses > 0:
+            slice = series.append("Expenses", summary.expenses)
+            slice.setColor(QColor("#f39c12"))  # Orange
+
+        color_palette = [
+            "#3498db", "#5dade2", "#85c1e9", "#aed6f1",
+            "#af7ac5", "#bb8fce", "#d2b4de", "#e8daef"
+        ]
+        palette_index = 0
 
-            series = QPieSeries()
+        for category, value in summary.asset_categories + summary.liability_categories:
+            if value > 0:
+                color = QColor(color_palette[palette_index % len(color_palette)])
+                palette_index += 1
+                slice = series.append(f"{category or 'None'}", value)
+                slice.setColor(color)
 
-            if self.store_id == 0:
-                c.execute(f"SELECT SUM(amount) FROM income WHERE {store_filter}")
-                income_sum = c.fetchone()[0] or 0
-                c.execute(f"SELECT SUM(amount) FROM expenses WHERE {store_filter}")
-                expense_sum = c.fetchone()[0] or 0
-            else:
-                c.execute("SELECT SUM(amount) FROM income WHERE store_id=?", (self.store_id,))
-                income_sum = c.fetchone()[0] or 0
-                c.execute("SELECT SUM(amount) FROM expenses WHERE store_id=?", (self.store_id,))
-                expense_sum = c.fetchone()[0] or 0
-
-            # Pie chart colors (unique)
-            # Income: Blue; Expenses: Orange; Assets varying blues; Liabilities varying purples
-            if income_sum > 0:
-                slice = series.append("Income", income_sum)
-                slice.setColor(QColor("#2980b9"))  # Blue
-            if expense_sum > 0:
-                slice = series.append("Expenses", expense_sum)
-                slice.setColor(QColor("#f39c12"))  # Orange
-
-            color_palette = [
-                "#3498db", "#5dade2", "#85c1e9", "#aed6f1",
-                "#af7ac5", "#bb8fce", "#d2b4de", "#e8daef"
-            ]
-            palette_index = 0
+        chart = QChart()
+        chart.addSeries(series)
 
-            if self.store_id == 0:
-                c.execute(f"SELECT category, SUM(value) FROM assets WHERE {store_filter} GROUP BY category")
-            else:
-                c.execute("SELECT category, SUM(value) FROM assets WHERE store_id=? GROUP BY category", (self.store_id,))
-            rows = c.fetchall()
-            for category, value in rows:
-                if value > 0:
-                    color = QColor(color_palette[palette_index % len(color_palette)])
-                    palette_index += 1
-                    slice = series.append(f"{category or 'None'}", value)
-                    slice.setColor(color)
+        # Set chart title with store name
+        chart.setTitle(f"Financial Summary - {snapshot.store_name}")
 
-            if self.store_id == 0:
-                c.execute(f"SELECT category, SUM(amount) FROM liabilities WHERE {store_filter} GROUP BY category")
-            else:
-                c.execute("SELECT category, SUM(amount) FROM liabilities WHERE store_id=? GROUP BY category", (self.store_id,))
-            rows = c.fetchall()
-            for category, amount in rows:
-                if amount > 0:
-                    color = QColor(color_palette[palette_index % len(color_palette)])
-                    palette_index += 1
-                    slice = series.append(f"{category or 'None'}", amount)
-                    slice.setColor(color)
-
-            chart = QChart()
-            chart.addSeries(series)
-
-            # Set chart title with store name
-            chart.setTitle(f"Financial Summary - {store_name}")
-
-            title_font = QFont()
-            title_font.setPointSize(20)
-            label_font = QFont()
-            label_font.setPointSize(12)
-
-            chart.setTitleFont(title_font)
-            chart.legend().hide()
-            for slice in series.slices():
-                slice.setLabelFont(label_font)
-                slice.setLabelVisible(True)
-
-            self.chart_view.setChart(chart)
-            self.update_legend(series)
+        title_font = QFont()
+        title_font.setPointSize(20)
+        label_font = QFont()
+        label_font.setPointSize(12)
 
-            if self.store_id == 0:
-                c.execute(f"""
-                    SELECT 'Income', date, amount, description FROM income WHERE {store_filter}
-                    UNION ALL
-                    SELECT 'Expenses', date, amount, category FROM expenses WHERE {store_filter}
-                    UNION ALL
-                    SELECT 'Capital', date, amount, description FROM capital WHERE {store_filter}
-                    UNION ALL
-                    SELECT 'Assets', date, value, asset_name FROM assets WHERE {store_filter}
-                    UNION ALL
-                    SELECT 'Liabilities', date, amount, liability_name FROM liabilities WHERE {store_filter}
-                    ORDER BY date DESC
-                    LIMIT 3
-                """)
-            else:
-                c.execute("""
-                    SELECT 'Income', date, amount, description FROM income WHERE store_id=?
-                    UNION ALL
-                    SELECT 'Expenses', date, amount, category FROM expenses WHERE store_id=?
-                    UNION ALL
-                    SELECT 'Capital', date, amount, description FROM capital WHERE store_id=?
-                    UNION ALL
-                    SELECT 'Assets', date, value, asset_name FROM assets WHERE store_id=?
-                    UNION ALL
-                    SELECT 'Liabilities', date, amount, liability_name FROM liabilities WHERE store_id=?
-                    ORDER BY date DESC
-                    LIMIT 3
-                """, (self.store_id, self.store_id, self.store_id, self.store_id, self.store_id))
-            rows = c.fetchall()
-
-            if rows:
-                text = ""
-                for module, dt, val, desc in rows:
-                    text += f"<b>Entry:</b> {module}<br><b>Date:</b> {dt}<br><b>Amount/Value:</b> ₹{val}<br><b>Description:</b> {desc}<br><hr>"
-                self.latest_text.setText(text)
-            else:
-                self.latest_text.setText("No entries found.")
+        chart.setTitleFont(title_font)
+        chart.legend().hide()
+        for slice in series.slices():
+            slice.setLabelFont(label_font)
+            slice.setLabelVisible(True)
 
-            if self.store_id == 0:
-                c.execute(f"SELECT SUM(amount) FROM income WHERE {store_filter}")
-                total_income = c.fetchone()[0] or 0
-                c.execute(f"SELECT SUM(amount) FROM expenses WHERE {store_filter}")
-                total_expenses = c.fetchone()[0] or 0
-            else:
-                c.execute("SELECT SUM(amount) FROM income WHERE store_id=?", (self.store_id,))
-                total_income = c.fetchone()[0] or 0
-                c.execute("SELECT SUM(amount) FROM expenses WHERE store_id=?", (self.store_id,))
-                total_expenses = c.fetchone()[0] or 0
-
-            net_profit = total_income - total_expenses
-
-            if net_profit > 0:
-                self.profit_loss_label.setText(f"Profit: ₹{net_profit:.2f}")
-                self.profit_loss_label.setStyleSheet("background-color: #27ae60; color: white; border-radius: 6px; padding: 10px;")
-            elif net_profit < 0:
-                self.profit_loss_label.setText(f"Loss: ₹{abs(net_profit):.2f}")
-                self.profit_loss_label.setStyleSheet("background-color: #c0392b; color: white; border-radius: 6px; padding: 10px;")
-            else:
-                self.profit_loss_label.setText("Break-even")
-                self.profit_loss_label.setStyleSheet("background-color: gray; color: white; padding: 10px; border-radius: 6px;")
+        self.set_chart(chart)
+        self.update_legend(series)
+
+        if snapshot.latest_entries:
+            text = ""
+            for module, dt, val, desc in snapshot.latest_entries:
+                text += f"<b>Entry:</b> {module}<br><b>Date:</b> {dt}<br><b>Amount/Value:</b> {val}<br><b>Description:</b> {desc}<br><hr>"
+            self.latest_text.setText(text)
+        else:
+            self.latest_text.setText("No entries found.")
 
-            conn.close()
+        net_profit = summary.net_profit
 
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to refresh dashboard: {e}")
+        if net_profit > 0:
+            self.profit_loss_label.setText(f"Profit: {format_money(from_paise(net_profit))}")
+            self.profit_loss_label.setStyleSheet("background-color: #27ae60; color: white; border-radius: 6px; padding: 10px;")
+        elif net_profit < 0:
+            self.profit_loss_label.setText(f"Loss: {format_money(from_paise(-net_profit))}")
+            self.profit_loss_label.setStyleSheet("background-color: #c0392b; color: white; border-radius: 6px; padding: 10px;")
+        else:
+            self.profit_loss_label.setText("Break-even")
+            self.profit_loss_label.setStyleSheet("background-color: gray; color: white; padding: 10px; border-radius: 6px;")
+
+        self.show_breakdown(snapshot.stores)
+
+    def show_breakdown(self, stores):
+        self.breakdown_table.setVisible(bool(stores))
+        self.breakdown_table.setRowCount(len(stores))
+        for row, store in enumerate(stores):
+            values = [store.store_name] + [format_money(from_paise(paise)) for paise in (
+                store.income, store.expenses, store.net_profit, store.assets, store.liabilities)]
+            for column, text in enumerate(values):
+                item = QTableWidgetItem(text)
+                if column:
+                    item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+                self.breakdown_table.setItem(row, column, item)
 
     def open_capital(self):
         if self.main_window:
@@ -445,6 +542,24 @@ class Dashboard(QWidget):
         else:
             QMessageBox.information(self, "Info", "Analytics module clicked.")
 
+    def open_import(self):
+        if self.main_window:
+            self.main_window.show_import(store_id=self.store_id)
+        else:
+            QMessageBox.information(self, "Info", "Import clicked.")
+
+    def open_activity(self):
+        if self.main_window:
+            self.main_window.show_activity(store_id=self.store_id)
+        else:
+            QMessageBox.information(self, "Info", "Activity clicked.")
+
+    def open_categories(self):
+        if self.main_window:
+            self.main_window.show_categories(store_id=self.store_id)
+        else:
+            QMessageBox.information(self, "Info", "Categories clicked.")
+
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,77 @@
+import atexit
+import os
+import sqlite3
+import threading
+
+DB_PATH = 'database.db'
+
+# Size of sqlite3's per-connection prepared statement cache. The windows reuse
+# a small, fixed set of queries, so keeping them all compiled avoids re-parsing
+# SQL on every refresh.
+STATEMENT_CACHE_SIZE = 256
+
+# Seconds a connection waits for another one's write lock before failing. A
+# bulk import holds the lock for several seconds; entry saves made meanwhile
+# should wait for it rather than error out.
+BUSY_TIMEOUT = 30
+
+# 'wal' (the default) uses write-ahead logging so readers never block the
+# writer and commits only fsync at checkpoints. 'rollback' keeps SQLite's
+# classic rollback journal, for databases kept on network shares where WAL's
+# shared-memory index does not work.
+STORAGE_MODE = os.environ.get('STOREBOOK_STORAGE', 'wal')
+
+# Connections by thread ident. A threading.local would not do: QThreadPool
+# workers are native threads whose Python thread state, and with it any
+# thread-local, is discarded after every task, so each background query
+# would open and configure a fresh connection. The ident of a pool thread
+# stays the same for its whole life; one reused by a later thread simply
+# inherits the connection, which no other thread can be using by then.
+_connections = {}
+_lock = threading.Lock()
+
+
+def _configure(conn):
+    conn.execute("PRAGMA foreign_keys = ON")
+    if STORAGE_MODE == 'wal':
+        conn.execute("PRAGMA journal_mode = WAL")
+        # In WAL mode NORMAL is still crash-safe; a power cut can only lose
+        # the most recent commits, never corrupt the file.
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA cache_size = -16000")
+        conn.execute("PRAGMA mmap_size = 268435456")
+        conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def get_connection():
+    # One long-lived connection per thread, created on first use.
+    ident = threading.get_ident()
+    conn = _connections.get(ident)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, cached_statements=STATEMENT_CACHE_SIZE,
+                               check_same_thread=False)
+        _configure(conn)
+        with _lock:
+            _connections[ident] = conn
+    return conn
+
+
+def close_connection():
+    with _lock:
+        conn = _connections.pop(threading.get_ident(), None)
+    if conn is not None:
+        conn.close()
+
+
+def close_all_connections():
+    with _lock:
+        connections = list(_connections.values())
+        _connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+atexit.register(close_all_connections)
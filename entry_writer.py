@@ -0,0 +1,124 @@
+import itertools
+import queue
+
+from PyQt5.QtCore import QCoreApplication, QThread, pyqtSignal
+
+from categories import category_id
+from db import close_connection, get_connection
+from money import to_paise
+from schema import HASH_COLUMNS, LEDGER_TABLES, VALUE_COLUMNS, content_hash
+
+# Upper bound on entries written in one transaction. Whatever queues up while
+# the previous commit is in flight is written together, so a burst of saves
+# costs one commit instead of one per entry.
+GROUP_COMMIT_SIZE = 200
+
+
+class EntryWriter(QThread):
+    saved = pyqtSignal(int, str, int)  # ticket, table, new row id (the last one for a batch)
+    failed = pyqtSignal(int, str, str)  # ticket, table, error message
+
+    def __init__(self):
+        super().__init__()
+        self._queue = queue.Queue()
+        self._tickets = itertools.count(1)
+
+    def submit(self, table, values):
+        return self.submit_many(table, [values])
+
+    def submit_many(self, table, rows):
+        # All rows of one ticket are saved together or not at all. Amounts
+        # are given in rupees (Decimal) and stored as paise; categories are
+        # given by name and stored by id. Each row gets its content_hash, so
+        # a later import recognises it.
+        if table not in LEDGER_TABLES:
+            raise ValueError(f"Unknown ledger table: {table}")
+        money = VALUE_COLUMNS[table]
+        rows = [dict(values) for values in rows]
+        for values in rows:
+            if values.get(money) is not None:
+                values[money] = to_paise(values[money])
+            if 'category' in values:
+                name = values.pop('category')
+                values['category_id'] = None if name is None else category_id(table, name)
+            values['content_hash'] = content_hash([values.get(column) for column in HASH_COLUMNS[table]])
+        ticket = next(self._tickets)
+        self._queue.put((ticket, table, rows))
+        return ticket
+
+    def stop(self):
+        if self.isRunning():
+            self._queue.put(None)
+            self.wait()
+
+    def run(self):
+        conn = get_connection()
+        try:
+            stopping = False
+            while not stopping:
+                item = self._queue.get()
+                if item is None:
+                    break
+                batch = [item]
+                while len(batch) < GROUP_COMMIT_SIZE:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
+                self.write_batch(conn, batch)
+        finally:
+            close_connection()
+
+    def write_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for ticket, table, rows in batch:
+                # A savepoint per ticket keeps one bad submission from
+                # discarding the rest of the group.
+                conn.execute("SAVEPOINT entry")
+                try:
+                    for values in rows:
+                        columns = ", ".join(values)
+                        placeholders = ", ".join("?" for _ in values)
+                        c = conn.execute(f"INSERT INTO {table} ({columns}) VALUES ({placeholders})",
+                                         tuple(values.values()))
+                    conn.execute("RELEASE entry")
+                    results.append((ticket, table, c.lastrowid, None))
+                except Exception as e:
+                    # Not only sqlite3.Error: an exception escaping run()
+                    # would take the writer thread, and PyQt, down with it.
+                    conn.execute("ROLLBACK TO entry")
+                    conn.execute("RELEASE entry")
+                    results.append((ticket, table, None, str(e)))
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            for ticket, table, _ in batch:
+                self.failed.emit(ticket, table, str(e))
+            return
+
+        for ticket, table, entry_id, error in results:
+            if error is None:
+                self.saved.emit(ticket, table, entry_id)
+            else:
+                self.failed.emit(ticket, table, error)
+
+
+_writer = None
+
+
+def get_writer():
+    global _writer
+    if _writer is None:
+        _writer = EntryWriter()
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(_writer.stop)
+        _writer.start()
+    return _writer
@@ -1,34 +1,26 @@
 import sys
-import sqlite3
+import functools
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QDateEdit, QComboBox
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QDate
 
-class ExpensesWindow(QWidget):
+from batch_entry import BatchEntryWindow
+from form import EntryFormMixin
+from money import parse_money
+from schema import ensure_schema
+from window_manager import get_window_manager
+
+class ExpensesWindow(EntryFormMixin, QWidget):
+    category_module = "expenses"
+    saved_message = "Expense entry saved successfully!"
+
     def __init__(self, store_id=None):
         super().__init__()
         self.store_id = store_id
         self.setWindowTitle("Expenses Module")
         self.setGeometry(500, 200, 500, 400)
         self.setup_ui()
-        self.create_table_if_not_exists()
-
-    def create_table_if_not_exists(self):
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("PRAGMA foreign_keys = ON")
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS expenses (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                amount REAL,
-                category TEXT,
-                store_id INTEGER,
-                FOREIGN KEY(store_id) REFERENCES stores(id)
-            )
-        """)
-        conn.commit()
-        conn.close()
+        self.connect_writer()
 
     def setup_ui(self):
         self.setStyleSheet("background-color: #f0f4f7;")
@@ -71,13 +63,12 @@ class ExpensesWindow(QWidget):
         self.category_label.setFont(QFont("Segoe UI", 12))
         self.category_label.move(70, 180)
 
-        self.category_dropdown = QComboBox(self)
-        self.category_dropdown.setFont(QFont("Segoe UI", 12))
-        self.category_dropdown.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 8px; font-size: 14px;")
-        self.category_dropdown.move(180, 180)
-        self.category_dropdown.resize(220, 30)
-        categories = ["Rent", "Electricity", "Purchase", "Salary", "Other"]
-        self.category_dropdown.addItems(categories)
+        self.category_combo = QComboBox(self)
+        self.category_combo.setFont(QFont("Segoe UI", 12))
+        self.category_combo.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 8px; font-size: 14px;")
+        self.category_combo.move(180, 180)
+        self.category_combo.resize(220, 30)
+        self.load_categories()
 
         self.submit_button = QPushButton("Submit", self)
         self.submit_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -96,19 +87,39 @@ class ExpensesWindow(QWidget):
         self.submit_button.resize(100, 35)
         self.submit_button.clicked.connect(self.save_data)
 
+        self.batch_button = QPushButton("Batch Entry", self)
+        self.batch_button.setFont(QFont("Segoe UI", 11))
+        self.batch_button.setStyleSheet("background-color: #7f8c8d; color: white; border-radius: 5px; padding: 8px;")
+        self.batch_button.move(310, 240)
+        self.batch_button.resize(110, 35)
+        self.batch_button.clicked.connect(self.open_batch)
+
+        self.status_label = QLabel("", self)
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        self.status_label.move(70, 285)
+        self.status_label.resize(360, 30)
+
+    def open_batch(self):
+        get_window_manager().show("batch_expenses", functools.partial(BatchEntryWindow, "expenses"), self.store_id)
+
+    def clear_inputs(self):
+        self.date_input.setDate(QDate.currentDate())
+        self.amount_input.clear()
+        self.category_combo.setCurrentIndex(0)
+
     def go_back(self):
         self.close()  # Close the current window, returning to Dashboard
 
     def save_data(self):
         date = self.date_input.date().toString("yyyy-MM-dd")
         amount = self.amount_input.text()
-        category = self.category_dropdown.currentText()
+        category = self.category_combo.currentText()
 
         if not amount:
             QMessageBox.warning(self, "Incomplete", "Please enter amount.")
             return
         try:
-            amount = float(amount)
+            amount = parse_money(amount)
             if amount < 0:
                 raise ValueError("Amount cannot be negative")
         except ValueError:
@@ -119,23 +130,13 @@ class ExpensesWindow(QWidget):
             QMessageBox.warning(self, "Error", "No store selected.")
             return
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("INSERT INTO expenses (date, amount, category, store_id) VALUES (?, ?, ?, ?)",
-                      (date, amount, category, self.store_id))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Success", "Expense entry saved successfully!")
-            self.date_input.setDate(QDate.currentDate())
-            self.amount_input.clear()
-            self.category_dropdown.setCurrentIndex(0)
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to save entry: {e}")
+        self.submit_entry("expenses", {
+            "date": date, "amount": amount, "category": category, "store_id": self.store_id,
+        }, f"{date}, ₹{amount:.2f}, {category}")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    ensure_schema()
     window = ExpensesWindow(store_id=1)
     window.show()
     sys.exit(app.exec_())
\ No newline at end of file
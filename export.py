@@ -0,0 +1,78 @@
+import csv
+import os
+import tempfile
+
+from db import get_connection
+from money import from_paise
+from schema import category_name_sql, day_number
+
+# Rows pulled from the cursor and written per step. Memory stays bounded by
+# this however much history is exported.
+EXPORT_CHUNK_SIZE = 1000
+
+# (title, table, columns, headers); the second column is always the amount.
+REPORT_SECTIONS = [
+    ("Capital", "capital", "date, amount, description", ["Date", "Amount", "Description"]),
+    ("Income", "income", "date, amount, description", ["Date", "Amount", "Description"]),
+    ("Expenses", "expenses", f"date, amount, {category_name_sql('expenses')}", ["Date", "Amount", "Category"]),
+    ("Liabilities", "liabilities", "date, amount, description", ["Date", "Amount", "Description"]),
+    ("Assets", "assets", "date, value, description", ["Date", "Value", "Description"]),
+]
+
+
+def _date_filter(start_date, end_date):
+    # Ranges are on the integer day_number, a seek on (store_id, day_number).
+    where = "store_id = ?"
+    params = []
+    if start_date:
+        where += " AND day_number >= ?"
+        params.append(day_number(start_date))
+    if end_date:
+        where += " AND day_number <= ?"
+        params.append(day_number(end_date))
+    return where, params
+
+
+def write_financial_report(f, store_id, token, start_date=None, end_date=None):
+    # Writes every section to the open file ``f`` a chunk at a time.
+    conn = get_connection()
+    where, params = _date_filter(start_date, end_date)
+    params = [store_id] + params
+
+    total = sum(conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+                for _, table, _, _ in REPORT_SECTIONS)
+    done = 0
+    token.report(done, max(total, 1))
+
+    writer = csv.writer(f)
+    for index, (title, table, columns, headers) in enumerate(REPORT_SECTIONS):
+        if index:
+            writer.writerow([])
+        writer.writerow([title])
+        writer.writerow(headers)
+        c = conn.execute(f"SELECT {columns} FROM {table} WHERE {where} ORDER BY day_number, id", params)
+        while True:
+            rows = c.fetchmany(EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            writer.writerows((date, from_paise(amount), *rest) for date, amount, *rest in rows)
+            done += len(rows)
+            token.check()
+            token.report(done, max(total, 1))
+    return done
+
+
+def export_financial_report(store_id, path, token, start_date=None, end_date=None):
+    # Streams the report to a temporary file next to ``path`` and renames it
+    # into place only once complete, so a failed or cancelled export never
+    # leaves a half-written report behind.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=".export-", suffix=".csv", dir=directory)
+    try:
+        with os.fdopen(fd, 'w', newline='') as f:
+            write_financial_report(f, store_id, token, start_date, end_date)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return path
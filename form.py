@@ -6,7 +6,67 @@ from PyQt5.QtWidgets import (
     QVBoxLayout, QComboBox
 )
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, pyqtSlot
+
+from categories import category_names
+from db import get_connection
+from entry_writer import get_writer
+from schema import ensure_schema
+
+
+class EntryFormMixin:
+    # Shared by the income, expenses, capital, assets and liabilities windows.
+    # A window sets category_module (None when its entries have no category)
+    # and saved_message, and has category_combo, status_label and
+    # clear_inputs(). Saves go through the background writer; the slots below
+    # only react to the tickets this window submitted.
+    category_module = None
+    saved_message = ""
+
+    def connect_writer(self):
+        self.pending_entries = {}
+        writer = get_writer()
+        writer.saved.connect(self.entry_saved)
+        writer.failed.connect(self.entry_failed)
+
+    def load_categories(self):
+        self.category_combo.clear()
+        self.category_combo.addItems(category_names(self.category_module))
+
+    def submit_entry(self, table, values, summary):
+        # The writer looks the category up by name; one renamed or removed
+        # since the list was loaded is refused here, before anything is
+        # queued, and the list is reloaded.
+        try:
+            ticket = get_writer().submit(table, values)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", f"{e}. The category list has been reloaded.")
+            if self.category_module:
+                self.load_categories()
+            return
+        self.pending_entries[ticket] = summary
+        self.status_label.setText("Saving...")
+        self.clear_inputs()
+
+    def reset(self):
+        # The window is reused; reopening it starts a fresh entry, with the
+        # category list as it is now.
+        if self.category_module:
+            self.load_categories()
+        self.clear_inputs()
+        self.status_label.setText("")
+
+    @pyqtSlot(int, str, int)
+    def entry_saved(self, ticket, table, entry_id):
+        if self.pending_entries.pop(ticket, None) is not None:
+            self.status_label.setText(self.saved_message)
+
+    @pyqtSlot(int, str, str)
+    def entry_failed(self, ticket, table, error):
+        summary = self.pending_entries.pop(ticket, None)
+        if summary is not None:
+            self.status_label.setText("")
+            QMessageBox.warning(self, "Error", f"Failed to save entry ({summary}): {error}")
 
 
 class StoreDetailsForm(QWidget):
@@ -25,31 +85,6 @@ class StoreDetailsForm(QWidget):
         self.move((size.width() - width) // 2, (size.height() - height) // 2)
 
         self.setup_ui()
-        self.create_table_if_not_exists()
-
-    def create_table_if_not_exists(self):
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("PRAGMA foreign_keys = ON")
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS store_details (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            username TEXT,
-            storename TEXT,
-            storetype TEXT,
-            ownername TEXT
-        )
-        """)
-        c.execute("""
-        CREATE TABLE IF NOT EXISTS stores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            store_name TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-        """)
-        conn.commit()
-        conn.close()
 
     def setup_ui(self):
         self.setStyleSheet("background: qlineargradient(x1:0, y1:0, x2:1, y2:1, stop:0 #e0eafc, stop:1 #cfdef3);")
@@ -177,16 +212,14 @@ class StoreDetailsForm(QWidget):
             return
 
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("INSERT INTO store_details (username, storename, storetype, ownername) VALUES (?, ?, ?, ?)",
-                      (username, storename, storetype, ownername))
-            c.execute("INSERT INTO stores (user_id, store_name) VALUES (?, ?)",
-                      (self.user_id or 1, storename))
-            store_id = c.lastrowid
-            conn.commit()
-            conn.close()
+            conn = get_connection()
+            with conn:
+                c = conn.cursor()
+                c.execute("INSERT INTO store_details (username, storename, storetype, ownername) VALUES (?, ?, ?, ?)",
+                          (username, storename, storetype, ownername))
+                c.execute("INSERT INTO stores (user_id, store_name) VALUES (?, ?)",
+                          (self.user_id or 1, storename))
+                store_id = c.lastrowid
 
             QMessageBox.information(self, "Success", "Store details saved successfully!")
 
@@ -199,6 +232,7 @@ class StoreDetailsForm(QWidget):
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    ensure_schema()
     window = StoreDetailsForm(user_id=1)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,207 @@
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout, QLabel, QPushButton, QComboBox,
+    QLineEdit, QFileDialog, QMessageBox, QProgressBar
+)
+from PyQt5.QtGui import QFont
+from PyQt5.QtCore import Qt
+
+from importer import IMPORT_FIELDS, REQUIRED_FIELDS, ImportFileError, guess_mapping, import_csv, read_headers
+from schema import LEDGER_TABLES, ensure_schema
+from workers import TaskRunner
+
+NOT_IN_FILE = "(not in file)"
+
+
+class ImportWindow(QWidget):
+    def __init__(self, store_id=None):
+        super().__init__()
+        self.store_id = store_id
+        self.path = None
+        self.headers = []
+        self.field_combos = {}
+        self.setWindowTitle("Import Entries")
+        self.setGeometry(500, 200, 600, 500)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setStyleSheet("background-color: #f0f4f7;")
+        layout = QVBoxLayout()
+        self.setLayout(layout)
+
+        back_layout = QHBoxLayout()
+        back_button = QPushButton("Back")
+        back_button.setFont(QFont("Segoe UI", 10))
+        back_button.setStyleSheet("background-color: #3498db; color: white; border-radius: 3px; padding: 2px 8px;")
+        back_button.clicked.connect(self.go_back)
+        back_layout.addWidget(back_button)
+        back_layout.addStretch()
+        layout.addLayout(back_layout)
+
+        title = QLabel("Import Entries from CSV")
+        title.setFont(QFont("Segoe UI", 16, QFont.Bold))
+        layout.addWidget(title)
+
+        file_layout = QHBoxLayout()
+        self.file_input = QLineEdit()
+        self.file_input.setReadOnly(True)
+        self.file_input.setPlaceholderText("Choose a CSV statement or POS export")
+        self.file_input.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 6px; font-size: 14px;")
+        file_layout.addWidget(self.file_input)
+        browse_button = QPushButton("Browse...")
+        browse_button.setFont(QFont("Segoe UI", 10))
+        browse_button.clicked.connect(self.choose_file)
+        file_layout.addWidget(browse_button)
+        layout.addLayout(file_layout)
+
+        module_layout = QHBoxLayout()
+        module_label = QLabel("Import into:")
+        module_label.setFont(QFont("Segoe UI", 12))
+        module_layout.addWidget(module_label)
+        self.module_combo = QComboBox()
+        self.module_combo.addItems(LEDGER_TABLES)
+        self.module_combo.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 6px; font-size: 14px;")
+        self.module_combo.currentIndexChanged.connect(self.build_mapping)
+        module_layout.addWidget(self.module_combo)
+        module_layout.addStretch()
+        layout.addLayout(module_layout)
+
+        # One column picker per field of the chosen module
+        mapping_label = QLabel("Columns:")
+        mapping_label.setFont(QFont("Segoe UI", 12))
+        layout.addWidget(mapping_label)
+        self.mapping_layout = QFormLayout()
+        layout.addLayout(self.mapping_layout)
+
+        button_layout = QHBoxLayout()
+        self.import_button = QPushButton("Import")
+        self.import_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
+        self.import_button.setStyleSheet("""
+            QPushButton {
+                background-color: #27ae60;
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+            }
+            QPushButton:hover {
+                background-color: #2ecc71;
+            }
+        """)
+        self.import_button.clicked.connect(self.start_import)
+        button_layout.addWidget(self.import_button)
+
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setFont(QFont("Segoe UI", 12))
+        self.cancel_button.clicked.connect(self.cancel_import)
+        self.cancel_button.hide()
+        button_layout.addWidget(self.cancel_button)
+        layout.addLayout(button_layout)
+
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        self.status_label = QLabel("")
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        self.status_label.setWordWrap(True)
+        self.status_label.setAlignment(Qt.AlignTop)
+        layout.addWidget(self.status_label)
+        layout.addStretch()
+
+        # Imports have no deadline; the Cancel button stops them instead
+        self.import_runner = TaskRunner(self, self.progress_bar)
+        self.build_mapping()
+
+    def reset(self):
+        # The window is reused; closing it cancelled any import in progress.
+        self.path = None
+        self.headers = []
+        self.file_input.clear()
+        self.status_label.setText("")
+        self.reset_buttons()
+        self.build_mapping()
+
+    def go_back(self):
+        self.close()
+
+    def choose_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Choose File", "", "CSV Files (*.csv *.txt);;All Files (*)")
+        if not path:
+            return
+        try:
+            self.headers = read_headers(path)
+        except (OSError, UnicodeDecodeError, ImportFileError) as e:
+            QMessageBox.warning(self, "Error", f"Could not read the file: {e}")
+            return
+        self.path = path
+        self.file_input.setText(path)
+        self.status_label.setText("")
+        self.build_mapping()
+
+    def build_mapping(self):
+        while self.mapping_layout.rowCount():
+            self.mapping_layout.removeRow(0)
+        self.field_combos = {}
+
+        table = self.module_combo.currentText()
+        guessed = guess_mapping(table, self.headers)
+        for field in IMPORT_FIELDS[table]:
+            combo = QComboBox()
+            combo.addItem(NOT_IN_FILE, None)
+            for index, header in enumerate(self.headers):
+                combo.addItem(header or f"Column {index + 1}", index)
+            if field in guessed:
+                combo.setCurrentIndex(guessed[field] + 1)
+            label = field.replace('_', ' ').capitalize()
+            if field in REQUIRED_FIELDS[table]:
+                label += " *"
+            self.mapping_layout.addRow(label, combo)
+            self.field_combos[field] = combo
+
+    def start_import(self):
+        if not self.store_id:
+            QMessageBox.warning(self, "Error", "No store selected.")
+            return
+        if not self.path:
+            QMessageBox.warning(self, "Incomplete", "Please choose a file to import.")
+            return
+
+        table = self.module_combo.currentText()
+        mapping = {field: combo.currentData() for field, combo in self.field_combos.items()
+                   if combo.currentData() is not None}
+        self.import_button.setEnabled(False)
+        self.cancel_button.show()
+        self.status_label.setText("Importing...")
+        self.import_runner.run(import_csv, self.path, table, self.store_id, mapping,
+                               on_result=self.import_finished, on_error=self.import_failed)
+
+    def cancel_import(self):
+        self.import_runner.cancel()
+        self.reset_buttons()
+        self.status_label.setText("Import cancelled; nothing was saved.")
+
+    def reset_buttons(self):
+        self.import_button.setEnabled(True)
+        self.cancel_button.hide()
+
+    def import_finished(self, result):
+        self.reset_buttons()
+        text = (f"Imported {result.inserted} entries. Skipped {result.duplicates} already in the ledger "
+                f"and {result.invalid} invalid rows.")
+        if result.errors:
+            text += "\n" + "\n".join(result.errors)
+            if result.invalid > len(result.errors):
+                text += f"\n... and {result.invalid - len(result.errors)} more."
+        self.status_label.setText(text)
+
+    def import_failed(self, error):
+        self.reset_buttons()
+        self.status_label.setText("")
+        QMessageBox.warning(self, "Error", f"Import failed: {error}")
+
+
+if __name__ == '__main__':
+    app = QApplication(sys.argv)
+    ensure_schema()
+    window = ImportWindow(store_id=1)
+    window.show()
+    sys.exit(app.exec_())
@@ -0,0 +1,224 @@
+import csv
+import datetime
+import functools
+from collections import Counter, namedtuple
+
+from categories import ensure_category, invalidate
+from db import get_connection
+from money import parse_money, to_paise
+from schema import VALUE_COLUMNS, content_hash, transaction
+
+# Rows per executemany call, and how often progress is reported.
+IMPORT_BATCH_SIZE = 5000
+
+# Only the first few problems are listed back to the user.
+MAX_REPORTED_ERRORS = 20
+
+# Fields each ledger table takes from an imported file, in insert order.
+IMPORT_FIELDS = {
+    'income': ['date', 'amount', 'category', 'description'],
+    'expenses': ['date', 'amount', 'category'],
+    'capital': ['date', 'amount', 'description'],
+    'assets': ['date', 'asset_name', 'value', 'category', 'description'],
+    'liabilities': ['date', 'liability_name', 'amount', 'category', 'description'],
+}
+
+REQUIRED_FIELDS = {
+    'income': ['date', 'amount'],
+    'expenses': ['date', 'amount'],
+    'capital': ['date', 'amount'],
+    'assets': ['date', 'asset_name', 'value'],
+    'liabilities': ['date', 'liability_name', 'amount'],
+}
+
+# Header names recognised when guessing which column holds which field.
+FIELD_ALIASES = {
+    'date': ['date', 'transaction date', 'txn date', 'posting date', 'value date', 'bill date'],
+    'amount': ['amount', 'total', 'net amount', 'sale amount', 'debit', 'credit'],
+    'value': ['value', 'amount', 'total'],
+    'category': ['category', 'type', 'account', 'head'],
+    'description': ['description', 'narration', 'details', 'particulars', 'memo', 'remarks', 'item'],
+    'asset_name': ['asset name', 'asset', 'name', 'item'],
+    'liability_name': ['liability name', 'liability', 'name', 'lender'],
+}
+
+# Day-first formats come before month-first ones, matching local statements.
+DATE_FORMATS = ['%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d',
+                '%d %b %Y', '%d-%b-%Y', '%d %B %Y', '%d/%m/%y', '%d-%m-%y']
+
+ImportResult = namedtuple('ImportResult', 'inserted duplicates invalid errors')
+
+
+class ImportFileError(Exception):
+    pass
+
+
+def _reader(f):
+    sample = f.read(8192)
+    f.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t|")
+    except csv.Error:
+        dialect = csv.excel
+    return csv.reader(f, dialect)
+
+
+def read_headers(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        headers = next(_reader(f), None)
+    if not headers:
+        raise ImportFileError("The file is empty.")
+    return [header.strip() for header in headers]
+
+
+def _data_rows(path):
+    # Yields (line number, row) for every non-blank line after the header,
+    # reading the file as it goes.
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = _reader(f)
+        next(reader, None)
+        for row in reader:
+            if any(cell.strip() for cell in row):
+                yield reader.line_num, row
+
+
+def guess_mapping(table, headers):
+    lowered = [header.strip().lower() for header in headers]
+    mapping = {}
+    for field in IMPORT_FIELDS[table]:
+        for alias in FIELD_ALIASES[field]:
+            if alias in lowered and lowered.index(alias) not in mapping.values():
+                mapping[field] = lowered.index(alias)
+                break
+    return mapping
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_date(text):
+    # Statements repeat the same few hundred dates, so each is parsed once.
+    text = text.strip()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(text, fmt).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"unrecognised date '{text}'")
+
+
+def parse_amount(text):
+    # Returns the amount in paise, as the ledger stores it.
+    cleaned = text.strip()
+    for symbol in ('INR', 'Rs.', 'Rs', '₹', ','):
+        cleaned = cleaned.replace(symbol, '')
+    cleaned = cleaned.strip()
+    if cleaned.startswith('(') and cleaned.endswith(')'):
+        cleaned = cleaned[1:-1]
+    try:
+        value = parse_money(cleaned)
+    except ValueError:
+        raise ValueError(f"invalid amount '{text.strip()}'") from None
+    # Statements show money going out as negative or bracketed figures; the
+    # ledger keeps magnitudes and the module says which way it went.
+    return to_paise(abs(value))
+
+
+def parse_row(table, mapping, row):
+    record = []
+    for field in IMPORT_FIELDS[table]:
+        index = mapping.get(field)
+        text = row[index].strip() if index is not None and index < len(row) else ''
+        if not text:
+            if field in REQUIRED_FIELDS[table]:
+                raise ValueError(f"missing {field.replace('_', ' ')}")
+            record.append(None)
+        elif field == 'date':
+            record.append(parse_date(text))
+        elif field == VALUE_COLUMNS[table]:
+            record.append(parse_amount(text))
+        else:
+            record.append(text)
+    return tuple(record)
+
+
+def import_csv(path, table, store_id, mapping, token):
+    fields = IMPORT_FIELDS[table]
+    missing = [field for field in REQUIRED_FIELDS[table] if mapping.get(field) is None]
+    if missing:
+        raise ImportFileError(f"No column chosen for: {', '.join(missing)}")
+
+    # First pass: validate everything, so progress has a total.
+    errors = []
+    invalid = 0
+    total = 0
+    for line, row in _data_rows(path):
+        try:
+            parse_row(table, mapping, row)
+        except ValueError as e:
+            invalid += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(f"Line {line}: {e}")
+            continue
+        total += 1
+        if total % IMPORT_BATCH_SIZE == 0:
+            token.check()
+
+    inserted = duplicates = 0
+    if not total:
+        return ImportResult(inserted, duplicates, invalid, errors)
+
+    # Second pass: insert whatever the ledger does not already hold, in one
+    # transaction so a failed or cancelled import leaves nothing behind.
+    # Rows are matched on content_hash through its index, so the cost does
+    # not grow with the dates the file spans. Identical rows are counted, so
+    # two genuine same-day sales of the same amount are only skipped if the
+    # ledger already has two of them. Categories are stored, and hashed, by
+    # id; names the module does not have yet are added to its list.
+    conn = get_connection()
+    columns = ", ".join('category_id' if field == 'category' else field for field in fields)
+    insert_sql = (f"INSERT INTO {table} ({columns}, content_hash, store_id) "
+                  f"VALUES ({', '.join('?' * len(fields))}, ?, ?)")
+    count_sql = f"SELECT COUNT(*) FROM {table} WHERE store_id = ? AND content_hash = ?"
+    category_index = fields.index('category') if 'category' in fields else None
+    category_ids = {}
+    with transaction(conn):
+        existing = {}
+        seen = Counter()
+        batch = []
+        done = 0
+        token.report(done, total)
+        for line, row in _data_rows(path):
+            try:
+                record = parse_row(table, mapping, row)
+            except ValueError:
+                continue
+            if category_index is not None and record[category_index] is not None:
+                name = record[category_index].casefold()
+                if name not in category_ids:
+                    category_ids[name] = ensure_category(table, record[category_index], conn)
+                record = record[:category_index] + (category_ids[name],) + record[category_index + 1:]
+            key = content_hash(record)
+            if key not in existing:
+                # Counted when the key first comes up, before this import
+                # has inserted any row with it.
+                existing[key] = conn.execute(count_sql, (store_id, key)).fetchone()[0]
+            seen[key] += 1
+            if seen[key] <= existing[key]:
+                duplicates += 1
+            else:
+                batch.append(record + (key, store_id))
+            done += 1
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                conn.executemany(insert_sql, batch)
+                inserted += len(batch)
+                batch = []
+            if done % IMPORT_BATCH_SIZE == 0:
+                token.check()
+                token.report(done, total)
+        if batch:
+            conn.executemany(insert_sql, batch)
+            inserted += len(batch)
+        token.check()
+    if category_ids:
+        # Only now are any categories the import added visible to others.
+        invalidate()
+    return ImportResult(inserted, duplicates, invalid, errors)
@@ -1,35 +1,27 @@
 import sys
-import sqlite3
+import functools
 from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QDateEdit, QComboBox, QHBoxLayout, QVBoxLayout
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QDate, Qt
 
+from batch_entry import BatchEntryWindow
+from form import EntryFormMixin
+from money import parse_money
+from schema import ensure_schema
+from window_manager import get_window_manager
+
+
+class IncomeWindow(EntryFormMixin, QWidget):
+    category_module = "income"
+    saved_message = "Income entry saved successfully!"
 
-class IncomeWindow(QWidget):
     def __init__(self, store_id=None):
         super().__init__()
         self.store_id = store_id
         self.setWindowTitle("Income Module")
         self.setGeometry(500, 200, 500, 400)
         self.setup_ui()
-        self.create_table_if_not_exists()
-
-    def create_table_if_not_exists(self):
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("PRAGMA foreign_keys = ON")
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS income (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                amount REAL,
-                category TEXT,
-                store_id INTEGER,
-                FOREIGN KEY(store_id) REFERENCES stores(id)
-            )
-        """)
-        conn.commit()
-        conn.close()
+        self.connect_writer()
 
     def setup_ui(self):
         self.setStyleSheet("background-color: #f0f4f7;")
@@ -77,13 +69,12 @@ class IncomeWindow(QWidget):
         self.category_label = QLabel("Category:", self)
         self.category_label.setFont(QFont("Segoe UI", 12))
         main_layout.addWidget(self.category_label)
-        self.category_dropdown = QComboBox(self)
-        self.category_dropdown.setFont(QFont("Segoe UI", 12))
-        self.category_dropdown.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 8px; font-size: 14px;")
-        self.category_dropdown.setMinimumSize(220, 30)
-        categories = ["Sales", "Services", "Commission", "Rent Received", "Other"]
-        self.category_dropdown.addItems(categories)
-        main_layout.addWidget(self.category_dropdown)
+        self.category_combo = QComboBox(self)
+        self.category_combo.setFont(QFont("Segoe UI", 12))
+        self.category_combo.setStyleSheet("border: 1px solid #bdc3c7; border-radius: 5px; padding: 8px; font-size: 14px;")
+        self.category_combo.setMinimumSize(220, 30)
+        self.load_categories()
+        main_layout.addWidget(self.category_combo)
 
         self.submit_button = QPushButton("Submit", self)
         self.submit_button.setFont(QFont("Segoe UI", 12, QFont.Bold))
@@ -102,21 +93,41 @@ class IncomeWindow(QWidget):
         main_layout.addWidget(self.submit_button, alignment=Qt.AlignCenter)
         self.submit_button.clicked.connect(self.save_data)
 
+        self.batch_button = QPushButton("Batch Entry", self)
+        self.batch_button.setFont(QFont("Segoe UI", 11))
+        self.batch_button.setStyleSheet("background-color: #7f8c8d; color: white; border-radius: 5px; padding: 8px;")
+        self.batch_button.setMinimumSize(110, 35)
+        main_layout.addWidget(self.batch_button, alignment=Qt.AlignCenter)
+        self.batch_button.clicked.connect(self.open_batch)
+
+        self.status_label = QLabel("", self)
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        self.status_label.setAlignment(Qt.AlignCenter)
+        main_layout.addWidget(self.status_label)
+
         main_layout.addStretch()
 
+    def open_batch(self):
+        get_window_manager().show("batch_income", functools.partial(BatchEntryWindow, "income"), self.store_id)
+
+    def clear_inputs(self):
+        self.amount_input.clear()
+        self.category_combo.setCurrentIndex(0)
+        self.date_input.setDate(QDate.currentDate())
+
     def go_back(self):
         self.close()
 
     def save_data(self):
         date = self.date_input.date().toString("yyyy-MM-dd")
         amount = self.amount_input.text()
-        category = self.category_dropdown.currentText()
+        category = self.category_combo.currentText()
 
         if not amount:
             QMessageBox.warning(self, "Incomplete", "Please enter amount.")
             return
         try:
-            amount = float(amount)
+            amount = parse_money(amount)
             if amount < 0:
                 raise ValueError("Amount cannot be negative")
         except ValueError:
@@ -127,25 +138,14 @@ class IncomeWindow(QWidget):
             QMessageBox.warning(self, "Error", "No store selected.")
             return
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("INSERT INTO income (date, amount, category, store_id) VALUES (?, ?, ?, ?)",
-                      (date, amount, category, self.store_id))
-            conn.commit()
-            conn.close()
-
-            QMessageBox.information(self, "Success", "Income entry saved successfully!")
-            self.amount_input.clear()
-            self.category_dropdown.setCurrentIndex(0)
-            self.date_input.setDate(QDate.currentDate())
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to save entry: {e}")
+        self.submit_entry("income", {
+            "date": date, "amount": amount, "category": category, "store_id": self.store_id,
+        }, f"{date}, ₹{amount:.2f}, {category}")
 
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    ensure_schema()
     window = IncomeWindow(store_id=1)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,54 @@
+import heapq
+from collections import namedtuple
+from itertools import islice
+
+from db import get_connection
+from money import from_paise
+
+# Entries per page of the activity feed.
+FEED_PAGE_SIZE = 25
+
+# value is in Decimal rupees.
+JournalEntry = namedtuple('JournalEntry', 'module id date value label')
+
+_ORDER = "ORDER BY date DESC, id DESC, module DESC"
+
+
+def _sort_key(row):
+    return row[:3]
+
+
+def _store_ids(conn, store_id, user_id):
+    # store_id 0 stands for "All Stores" of the logged-in user.
+    if store_id == 0:
+        return [row[0] for row in conn.execute("SELECT id FROM stores WHERE user_id = ? ORDER BY id", (user_id,))]
+    return [store_id]
+
+
+def journal_page(store_id, user_id=None, limit=FEED_PAGE_SIZE, after=None, conn=None):
+    # Returns (entries, cursor): up to ``limit`` entries, newest first, and
+    # the cursor to pass as ``after`` for the next page (None once the feed
+    # is exhausted). Each store is read as one backward range of the
+    # journal's primary key; for "All Stores" the same statement runs once
+    # per store and only the first ``limit`` rows of each are merged, so a
+    # page costs the same however long the history is, and the statement is
+    # prepared once however many stores there are.
+    if conn is None:
+        conn = get_connection()
+    stores = _store_ids(conn, store_id, user_id)
+    if not stores:
+        return [], None
+
+    where = "store_id = ?"
+    cursor_params = []
+    if after is not None:
+        where += " AND (date, id, module) < (?, ?, ?)"
+        cursor_params = list(after)
+    sql = f"SELECT date, id, module, value, label FROM ledger_journal WHERE {where} {_ORDER} LIMIT ?"
+    pages = [conn.execute(sql, [sid] + cursor_params + [limit]).fetchall() for sid in stores]
+    rows = list(islice(heapq.merge(*pages, key=_sort_key, reverse=True), limit))
+
+    entries = [JournalEntry(module, entry_id, date or None, from_paise(value), label)
+               for date, entry_id, module, value, label in rows]
+    cursor = tuple(rows[-1][:3]) if len(rows) == limit else None
+    return entries, cursor
@@ -1,37 +1,28 @@
 import sys
-import sqlite3
+import functools
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QLabel, QLineEdit, QPushButton, QMessageBox, QDateEdit, QComboBox
 )
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import QDate
 
-class LiabilitiesWindow(QWidget):
+from batch_entry import BatchEntryWindow
+from form import EntryFormMixin
+from money import parse_money
+from schema import ensure_schema
+from window_manager import get_window_manager
+
+class LiabilitiesWindow(EntryFormMixin, QWidget):
+    category_module = "liabilities"
+    saved_message = "Liability entry saved successfully!"
+
     def __init__(self, store_id=None):
         super().__init__()
         self.store_id = store_id
         self.setWindowTitle("Liabilities Module")
         self.setGeometry(500, 200, 500, 450)
         self.setup_ui()
-        self.create_table_if_not_exists()
-
-    def create_table_if_not_exists(self):
-        conn = sqlite3.connect('database.db')
-        c = conn.cursor()
-        c.execute("PRAGMA foreign_keys = ON")
-        c.execute("""
-            CREATE TABLE IF NOT EXISTS liabilities (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                date TEXT,
-                liability_name TEXT,
-                amount REAL,
-                category TEXT,
-                store_id INTEGER,
-                FOREIGN KEY(store_id) REFERENCES stores(id)
-            )
-        """)
-        conn.commit()
-        conn.close()
+        self.connect_writer()
 
     def setup_ui(self):
         self.setStyleSheet("background-color: #f0f4f7;")
@@ -90,7 +81,7 @@ class LiabilitiesWindow(QWidget):
 
         self.category_combo = QComboBox(self)
         self.category_combo.setFont(QFont("Segoe UI", 12))
-        self.category_combo.addItems(["Loan", "Mortgage", "Credit Card", "Other"])
+        self.load_categories()
         self.category_combo.move(180, 230)
         self.category_combo.resize(220, 30)
 
@@ -111,6 +102,26 @@ class LiabilitiesWindow(QWidget):
         self.submit_button.resize(100, 35)
         self.submit_button.clicked.connect(self.save_data)
 
+        self.batch_button = QPushButton("Batch Entry", self)
+        self.batch_button.setFont(QFont("Segoe UI", 11))
+        self.batch_button.setStyleSheet("background-color: #7f8c8d; color: white; border-radius: 5px; padding: 8px;")
+        self.batch_button.move(310, 290)
+        self.batch_button.resize(110, 35)
+        self.batch_button.clicked.connect(self.open_batch)
+
+        self.status_label = QLabel("", self)
+        self.status_label.setFont(QFont("Segoe UI", 11))
+        self.status_label.move(70, 335)
+        self.status_label.resize(360, 30)
+
+    def open_batch(self):
+        get_window_manager().show("batch_liabilities", functools.partial(BatchEntryWindow, "liabilities"), self.store_id)
+
+    def clear_inputs(self):
+        self.date_input.setDate(QDate.currentDate())
+        self.name_input.clear()
+        self.amount_input.clear()
+
     def go_back(self):
         self.close()  # Close the current window, returning to Dashboard
 
@@ -124,7 +135,7 @@ class LiabilitiesWindow(QWidget):
             QMessageBox.warning(self, "Incomplete", "Please enter all fields.")
             return
         try:
-            amount = float(amount)
+            amount = parse_money(amount)
             if amount < 0:
                 raise ValueError("Amount cannot be negative")
         except ValueError:
@@ -135,24 +146,14 @@ class LiabilitiesWindow(QWidget):
             QMessageBox.warning(self, "Error", "No store selected.")
             return
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute(
-                "INSERT INTO liabilities (date, liability_name, amount, category, store_id) VALUES (?, ?, ?, ?, ?)",
-                (date, liability_name, amount, category, self.store_id))
-            conn.commit()
-            conn.close()
-            QMessageBox.information(self, "Success", "Liability entry saved successfully!")
-            self.date_input.setDate(QDate.currentDate())
-            self.name_input.clear()
-            self.amount_input.clear()
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to save entry: {e}")
+        self.submit_entry("liabilities", {
+            "date": date, "liability_name": liability_name, "amount": amount, "category": category,
+            "store_id": self.store_id,
+        }, f"{date}, {liability_name}, ₹{amount:.2f}")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
+    ensure_schema()
     window = LiabilitiesWindow(store_id=1)
     window.show()
     sys.exit(app.exec_())
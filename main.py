@@ -1,113 +1,59 @@
 import sys
+import functools
 import sqlite3
 import json
 import os
 import traceback
 import re
 
+import startup
 
 from PyQt5.QtWidgets import QApplication, QMainWindow, QWidget, QLabel, QLineEdit, QPushButton, QVBoxLayout, QMessageBox, QHBoxLayout, QDateEdit
 from PyQt5.QtGui import QFont
-from PyQt5.QtCore import Qt, QDate
+from PyQt5.QtCore import Qt, QDate, QTimer
 
+from db import get_connection
+from schema import MigrationError, ensure_schema
+from window_manager import get_window_manager
 
-from form import StoreDetailsForm
-from dashboard import Dashboard
-from income import IncomeWindow
-from expenses import ExpensesWindow
-from capital import CapitalWindow
-from assets import AssetsWindow
-from liabilities import LiabilitiesWindow
-from profit_loss import ProfitLossWindow
-from SeeAllRecordsWindow import SeeAllRecordsWindow
-from store_management import StoreManagement
-from analytics import AnalyticsWindow 
+startup.mark("Python and Qt modules imported")
 
+# Window modules are imported by the show_* methods the first time they are
+# needed, so the login screen and the dashboard come up without loading every
+# module (and QtChart) first.
 
 
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
-        print("Initializing MainWindow")
         self.setWindowTitle("StoreBook")
         self.setGeometry(self.screen().availableGeometry().center().x() - 350, self.screen().availableGeometry().center().y() - 300, 700, 600)
         self.user_id = None
         self.store_id = None
         self.session_file = "session.json"
         self.nav_bar = None
-        self.create_table_if_not_exists()
+        # Module windows are kept and reused; closing one refreshes the dashboard
+        get_window_manager().window_closed.connect(self.trigger_dashboard_update)
         self.load_session()
         if self.user_id:
-            print("User ID found, setting up UI")
             self.load_stores()
+            startup.mark("Session and stores loaded")
             self.setup_ui()
         else:
-            print("No user ID, showing login")
             self.show_login()
+        startup.mark("First screen built")
         self.activateWindow()  # Force window activation
 
 
-    def create_table_if_not_exists(self):
-        print("Starting database creation")
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA table_info(users)")
-            columns = [col[1] for col in c.fetchall()]
-            if 'birth_date' not in columns:
-                print("Adding birth_date column")
-                c.execute("ALTER TABLE users ADD COLUMN birth_date TEXT")
-
-
-            c.execute("""
-            CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                username TEXT UNIQUE,
-                password TEXT,
-                email TEXT,
-                birth_date TEXT
-            )
-            """)
-
-
-            c.execute("""
-            CREATE TABLE IF NOT EXISTS stores (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id INTEGER,
-                store_name TEXT,
-                FOREIGN KEY(user_id) REFERENCES users(id)
-            )
-            """)
-
-
-            c.execute("SELECT COUNT(*) FROM users")
-            if c.fetchone()[0] == 0:
-                print("Initializing default admin user")
-                c.execute("INSERT INTO users (username, password, email, birth_date) VALUES (?, ?, ?, ?)",
-                          ("admin", "Pass12!@", "admin@example.com", "1990-01-01"))
-                c.execute("INSERT INTO stores (user_id, store_name) VALUES (?, ?)", (1, "Test Store"))
-
-
-            conn.commit()
-        except sqlite3.Error as e:
-            print(f"Database initialization error: {e}")
-        finally:
-            print("Closing database connection")
-            conn.close()
-
-
     def setup_ui(self):
         if self.store_id:
-            print("Showing dashboard")
             self.show_dashboard()
         else:
-            print("Showing store management")
             self.show_store_management()
         self.show()
 
 
     def load_session(self):
-        print("Loading session")
         if os.path.exists(self.session_file):
             try:
                 with open(self.session_file, 'r') as f:
@@ -126,7 +72,6 @@ class MainWindow(QMainWindow):
 
 
     def show_login(self):
-        print("Showing login screen")
         self.login_widget = QWidget()
         self.setCentralWidget(self.login_widget)
 
@@ -232,9 +177,7 @@ class MainWindow(QMainWindow):
 
 
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
+            c = get_connection().cursor()
             c.execute("SELECT id FROM users WHERE username = ? AND password = ?", (username, password))
             user = c.fetchone()
             if user:
@@ -250,7 +193,6 @@ class MainWindow(QMainWindow):
                     self.show_store_management()
             else:
                 QMessageBox.warning(self, "Error", "Invalid username or password.")
-            conn.close()
         except sqlite3.Error as e:
             print(f"Login error - Stack trace: {traceback.format_exc()}")
             QMessageBox.warning(self, "Database Error", f"Login failed: {e}\nCheck console for details.")
@@ -264,9 +206,7 @@ class MainWindow(QMainWindow):
             return
 
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
+            c = get_connection().cursor()
             c.execute("SELECT email, birth_date FROM users WHERE username = ?", (username,))
             user_data = c.fetchone()
             if user_data:
@@ -274,7 +214,6 @@ class MainWindow(QMainWindow):
                 self.show_verify_birth_date(username, email, birth_date)
             else:
                 QMessageBox.warning(self, "Error", "Username not found.")
-            conn.close()
         except sqlite3.Error as e:
             print(f"Password reset error - Stack trace: {traceback.format_exc()}")
             QMessageBox.warning(self, "Database Error", f"Password reset failed: {e}\nCheck console for details.")
@@ -410,13 +349,10 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "Invalid", "Password must be at least 5 characters with 1 uppercase, 2 numbers, and 1 special character.")
             return
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("UPDATE users SET password = ? WHERE username = ?", (new_password, username))
+            conn = get_connection()
+            with conn:
+                c = conn.execute("UPDATE users SET password = ? WHERE username = ?", (new_password, username))
             if c.rowcount > 0:
-                conn.commit()
-                conn.close()
                 QMessageBox.information(self, "Success", f"Password reset successfully for {username}. You can now log in.")
                 self.show_login()
             else:
@@ -534,13 +470,10 @@ class MainWindow(QMainWindow):
 
 
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-            c.execute("INSERT INTO users (username, password, email, birth_date) VALUES (?, ?, ?, ?)", (username, password, email, birth_date))
+            conn = get_connection()
+            with conn:
+                c = conn.execute("INSERT INTO users (username, password, email, birth_date) VALUES (?, ?, ?, ?)", (username, password, email, birth_date))
             self.user_id = c.lastrowid
-            conn.commit()
-            conn.close()
             QMessageBox.information(self, "Success", "User registered successfully!")
             self.save_session()
             self.show_store_management()
@@ -552,18 +485,19 @@ class MainWindow(QMainWindow):
 
 
     def show_store_management(self):
-        print("Showing store management")
+        from store_management import StoreManagement
         self.store_management = StoreManagement(main_window=self, user_id=self.user_id)
         self.setCentralWidget(self.store_management)
 
 
     def show_store_form(self, user_id=None):
+        from form import StoreDetailsForm
         self.store_form = StoreDetailsForm(main_window=self, user_id=user_id or self.user_id)
         self.setCentralWidget(self.store_form)
 
 
     def show_dashboard(self, store_id=None):
-        print("Showing dashboard")
+        from dashboard import Dashboard
         if store_id:
             self.store_id = store_id
             self.save_session()
@@ -575,15 +509,12 @@ class MainWindow(QMainWindow):
 
 
     def load_stores(self):
-        print("Loading stores")
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
+            c = get_connection().cursor()
             c.execute("SELECT id FROM stores WHERE user_id = ?", (self.user_id,))
             stores = c.fetchall()
             if stores and not self.store_id:
                 self.store_id = stores[0][0]
-            conn.close()
         except sqlite3.Error as e:
             print(f"Error loading stores: {e}")
 
@@ -594,62 +525,73 @@ class MainWindow(QMainWindow):
         self.store_id = None
         if os.path.exists(self.session_file):
             os.remove(self.session_file)
+        from dashboard import clear_saved_snapshot
+        clear_saved_snapshot()
+        get_window_manager().close_all()
         self.nav_bar = None
         self.setMenuWidget(None)
         self.show_login()
 
 
     def show_income(self, store_id=None):
-        self.income_window = IncomeWindow(store_id=store_id or self.store_id)
-        self.income_window.show()
-        self.income_window.destroyed.connect(self.trigger_dashboard_update)
+        from income import IncomeWindow
+        get_window_manager().show("income", IncomeWindow, store_id or self.store_id)
 
 
     def show_expenses(self, store_id=None):
-        self.expenses_window = ExpensesWindow(store_id=store_id or self.store_id)
-        self.expenses_window.show()
-        self.expenses_window.destroyed.connect(self.trigger_dashboard_update)
+        from expenses import ExpensesWindow
+        get_window_manager().show("expenses", ExpensesWindow, store_id or self.store_id)
 
 
     def show_capital(self, store_id=None):
-        self.capital_window = CapitalWindow(store_id=store_id or self.store_id)
-        self.capital_window.show()
-        self.capital_window.destroyed.connect(self.trigger_dashboard_update)
+        from capital import CapitalWindow
+        get_window_manager().show("capital", CapitalWindow, store_id or self.store_id)
 
 
     def show_assets(self, store_id=None):
-        self.assets_window = AssetsWindow(store_id=store_id or self.store_id)
-        self.assets_window.show()
-        self.assets_window.destroyed.connect(self.trigger_dashboard_update)
+        from assets import AssetsWindow
+        get_window_manager().show("assets", AssetsWindow, store_id or self.store_id)
 
 
     def show_liabilities(self, store_id=None):
-        self.liabilities_window = LiabilitiesWindow(store_id=store_id or self.store_id)
-        self.liabilities_window.show()
-        self.liabilities_window.destroyed.connect(self.trigger_dashboard_update)
+        from liabilities import LiabilitiesWindow
+        get_window_manager().show("liabilities", LiabilitiesWindow, store_id or self.store_id)
 
 
     def show_profit_loss(self, store_id=None):
-        self.profit_loss_window = ProfitLossWindow(store_id=store_id or self.store_id)
-        self.profit_loss_window.show()
+        from profit_loss import ProfitLossWindow
+        get_window_manager().show("profit_loss", ProfitLossWindow, store_id or self.store_id)
 
 
     def show_reports(self, store_id=None):
-        self.edit_entry_window = SeeAllRecordsWindow(store_id=store_id or self.store_id)
-        self.edit_entry_window.show()
-        self.edit_entry_window.destroyed.connect(self.trigger_dashboard_update)
+        from SeeAllRecordsWindow import SeeAllRecordsWindow
+        get_window_manager().show("records", SeeAllRecordsWindow, store_id or self.store_id)
 
 
     def show_records(self, store_id=None):
-        self.records_window = SeeAllRecordsWindow(store_id=store_id or self.store_id)
-        self.records_window.show()
-        self.records_window.destroyed.connect(self.trigger_dashboard_update)
+        from SeeAllRecordsWindow import SeeAllRecordsWindow
+        get_window_manager().show("records", SeeAllRecordsWindow, store_id or self.store_id)
 
 
     def show_analytics(self, store_id=None):
-        self.analytics_window = AnalyticsWindow(store_id=store_id or self.store_id)
-        self.analytics_window.show()
-        self.analytics_window.destroyed.connect(self.trigger_dashboard_update)
+        from analytics import AnalyticsWindow
+        get_window_manager().show("analytics", AnalyticsWindow, store_id or self.store_id)
+
+
+    def show_import(self, store_id=None):
+        from import_window import ImportWindow
+        get_window_manager().show("import", ImportWindow, store_id or self.store_id)
+
+
+    def show_activity(self, store_id=None):
+        from activity import ActivityWindow
+        get_window_manager().show("activity", functools.partial(ActivityWindow, user_id=self.user_id),
+                                  store_id or self.store_id)
+
+
+    def show_categories(self, store_id=None):
+        from category_window import CategoryWindow
+        get_window_manager().show("categories", CategoryWindow, store_id or self.store_id)
 
 
     def trigger_dashboard_update(self):
@@ -659,10 +601,18 @@ class MainWindow(QMainWindow):
 
 
 if __name__ == '__main__':
-    print("Starting application")
     app = QApplication(sys.argv)
+    startup.mark("QApplication created")
+    # The schema is checked once here, before any window reads from the database.
+    try:
+        ensure_schema()
+    except (sqlite3.Error, MigrationError) as e:
+        QMessageBox.critical(None, "Database Error", f"Database initialization error: {e}")
+        sys.exit(1)
+    startup.mark("Database opened and schema checked")
     window = MainWindow()
-    print("Showing main window")
     window.show()
-    print("Starting event loop")
+    startup.mark("Main window shown")
+    # The first pass of the event loop is when the window is painted.
+    QTimer.singleShot(0, lambda: startup.milestone("First paint"))
     sys.exit(app.exec_())
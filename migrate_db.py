@@ -1,42 +1,55 @@
+import os
 import sqlite3
+import sys
 
-try:
-    conn = sqlite3.connect('database.db')
-    c = conn.cursor()
-    c.execute("PRAGMA foreign_keys = ON")
+import db
+from db import get_connection
+from schema import MIGRATIONS, SCHEMA_VERSION, MigrationError, current_version, migrate, rebuild_rollup
+from verify_db import open_readonly
 
-    # Verify stores table exists
-    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='stores'")
-    if not c.fetchone():
-        print("Stores table missing. Creating now...")
-        c.execute("""
-        CREATE TABLE stores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            store_name TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-        """)
+# Usage:
+#   python migrate_db.py            apply all pending migrations
+#   python migrate_db.py --status   show the current and latest schema version
+#   python migrate_db.py --rebuild-rollup
+#                                   recompute ledger_rollup from the ledger tables
 
-    # Add store_id column to financial tables
-    tables = ['income', 'expenses', 'capital', 'assets', 'liabilities']
-    for table in tables:
-        try:
-            c.execute(f"ALTER TABLE {table} ADD COLUMN store_id INTEGER")
-            print(f"Added store_id to {table}")
-        except sqlite3.OperationalError as e:
-            print(f"Column store_id already exists in {table}: {e}")
+def print_status(path):
+    # Only reads the version: a missing file is not created and an existing
+    # one is not switched to WAL, as opening it through the pool would.
+    if not os.path.isfile(path):
+        print(f"No database at '{path}'.")
+        sys.exit(1)
+    conn = open_readonly(path)
+    try:
+        version = current_version(conn)
+    finally:
+        conn.close()
+    print(f"Database schema version: {version} (latest: {SCHEMA_VERSION})")
+    for migration in MIGRATIONS:
+        state = "applied" if migration.version <= version else "pending"
+        print(f"  {migration.version:>3}  {state:<8} {migration.name}")
 
-    # Assign default store_id to existing records
-    c.execute("SELECT id FROM stores LIMIT 1")
-    result = c.fetchone()
-    default_store_id = result[0] if result else 1
-    for table in tables:
-        c.execute(f"UPDATE {table} SET store_id = ? WHERE store_id IS NULL", (default_store_id,))
 
-    conn.commit()
-    print("Database migration completed successfully.")
-except sqlite3.Error as e:
-    print(f"Migration error: {e}")
-finally:
-    conn.close()
\ No newline at end of file
+if __name__ == '__main__':
+    if '--status' in sys.argv[1:]:
+        try:
+            print_status(db.DB_PATH)
+        except sqlite3.Error as e:
+            print(f"Cannot read database: {e}")
+            sys.exit(1)
+        sys.exit(0)
+    conn = get_connection()
+    try:
+        version = current_version(conn)
+        if '--rebuild-rollup' in sys.argv[1:]:
+            migrate(conn)
+            rebuild_rollup(conn)
+            print("Ledger rollup rebuilt.")
+        elif migrate(conn):
+            print(f"Database migrated from version {version} to {SCHEMA_VERSION}.")
+        else:
+            print(f"Database is already at version {SCHEMA_VERSION}.")
+    except (sqlite3.Error, MigrationError) as e:
+        print(f"Migration error: {e}")
+        print("Run the migration again to resume from the last completed step.")
+        sys.exit(1)
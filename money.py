@@ -0,0 +1,59 @@
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# Money is stored as whole paise in INTEGER columns, so every SUM is exact.
+# Amounts enter and leave the data layer as Decimal rupees; nothing here
+# imports PyQt.
+
+PAISE = Decimal("0.01")
+
+# Largest amount, in paise, that an INTEGER column can hold.
+MAX_PAISE = 2 ** 63 - 1
+
+
+def _quantize(amount, text):
+    # Two places, rounding half up. Amounts too large for Decimal's context
+    # or for the database are invalid like any other unreadable amount.
+    try:
+        amount = amount.quantize(PAISE, rounding=ROUND_HALF_UP)
+    except InvalidOperation:
+        raise ValueError(f"amount '{text}' is out of range") from None
+    if abs(amount.scaleb(2)) > MAX_PAISE:
+        raise ValueError(f"amount '{text}' is out of range")
+    return amount
+
+
+def to_paise(rupees):
+    # Decimal, int, str or float rupees to integer paise, rounding half up.
+    # A float goes through its shortest repr, so 19.99 is 1999, not 1998.
+    if isinstance(rupees, float):
+        rupees = repr(rupees)
+    try:
+        amount = Decimal(rupees)
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"invalid amount '{rupees}'") from None
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount '{rupees}'")
+    return int(_quantize(amount, rupees).scaleb(2))
+
+
+def from_paise(paise):
+    return None if paise is None else Decimal(paise).scaleb(-2)
+
+
+def parse_money(text):
+    # An amount as typed, with or without a rupee sign and thousands
+    # separators, as a Decimal with two places.
+    cleaned = text.strip()
+    for symbol in ('INR', 'Rs.', 'Rs', '₹', ','):
+        cleaned = cleaned.replace(symbol, '')
+    try:
+        amount = Decimal(cleaned.strip())
+    except InvalidOperation:
+        raise ValueError(f"invalid amount '{text.strip()}'") from None
+    if not amount.is_finite():
+        raise ValueError(f"invalid amount '{text.strip()}'")
+    return _quantize(amount, text.strip())
+
+
+def format_money(rupees):
+    return f"₹{rupees:.2f}"
@@ -1,7 +1,21 @@
 import sys
-import sqlite3
-from PyQt5.QtWidgets import QApplication, QWidget, QLabel, QPushButton, QMessageBox
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QLabel, QPushButton, QMessageBox, QProgressBar, QCheckBox, QDateEdit, QFileDialog
+)
 from PyQt5.QtGui import QFont
+from PyQt5.QtCore import QDate
+
+from export import export_financial_report
+from money import format_money
+from reports import profit_loss
+from workers import TaskRunner
+
+QUERY_TIMEOUT = 30
+
+
+def load_profit_loss(store_id, token):
+    return profit_loss(store_id)
+
 
 class ProfitLossWindow(QWidget):
     def __init__(self, store_id=None):
@@ -65,6 +79,40 @@ class ProfitLossWindow(QWidget):
         self.export_button.resize(100, 35)
         self.export_button.clicked.connect(self.export_report)
 
+        # Optional date range for the export
+        self.date_range_check = QCheckBox("Date range", self)
+        self.date_range_check.move(50, 403)
+        self.date_range_check.toggled.connect(self.toggle_date_range)
+        self.start_date = QDateEdit(QDate.currentDate().addYears(-1), self)
+        self.end_date = QDateEdit(QDate.currentDate(), self)
+        for x, date_edit in ((150, self.start_date), (290, self.end_date)):
+            date_edit.setDisplayFormat("yyyy-MM-dd")
+            date_edit.setCalendarPopup(True)
+            date_edit.setEnabled(False)
+            date_edit.move(x, 400)
+            date_edit.resize(120, 25)
+
+        self.progress_bar = QProgressBar(self)
+        self.progress_bar.move(50, 445)
+        self.progress_bar.resize(300, 25)
+
+        self.cancel_export_button = QPushButton("Cancel", self)
+        self.cancel_export_button.setFont(QFont("Segoe UI", 10))
+        self.cancel_export_button.move(360, 442)
+        self.cancel_export_button.resize(80, 30)
+        self.cancel_export_button.clicked.connect(self.cancel_export)
+        self.cancel_export_button.hide()
+
+        self.query_runner = TaskRunner(self, timeout=QUERY_TIMEOUT)
+        # Exports of long histories may legitimately take a while, so they
+        # have no deadline; the Cancel button stops them instead.
+        self.export_runner = TaskRunner(self, self.progress_bar)
+
+    def reset(self):
+        # The window is reused; closing it cancelled any export in progress.
+        self.result_label.setText("")
+        self.export_finished()
+
     def go_back(self):
         self.close()  # Close the current window, returning to Dashboard
 
@@ -72,102 +120,61 @@ class ProfitLossWindow(QWidget):
         if not self.store_id:
             QMessageBox.warning(self, "Error", "No store selected.")
             return
+        self.query_runner.run(load_profit_loss, self.store_id,
+                              on_result=self.show_profit_loss, on_error=self.profit_loss_failed)
 
-        try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-
-            c.execute("SELECT SUM(amount) FROM capital WHERE store_id = ?", (self.store_id,))
-            total_capital = c.fetchone()[0] or 0
+    def show_profit_loss(self, lines):
+        *totals, (net_label, net) = lines
+        report_lines = [f"    {label}: {format_money(value)}" for label, value in totals]
+        report_lines.append("    -----------------------------")
+        report_lines.append(f"    {net_label}: {format_money(net)}")
+        self.result_label.setText("\n" + "\n".join(report_lines) + "\n")
 
-            c.execute("SELECT SUM(amount) FROM income WHERE store_id = ?", (self.store_id,))
-            total_income = c.fetchone()[0] or 0
+    def profit_loss_failed(self, error):
+        QMessageBox.warning(self, "Error", f"Failed to calculate profit/loss: {error}")
 
-            c.execute("SELECT SUM(amount) FROM expenses WHERE store_id = ?", (self.store_id,))
-            total_expenses = c.fetchone()[0] or 0
-
-            c.execute("SELECT SUM(amount) FROM liabilities WHERE store_id = ?", (self.store_id,))
-            total_liabilities = c.fetchone()[0] or 0
-
-            c.execute("SELECT SUM(value) FROM assets WHERE store_id = ?", (self.store_id,))
-            total_assets = c.fetchone()[0] or 0
-
-            net_balance = total_income - total_expenses
-
-            report_text = f"""
-    Total Capital: ₹{total_capital:.2f}
-    Total Income: ₹{total_income:.2f}
-    Total Expenses: ₹{total_expenses:.2f}
-    Total Liabilities: ₹{total_liabilities:.2f}
-    Total Assets Value: ₹{total_assets:.2f}
-    -----------------------------
-    Net Balance (Profit/Loss): ₹{net_balance:.2f}
-    """
-
-            self.result_label.setText(report_text)
-            conn.close()
-        except sqlite3.Error as e:
-            QMessageBox.warning(self, "Error", f"Failed to calculate profit/loss: {e}")
+    def toggle_date_range(self, checked):
+        self.start_date.setEnabled(checked)
+        self.end_date.setEnabled(checked)
 
     def export_report(self):
         if not self.store_id:
             QMessageBox.warning(self, "Error", "No store selected.")
             return
 
-        try:
-            import csv
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
-            c.execute("PRAGMA foreign_keys = ON")
-
-            c.execute("SELECT date, amount, description FROM capital WHERE store_id = ?", (self.store_id,))
-            capital_data = c.fetchall()
-
-            c.execute("SELECT date, amount, description FROM income WHERE store_id = ?", (self.store_id,))
-            income_data = c.fetchall()
-
-            c.execute("SELECT date, amount, category FROM expenses WHERE store_id = ?", (self.store_id,))
-            expenses_data = c.fetchall()
-
-            c.execute("SELECT date, amount, description FROM liabilities WHERE store_id = ?", (self.store_id,))
-            liabilities_data = c.fetchall()
-
-            c.execute("SELECT date, value, description FROM assets WHERE store_id = ?", (self.store_id,))
-            assets_data = c.fetchall()
-
-            conn.close()
-
-            with open('financial_report.csv', 'w', newline='') as f:
-                writer = csv.writer(f)
-
-                writer.writerow(["Capital"])
-                writer.writerow(["Date", "Amount", "Description"])
-                writer.writerows(capital_data)
-                writer.writerow([])
-
-                writer.writerow(["Income"])
-                writer.writerow(["Date", "Amount", "Description"])
-                writer.writerows(income_data)
-                writer.writerow([])
-
-                writer.writerow(["Expenses"])
-                writer.writerow(["Date", "Amount", "Category"])
-                writer.writerows(expenses_data)
-                writer.writerow([])
-
-                writer.writerow(["Liabilities"])
-                writer.writerow(["Date", "Amount", "Description"])
-                writer.writerows(liabilities_data)
-                writer.writerow([])
-
-                writer.writerow(["Assets"])
-                writer.writerow(["Date", "Value", "Description"])
-                writer.writerows(assets_data)
+        path, _ = QFileDialog.getSaveFileName(self, "Export Report", "financial_report.csv", "CSV Files (*.csv)")
+        if not path:
+            return
 
-            QMessageBox.information(self, "Success", "Report exported as financial_report.csv")
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to export report: {e}")
+        start_date = end_date = None
+        if self.date_range_check.isChecked():
+            start_date = self.start_date.date().toString("yyyy-MM-dd")
+            end_date = self.end_date.date().toString("yyyy-MM-dd")
+            if start_date > end_date:
+                QMessageBox.warning(self, "Invalid Range", "The start date must not be after the end date.")
+                return
+
+        self.export_button.setEnabled(False)
+        self.cancel_export_button.show()
+        self.export_runner.run(export_financial_report, self.store_id, path,
+                               start_date=start_date, end_date=end_date,
+                               on_result=self.report_exported, on_error=self.export_failed)
+
+    def cancel_export(self):
+        self.export_runner.cancel()
+        self.export_finished()
+
+    def export_finished(self):
+        self.export_button.setEnabled(True)
+        self.cancel_export_button.hide()
+
+    def report_exported(self, path):
+        self.export_finished()
+        QMessageBox.information(self, "Success", f"Report exported as {path}")
+
+    def export_failed(self, error):
+        self.export_finished()
+        QMessageBox.warning(self, "Error", f"Failed to export report: {error}")
 
 if __name__ == '__main__':
     app = QApplication(sys.argv)
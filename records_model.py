@@ -0,0 +1,190 @@
+from decimal import Decimal
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+from categories import category_id, category_name
+from db import get_connection
+from money import from_paise, to_paise
+from schema import VALUE_COLUMNS, day_number
+from search import matching_ids_clause, search_entries
+
+# Rows pulled per query. The view asks for another page only when the user
+# scrolls near the end of what is already loaded.
+PAGE_SIZE = 200
+
+RECORD_COLUMNS = {
+    "expenses": [("id", "ID"), ("date", "Date"), ("amount", "Amount"), ("category_id", "Category")],
+    "assets": [("id", "ID"), ("date", "Date"), ("asset_name", "Asset Name"), ("value", "Value"), ("category_id", "Category")],
+    "liabilities": [("id", "ID"), ("date", "Date"), ("liability_name", "Liability Name"), ("amount", "Amount"), ("category_id", "Category")],
+    "capital": [("id", "ID"), ("date", "Date"), ("amount", "Amount"), ("description", "Description")],
+    "income": [("id", "ID"), ("date", "Date"), ("amount", "Amount"), ("description", "Description")],
+}
+
+# Pseudo-module that searches every ledger table at once, best match first.
+ALL_MODULES = "all modules"
+RECORD_COLUMNS[ALL_MODULES] = [("module", "Module"), ("id", "ID"), ("date", "Date"),
+                               ("value", "Amount/Value"), ("body", "Details")]
+
+DATE_COLUMN = 1
+
+
+def shown_value(table, column, value):
+    # Amounts are read as paise and categories as ids; the table shows
+    # rupees and names.
+    if column == VALUE_COLUMNS[table]:
+        return from_paise(value)
+    if column == "category_id":
+        return category_name(value)
+    return value
+
+
+def keyset_clause(column, value, last_id, descending):
+    # Rows strictly after (value, last_id) in ORDER BY column, id. SQLite
+    # sorts NULLs first, so they need their own branch.
+    if column == "id":
+        return ("id < ?" if descending else "id > ?"), [last_id]
+    if descending:
+        if value is None:
+            return f"({column} IS NULL AND id < ?)", [last_id]
+        return f"(({column}, id) < (?, ?) OR {column} IS NULL)", [value, last_id]
+    if value is None:
+        return f"(({column} IS NULL AND id > ?) OR {column} IS NOT NULL)", [last_id]
+    return f"({column}, id) > (?, ?)", [value, last_id]
+
+
+def fetch_page(table, store_id, search_text, sort_column, descending, last_row, offset, token):
+    # Runs on a pool thread and returns the page after ``last_row``.
+    conn = get_connection()
+    if table == ALL_MODULES:
+        # Ranked results have no stable key to continue from, so these
+        # pages use an offset; only the first few are normally looked at.
+        return search_entries(store_id, search_text, PAGE_SIZE, offset, conn)
+
+    columns = RECORD_COLUMNS[table]
+    sort_key = columns[sort_column][0]
+    # Dates sort by the indexed day_number, which orders them the same way.
+    if sort_key == "date":
+        sort_key = "day_number"
+    where = ["store_id = ?"]
+    params = [store_id]
+
+    search = matching_ids_clause(search_text, store_id, table)
+    if search is not None:
+        where.append(search[0])
+        params.extend(search[1])
+
+    # Keyset pagination: continue after the last loaded row instead of
+    # using OFFSET, so every page costs the same however deep it is.
+    if last_row is not None:
+        value = last_row[sort_column]
+        if sort_key == "day_number" and value is not None:
+            value = day_number(value)
+        elif sort_key == VALUE_COLUMNS[table] and value is not None:
+            value = to_paise(value)
+        elif sort_key == "category_id" and value is not None:
+            value = category_id(table, value)
+        clause, clause_params = keyset_clause(sort_key, value, last_row[0], descending)
+        where.append(clause)
+        params.extend(clause_params)
+
+    direction = "DESC" if descending else "ASC"
+    order_by = f"id {direction}" if sort_key == "id" else f"{sort_key} {direction}, id {direction}"
+    select = ", ".join(name for name, _ in columns)
+    c = conn.execute(
+        f"SELECT {select} FROM {table} WHERE {' AND '.join(where)} ORDER BY {order_by} LIMIT ?",
+        params + [PAGE_SIZE])
+    names = [name for name, _ in columns]
+    return [tuple(shown_value(table, name, value) for name, value in zip(names, row)) for row in c.fetchall()]
+
+
+class RecordsModel(QAbstractTableModel):
+    error = pyqtSignal(str)
+
+    def __init__(self, runner, parent=None):
+        super().__init__(parent)
+        self.runner = runner
+        self.table = None
+        self.store_id = None
+        self.search_text = ""
+        self.columns = []
+        self.rows = []
+        self.sort_column = DATE_COLUMN
+        self.descending = True
+        self.exhausted = True
+        self.loading = False
+
+    def load(self, table, store_id, search_text=""):
+        self.beginResetModel()
+        if table != self.table:
+            self.sort_column = DATE_COLUMN
+            self.descending = True
+        self.table = table
+        self.store_id = store_id
+        self.search_text = search_text
+        self.columns = RECORD_COLUMNS[table]
+        self.rows = []
+        self.exhausted = False
+        self.loading = False
+        self.runner.cancel()
+        self.endResetModel()
+        self.fetchMore(QModelIndex())
+
+    def reload(self):
+        if self.table is not None:
+            self.load(self.table, self.store_id, self.search_text)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == Qt.DisplayRole:
+            return "" if value is None else str(value)
+        if role == Qt.TextAlignmentRole and isinstance(value, (int, float, Decimal)):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal and section < len(self.columns):
+            return self.columns[section][1]
+        return super().headerData(section, orientation, role)
+
+    def entry_id(self, row):
+        return self.rows[row][1 if self.table == ALL_MODULES else 0]
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted and not self.loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self.loading = True
+        last_row = self.rows[-1] if self.rows else None
+        self.runner.run(fetch_page, self.table, self.store_id, self.search_text, self.sort_column,
+                        self.descending, last_row, len(self.rows),
+                        on_result=self.page_loaded, on_error=self.page_failed)
+
+    def page_loaded(self, page):
+        self.loading = False
+        if len(page) < PAGE_SIZE:
+            self.exhausted = True
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def page_failed(self, error):
+        self.loading = False
+        self.exhausted = True
+        self.error.emit(error)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.sort_column = column
+        self.descending = order == Qt.DescendingOrder
+        if self.table != ALL_MODULES:
+            self.reload()
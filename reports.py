@@ -0,0 +1,101 @@
+import datetime
+from array import array
+from collections import namedtuple
+
+from db import get_connection
+from money import from_paise
+from schema import month_key
+from summary import VersionedCache, ledger_version, load_summary, store_filter
+
+# Report computations shared by the windows and the storebook command line.
+# Nothing here imports PyQt, so reports can run without a display.
+
+# Monthly series are memoized per (store, first month, last month) and reused
+# until the store's ledger version changes.
+SERIES_CACHE_SIZE = 32
+_series_cache = VersionedCache(SERIES_CACHE_SIZE)
+
+# income and expenses are int64 arrays of paise, one per period.
+MonthlySeries = namedtuple('MonthlySeries', 'periods labels income expenses')
+
+# Lines of the profit/loss statement, as (label, summary field).
+PROFIT_LOSS_LINES = [
+    ("Total Capital", "capital"),
+    ("Total Income", "income"),
+    ("Total Expenses", "expenses"),
+    ("Total Liabilities", "liabilities"),
+    ("Total Assets Value", "assets"),
+    ("Net Balance (Profit/Loss)", "net_profit"),
+]
+
+
+def add_months(year, month, delta):
+    index = year * 12 + month - 1 + delta
+    return index // 12, index % 12 + 1
+
+
+def month_range(start, end):
+    months = []
+    while start <= end:
+        months.append(start)
+        start = add_months(*start, 1)
+    return months
+
+
+def horizon_range(horizon, today):
+    end = (today.year, today.month)
+    if horizon == "ytd":
+        return (today.year, 1), end
+    return add_months(*end, 1 - horizon), end
+
+
+def profit_loss(store_id, user_id=None, conn=None):
+    # Returns [(label, Decimal rupees)] in statement order.
+    summary = load_summary(store_id, user_id, conn)
+    return [(label, from_paise(getattr(summary, field))) for label, field in PROFIT_LOSS_LINES]
+
+
+def monthly_series(store_id, start, end, conn=None, user_id=None):
+    # Income and expense totals for every month from start to end, all of
+    # them from a single grouped query over the rollup. store_id 0 with a
+    # user_id adds up all of the user's stores.
+    months = month_range(start, end)
+    if not months:
+        return MonthlySeries([], [], array('q'), array('q'))
+    if conn is None:
+        conn = get_connection()
+    key = (store_id, user_id, start, end)
+    version = ledger_version(store_id, user_id, conn)
+    series = _series_cache.get(key, version)
+    if series is not None:
+        return series
+
+    periods = ["%04d-%02d" % month for month in months]
+    keys = [month_key(*month) for month in months]
+    where, params = store_filter(store_id, user_id)
+    c = conn.execute(f"""
+        SELECT period, module, SUM(total) FROM ledger_rollup
+        WHERE {where} AND module IN ('income', 'expenses') AND period >= ? AND period <= ?
+        GROUP BY period, module
+    """, params + (keys[0], keys[-1]))
+    monthly = {(period, module): total for period, module, total in c.fetchall()}
+
+    label_format = "%b %Y" if len(months) <= 12 else "%b %y"
+    series = MonthlySeries(
+        periods=periods,
+        labels=[datetime.date(year, month, 1).strftime(label_format) for year, month in months],
+        income=array('q', (monthly.get((key, "income"), 0) for key in keys)),
+        expenses=array('q', (monthly.get((key, "expenses"), 0) for key in keys)),
+    )
+    _series_cache.put(key, version, series)
+    return series
+
+
+def list_stores(user_id=None, conn=None):
+    if conn is None:
+        conn = get_connection()
+    if user_id is None:
+        c = conn.execute("SELECT id, store_name, user_id FROM stores ORDER BY id")
+    else:
+        c = conn.execute("SELECT id, store_name, user_id FROM stores WHERE user_id = ? ORDER BY id", (user_id,))
+    return c.fetchall()
@@ -0,0 +1,870 @@
+import datetime
+import hashlib
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+
+from db import get_connection
+
+LEDGER_TABLES = ['income', 'expenses', 'capital', 'assets', 'liabilities']
+
+# Rows touched per write transaction by the chunked backfills, so a large
+# upgrade never holds the write lock for more than a moment at a time.
+BACKFILL_CHUNK_SIZE = 5000
+
+# Dates are stored as ISO text (YYYY-MM-DD) or NULL. The check rejects
+# anything else at write time, impossible days included, since date() only
+# normalises 2024-02-30 once a modifier is applied.
+DATE_COLUMN = "date TEXT CONSTRAINT valid_date CHECK (date IS NULL OR date IS date(date, '+0 days'))"
+
+# Integer forms of the date, computed by SQLite on every write: days since
+# 1970-01-01 for range scans, and YYYYMM for monthly buckets.
+DATE_KEY_COLUMNS = """
+            day_number INTEGER GENERATED ALWAYS AS (CAST(julianday(date) - 2440587.5 AS INTEGER)) STORED,
+            month_key INTEGER GENERATED ALWAYS AS (CAST(strftime('%Y%m', date) AS INTEGER)) STORED,"""
+
+
+def money_column(name):
+    # Whole paise (see money.py). Anything but an integer, a float that
+    # slipped through unconverted included, is rejected at write time.
+    return f"{name} INTEGER CONSTRAINT whole_paise CHECK (typeof({name}) IN ('integer', 'null'))"
+
+
+TABLES = {
+    'users': """
+        CREATE TABLE IF NOT EXISTS users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT UNIQUE,
+            password TEXT,
+            email TEXT,
+            birth_date TEXT
+        )
+    """,
+    'stores': """
+        CREATE TABLE IF NOT EXISTS stores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            store_name TEXT,
+            FOREIGN KEY(user_id) REFERENCES users(id)
+        )
+    """,
+    'store_details': """
+        CREATE TABLE IF NOT EXISTS store_details (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            username TEXT,
+            storename TEXT,
+            storetype TEXT,
+            ownername TEXT
+        )
+    """,
+    'categories': """
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY,
+            module TEXT NOT NULL,
+            name TEXT NOT NULL COLLATE NOCASE,
+            UNIQUE (module, name)
+        )
+    """,
+    'income': f"""
+        CREATE TABLE IF NOT EXISTS income (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {DATE_COLUMN},
+            {money_column('amount')},
+            category_id INTEGER REFERENCES categories(id),
+            description TEXT,
+            store_id INTEGER,{DATE_KEY_COLUMNS}
+            content_hash BLOB,
+            FOREIGN KEY(store_id) REFERENCES stores(id)
+        )
+    """,
+    'expenses': f"""
+        CREATE TABLE IF NOT EXISTS expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {DATE_COLUMN},
+            {money_column('amount')},
+            category_id INTEGER REFERENCES categories(id),
+            store_id INTEGER,{DATE_KEY_COLUMNS}
+            content_hash BLOB,
+            FOREIGN KEY(store_id) REFERENCES stores(id)
+        )
+    """,
+    'capital': f"""
+        CREATE TABLE IF NOT EXISTS capital (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {DATE_COLUMN},
+            {money_column('amount')},
+            description TEXT,
+            store_id INTEGER,{DATE_KEY_COLUMNS}
+            content_hash BLOB,
+            FOREIGN KEY(store_id) REFERENCES stores(id)
+        )
+    """,
+    'assets': f"""
+        CREATE TABLE IF NOT EXISTS assets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {DATE_COLUMN},
+            asset_name TEXT,
+            {money_column('value')},
+            category_id INTEGER REFERENCES categories(id),
+            description TEXT,
+            store_id INTEGER,{DATE_KEY_COLUMNS}
+            content_hash BLOB,
+            FOREIGN KEY(store_id) REFERENCES stores(id)
+        )
+    """,
+    'liabilities': f"""
+        CREATE TABLE IF NOT EXISTS liabilities (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            {DATE_COLUMN},
+            liability_name TEXT,
+            {money_column('amount')},
+            category_id INTEGER REFERENCES categories(id),
+            description TEXT,
+            store_id INTEGER,{DATE_KEY_COLUMNS}
+            content_hash BLOB,
+            FOREIGN KEY(store_id) REFERENCES stores(id)
+        )
+    """,
+}
+
+# Columns that older databases may be missing because they were created before
+# the column was introduced (see the old migrate/repair scripts). Only tables
+# that already existed are patched.
+ADDED_COLUMNS = {
+    'users': [('email', 'TEXT'), ('birth_date', 'TEXT')],
+    'income': [('category', 'TEXT'), ('description', 'TEXT'), ('store_id', 'INTEGER')],
+    'expenses': [('category', 'TEXT'), ('store_id', 'INTEGER')],
+    'capital': [('description', 'TEXT'), ('store_id', 'INTEGER')],
+    'assets': [('category', 'TEXT'), ('description', 'TEXT'), ('store_id', 'INTEGER')],
+    'liabilities': [('category', 'TEXT'), ('description', 'TEXT'), ('store_id', 'INTEGER')],
+}
+
+# Column holding the money figure of each ledger table.
+VALUE_COLUMNS = {
+    'income': 'amount',
+    'expenses': 'amount',
+    'capital': 'amount',
+    'assets': 'value',
+    'liabilities': 'amount',
+}
+
+# Columns hashed into content_hash, in this order: what an imported row is
+# compared on to tell whether the ledger already holds it.
+HASH_COLUMNS = {
+    'income': ['date', 'amount', 'category_id', 'description'],
+    'expenses': ['date', 'amount', 'category_id'],
+    'capital': ['date', 'amount', 'description'],
+    'assets': ['date', 'asset_name', 'value', 'category_id', 'description'],
+    'liabilities': ['date', 'liability_name', 'amount', 'category_id', 'description'],
+}
+
+_EPOCH = datetime.date(1970, 1, 1).toordinal()
+
+
+def day_number(iso_date):
+    # The day_number SQLite stores for an ISO date, for range parameters.
+    return datetime.date.fromisoformat(iso_date).toordinal() - _EPOCH
+
+
+def month_key(year, month):
+    return year * 100 + month
+
+
+def content_hash(values):
+    # Identifies an entry by the HASH_COLUMNS values, in order, so a row
+    # already in the ledger is recognised however it got there. Every write
+    # to a ledger table stores it; the import looks rows up by it.
+    parts = ['' if value is None else str(value).strip().casefold() for value in values]
+    return hashlib.blake2b("\x1f".join(parts).encode('utf-8'), digest_size=16).digest()
+
+
+def entry_content_hash(conn, table, entry_id, changes):
+    # content_hash of an existing entry once ``changes`` ({column: value})
+    # are applied to it, for edits; None if there is no such entry.
+    columns = HASH_COLUMNS[table]
+    row = conn.execute(f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (entry_id,)).fetchone()
+    if row is None:
+        return None
+    values = dict(zip(columns, row))
+    values.update(changes)
+    return content_hash([values[column] for column in columns])
+
+
+# (store_id, day_number) turns date ranges into a seek and returns them in
+# (day_number, id) order, as the exports and the records pages read them;
+# (store_id, month_key, value) serves the per-store totals and the monthly
+# buckets from the index alone, and (store_id, category_id, value) does the
+# same for the per-category GROUP BYs without a temp b-tree.
+INDEXES = [
+    f"CREATE INDEX IF NOT EXISTS idx_{table}_store_day ON {table}(store_id, day_number)"
+    for table in LEDGER_TABLES
+] + [
+    f"CREATE INDEX IF NOT EXISTS idx_{table}_store_month ON {table}(store_id, month_key, {VALUE_COLUMNS[table]})"
+    for table in LEDGER_TABLES
+] + [
+    f"CREATE INDEX IF NOT EXISTS idx_{table}_store_category ON {table}(store_id, category_id, {VALUE_COLUMNS[table]})"
+    for table in LEDGER_TABLES if table != 'capital'
+] + [
+    # The import counts a file's rows already in the ledger one hash at a
+    # time, whatever the date span of the file.
+    f"CREATE INDEX IF NOT EXISTS idx_{table}_store_hash ON {table}(store_id, content_hash)"
+    for table in LEDGER_TABLES
+] + [
+    # "All Stores" starts from a user's stores; this lists them in id order
+    # without touching the table.
+    "CREATE INDEX IF NOT EXISTS idx_stores_user ON stores(user_id, id, store_name)",
+]
+
+
+# Category each ledger table is rolled up by; capital has none.
+CATEGORY_COLUMNS = {
+    'income': 'category_id',
+    'expenses': 'category_id',
+    'capital': None,
+    'assets': 'category_id',
+    'liabilities': 'category_id',
+}
+
+# Categories every new database starts with, in the order the entry forms list
+# them. Users can add, rename and remove categories from there on.
+DEFAULT_CATEGORIES = {
+    'income': ["Sales", "Services", "Commission", "Rent Received", "Other"],
+    'expenses': ["Rent", "Electricity", "Purchase", "Salary", "Other"],
+    'assets': ["Property", "Vehicle", "Machinery", "Investments", "Other"],
+    'liabilities': ["Loan", "Mortgage", "Credit Card", "Other"],
+}
+
+
+def category_name_sql(ref):
+    return f"(SELECT name FROM categories WHERE id = {ref}.category_id)"
+
+# Per-store, per-month, per-category totals of every ledger table. Triggers on
+# the ledger tables keep it exact, so summaries read a handful of rollup rows
+# instead of summing every transaction. period is the entries' month_key, or 0
+# for undated entries, and category_id is 0 for entries without a category.
+ROLLUP_TABLE = """
+    CREATE TABLE IF NOT EXISTS ledger_rollup (
+        store_id INTEGER NOT NULL,
+        module TEXT NOT NULL,
+        period INTEGER NOT NULL,
+        category_id INTEGER NOT NULL,
+        total INTEGER NOT NULL DEFAULT 0,
+        count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (store_id, module, period, category_id)
+    ) WITHOUT ROWID
+"""
+
+
+def _rollup_key(table, row):
+    category = CATEGORY_COLUMNS[table]
+    category_expr = f"COALESCE({row}.{category}, 0)" if category else "0"
+    return f"{row}.store_id, '{table}', COALESCE({row}.month_key, 0), {category_expr}"
+
+
+def _rollup_triggers(table):
+    value = VALUE_COLUMNS[table]
+    add = f"""
+            INSERT INTO ledger_rollup (store_id, module, period, category_id, total, count)
+            VALUES ({_rollup_key(table, 'new')}, COALESCE(new.{value}, 0), 1)
+            ON CONFLICT (store_id, module, period, category_id)
+            DO UPDATE SET total = total + excluded.total, count = count + 1;"""
+    remove = f"""
+            UPDATE ledger_rollup SET total = total - COALESCE(old.{value}, 0), count = count - 1
+            WHERE (store_id, module, period, category_id) = ({_rollup_key(table, 'old')});
+            DELETE FROM ledger_rollup
+            WHERE (store_id, module, period, category_id) = ({_rollup_key(table, 'old')}) AND count <= 0;"""
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_insert AFTER INSERT ON {table}
+            WHEN new.store_id IS NOT NULL
+            BEGIN{add}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_delete AFTER DELETE ON {table}
+            WHEN old.store_id IS NOT NULL
+            BEGIN{remove}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_update_old AFTER UPDATE ON {table}
+            WHEN old.store_id IS NOT NULL
+            BEGIN{remove}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_rollup_update_new AFTER UPDATE ON {table}
+            WHEN new.store_id IS NOT NULL
+            BEGIN{add}
+            END""",
+    ]
+
+
+# Free-text columns of each ledger table that the search box matches.
+SEARCH_TEXT_COLUMNS = {
+    'income': ['category', 'description'],
+    'expenses': ['category'],
+    'capital': ['description'],
+    'assets': ['asset_name', 'category', 'description'],
+    'liabilities': ['liability_name', 'category', 'description'],
+}
+
+# Full-text index over every ledger table. module and store_id are indexed
+# too, so a search narrowed to one store or module is a single MATCH. Each
+# entry's rowid is id * 8 + the table's position in LEDGER_TABLES, which
+# lets the triggers find it again without a scan.
+SEARCH_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ledger_search USING fts5(
+        body, module, store_id,
+        prefix = '2 3',
+        tokenize = 'unicode61 remove_diacritics 2'
+    )
+"""
+
+
+def search_rowid(table, id_expr):
+    return f"({id_expr}) * 8 + {LEDGER_TABLES.index(table)}"
+
+
+def _text_column(ref, column):
+    # Category names are looked up; every other text column is in the row.
+    return category_name_sql(ref) if column == 'category' else f"{ref}.{column}"
+
+
+def _search_body(table, row=None):
+    ref = row or table
+    return " || ' ' || ".join(f"COALESCE({_text_column(ref, col)}, '')" for col in SEARCH_TEXT_COLUMNS[table])
+
+
+def _search_triggers(table):
+    remove = f"""
+            DELETE FROM ledger_search WHERE rowid = {search_rowid(table, 'old.id')};"""
+    add = f"""
+            INSERT INTO ledger_search (rowid, body, module, store_id)
+            SELECT {search_rowid(table, 'new.id')}, {_search_body(table, 'new')}, '{table}', new.store_id
+            WHERE new.store_id IS NOT NULL;"""
+    # Updates need the old entry gone before the new one goes in; one trigger
+    # keeps that order, as SQLite runs separate triggers newest first.
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_search_insert AFTER INSERT ON {table}
+            BEGIN{add}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_search_delete AFTER DELETE ON {table}
+            BEGIN{remove}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_search_update AFTER UPDATE ON {table}
+            BEGIN{remove}{add}
+            END""",
+    ]
+
+
+# Per-store counter bumped by every ledger write. Cached results remember the
+# version they were computed at and are recomputed once it moves on.
+VERSIONS_TABLE = """
+    CREATE TABLE IF NOT EXISTS ledger_versions (
+        store_id INTEGER PRIMARY KEY,
+        version INTEGER NOT NULL
+    )
+"""
+
+
+def _bump_version(row):
+    return f"""
+            INSERT INTO ledger_versions (store_id, version)
+            SELECT {row}.store_id, 1 WHERE {row}.store_id IS NOT NULL
+            ON CONFLICT (store_id) DO UPDATE SET version = version + 1;"""
+
+
+def _version_triggers(table):
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_version_insert AFTER INSERT ON {table}
+            BEGIN{_bump_version('new')}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_version_delete AFTER DELETE ON {table}
+            BEGIN{_bump_version('old')}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_version_update AFTER UPDATE ON {table}
+            BEGIN{_bump_version('old')}{_bump_version('new')}
+            END""",
+    ]
+
+
+# Text each ledger table shows next to its amount in the activity feed.
+JOURNAL_LABEL_COLUMNS = {
+    'income': 'description',
+    'expenses': 'category',
+    'capital': 'description',
+    'assets': 'asset_name',
+    'liabilities': 'liability_name',
+}
+
+# Every ledger entry of every module in one table, ordered by store and date.
+# The latest entries of a store, newest first, are a backward walk of the
+# primary key, and a page of an activity feed continues from the last
+# (date, id, module) shown. Undated entries are kept under '' so they sort
+# after every dated one.
+JOURNAL_TABLE = """
+    CREATE TABLE IF NOT EXISTS ledger_journal (
+        store_id INTEGER NOT NULL,
+        date TEXT NOT NULL,
+        id INTEGER NOT NULL,
+        module TEXT NOT NULL,
+        value INTEGER,
+        label TEXT,
+        PRIMARY KEY (store_id, date, id, module)
+    ) WITHOUT ROWID
+"""
+
+
+def _journal_row(table, row=None):
+    ref = row or table
+    return (f"{ref}.store_id, COALESCE({ref}.date, ''), {ref}.id, '{table}', "
+            f"{ref}.{VALUE_COLUMNS[table]}, {_text_column(ref, JOURNAL_LABEL_COLUMNS[table])}")
+
+
+def _journal_triggers(table):
+    remove = f"""
+            DELETE FROM ledger_journal
+            WHERE store_id = old.store_id AND date = COALESCE(old.date, '') AND id = old.id AND module = '{table}';"""
+    add = f"""
+            INSERT INTO ledger_journal (store_id, date, id, module, value, label)
+            SELECT {_journal_row(table, 'new')} WHERE new.store_id IS NOT NULL;"""
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_journal_insert AFTER INSERT ON {table}
+            BEGIN{add}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_journal_delete AFTER DELETE ON {table}
+            BEGIN{remove}
+            END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{table}_journal_update AFTER UPDATE ON {table}
+            BEGIN{remove}{add}
+            END""",
+    ]
+
+
+TRIGGERS = [
+    sql for table in LEDGER_TABLES
+    for sql in (_rollup_triggers(table) + _search_triggers(table) + _version_triggers(table)
+                + _journal_triggers(table))
+]
+
+ROLLUP_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_ledger_rollup_category ON ledger_rollup(store_id, module, category_id, total)",
+]
+
+
+class MigrationError(Exception):
+    pass
+
+
+Migration = namedtuple('Migration', 'version name apply')
+
+
+@contextmanager
+def transaction(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def table_columns(conn, table):
+    # table_xinfo, unlike table_info, also lists generated columns.
+    return {row[1] for row in conn.execute(f"PRAGMA table_xinfo({table})")}
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _progress(conn, task):
+    row = conn.execute("SELECT last_rowid FROM schema_progress WHERE task = ?", (task,)).fetchone()
+    return row[0] if row else 0
+
+
+def _save_progress(conn, task, last_rowid):
+    conn.execute(
+        "INSERT INTO schema_progress (task, last_rowid) VALUES (?, ?) "
+        "ON CONFLICT(task) DO UPDATE SET last_rowid = excluded.last_rowid",
+        (task, last_rowid))
+
+
+def _chunk_end(conn, table, last_rowid, chunk_size):
+    return conn.execute(
+        f"SELECT MAX(rowid) FROM (SELECT rowid FROM {table} WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+        (last_rowid, chunk_size)).fetchone()[0]
+
+
+def backfill(conn, task, table, set_clause, where="1", params=(), chunk_size=BACKFILL_CHUNK_SIZE):
+    # Applies an UPDATE over ``table`` in rowid order, one bounded chunk per
+    # transaction. The last rowid done is saved with each chunk, so an
+    # interrupted run picks up where it stopped instead of starting over.
+    last_rowid = _progress(conn, task)
+    updated = 0
+    while True:
+        upper = _chunk_end(conn, table, last_rowid, chunk_size)
+        if upper is None:
+            break
+        with transaction(conn):
+            c = conn.execute(
+                f"UPDATE {table} SET {set_clause} WHERE ({where}) AND rowid > ? AND rowid <= ?",
+                (*params, last_rowid, upper))
+            updated += c.rowcount
+            _save_progress(conn, task, upper)
+        last_rowid = upper
+    return updated
+
+
+def _create_base_tables(conn):
+    with transaction(conn):
+        old_tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for sql in TABLES.values():
+            conn.execute(sql)
+        for table, columns in ADDED_COLUMNS.items():
+            if table not in old_tables:
+                continue
+            existing = table_columns(conn, table)
+            for name, col_type in columns:
+                if name not in existing:
+                    print(f"Adding {name} column to {table}")
+                    conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {col_type}")
+
+
+def _assign_default_store(conn):
+    row = conn.execute("SELECT id FROM stores ORDER BY id LIMIT 1").fetchone()
+    default_store_id = row[0] if row else 1
+    for table in LEDGER_TABLES:
+        updated = backfill(conn, f"assign_default_store:{table}", table,
+                           "store_id = ?", "store_id IS NULL", (default_store_id,))
+        if updated:
+            print(f"Assigned store {default_store_id} to {updated} {table} rows")
+
+
+def _seed_default_admin(conn):
+    with transaction(conn):
+        if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+            print("Initializing default admin user")
+            conn.execute("INSERT INTO users (username, password, email, birth_date) VALUES (?, ?, ?, ?)",
+                         ("admin", "Pass12!@", "admin@example.com", "1990-01-01"))
+            conn.execute("INSERT INTO stores (user_id, store_name) VALUES (?, ?)", (1, "Test Store"))
+
+
+def _create_rollup_table(conn):
+    with transaction(conn):
+        conn.execute(ROLLUP_TABLE)
+
+
+def _create_search_table(conn):
+    with transaction(conn):
+        conn.execute(SEARCH_TABLE)
+
+
+def _create_versions_table(conn):
+    with transaction(conn):
+        conn.execute(VERSIONS_TABLE)
+
+
+def _create_journal_table(conn):
+    with transaction(conn):
+        conn.execute(JOURNAL_TABLE)
+
+
+def _repair_date(text):
+    # Dates the importer can read (05/03/2024 and the like) as ISO dates,
+    # anything else as NULL.
+    from importer import parse_date
+    try:
+        return parse_date(str(text))
+    except ValueError:
+        return None
+
+
+def _legacy_paise(rupees):
+    # REAL columns keep text that does not look like a number as it was
+    # typed. Such amounts are read as money where possible; anything else,
+    # out-of-range numbers included, is NULL.
+    from money import parse_money, to_paise
+    try:
+        return to_paise(parse_money(rupees) if isinstance(rupees, str) else rupees)
+    except ValueError:
+        return None
+
+
+def _seed_categories(conn):
+    # Adds the default categories and every category text already used by
+    # the ledger, once each, ignoring case.
+    with transaction(conn):
+        conn.execute(TABLES['categories'])
+        for module, names in DEFAULT_CATEGORIES.items():
+            conn.executemany("INSERT OR IGNORE INTO categories (module, name) VALUES (?, ?)",
+                             [(module, name) for name in names])
+        for table in LEDGER_TABLES:
+            if 'category' in table_columns(conn, table):
+                conn.execute(f"INSERT OR IGNORE INTO categories (module, name) "
+                             f"SELECT DISTINCT '{table}', TRIM(category) FROM {table} WHERE TRIM(category) <> ''")
+
+
+def _rebuild_table(conn, table, chunk_size=BACKFILL_CHUNK_SIZE):
+    # Column types and generated columns cannot be changed with ALTER TABLE,
+    # so the rows are copied into a table created from the current
+    # definition, a chunk per transaction, which then takes the old table's
+    # place. Rupee amounts from REAL columns are converted to paise on the
+    # way, and category text is replaced by its id in categories. Dates that
+    # are not ISO and amounts typed as text are repaired in the copy too, or
+    # cleared with the original text kept in rejected_dates or
+    # rejected_amounts: the old table is only read, since its columns may
+    # still be NOT NULL.
+    _seed_categories(conn)
+    conn.create_function("repair_date", 1, _repair_date, deterministic=True)
+    conn.create_function("legacy_paise", 1, _legacy_paise, deterministic=True)
+    rebuilt = f"{table}_rebuilt"
+    task = f"rebuild:{table}"
+    last_rowid = _progress(conn, task)
+    old_columns = {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+    money = VALUE_COLUMNS[table]
+    convert_money = old_columns.get(money, 'INTEGER') != 'INTEGER'
+    bad_date = "date IS NOT NULL AND date IS NOT date(date, '+0 days')"
+    bad_amount = f"{money} IS NOT NULL AND legacy_paise({money}) IS NULL"
+    bad_dates = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE rowid > ? AND {bad_date}",
+                             (last_rowid,)).fetchone()[0]
+    bad_amounts = 0
+    if convert_money:
+        bad_amounts = conn.execute(f"SELECT COUNT(*) FROM {table} WHERE rowid > ? AND {bad_amount}",
+                                   (last_rowid,)).fetchone()[0]
+    with transaction(conn):
+        if not last_rowid:
+            conn.execute(f"DROP TABLE IF EXISTS {rebuilt}")
+        conn.execute(TABLES[table].replace(f" {table} (", f" {rebuilt} (", 1))
+        if bad_dates:
+            conn.execute("CREATE TABLE IF NOT EXISTS rejected_dates (module TEXT, id INTEGER, date TEXT)")
+        if bad_amounts:
+            conn.execute("CREATE TABLE IF NOT EXISTS rejected_amounts (module TEXT, id INTEGER, amount TEXT)")
+
+    sources = {}
+    for name in (row[1] for row in conn.execute(f"PRAGMA table_info({rebuilt})")):
+        if name == money and convert_money:
+            sources[name] = f"legacy_paise({name})"
+        elif name == 'date' and bad_dates:
+            sources[name] = f"CASE WHEN {bad_date} THEN repair_date(date) ELSE date END"
+        elif name in old_columns:
+            sources[name] = name
+        elif name == 'category_id' and 'category' in old_columns:
+            sources[name] = (f"(SELECT id FROM categories WHERE module = '{table}' "
+                             f"AND name = NULLIF(TRIM({table}.category), ''))")
+    columns = ", ".join(sources)
+    values = ", ".join(sources.values())
+    while True:
+        upper = _chunk_end(conn, table, last_rowid, chunk_size)
+        if upper is None:
+            break
+        with transaction(conn):
+            if bad_dates:
+                conn.execute(f"INSERT INTO rejected_dates (module, id, date) SELECT '{table}', id, date FROM {table} "
+                             f"WHERE rowid > ? AND rowid <= ? AND {bad_date} AND repair_date(date) IS NULL",
+                             (last_rowid, upper))
+            if bad_amounts:
+                conn.execute(f"INSERT INTO rejected_amounts (module, id, amount) "
+                             f"SELECT '{table}', id, CAST({money} AS TEXT) FROM {table} "
+                             f"WHERE rowid > ? AND rowid <= ? AND {bad_amount}", (last_rowid, upper))
+            conn.execute(f"INSERT INTO {rebuilt} ({columns}) SELECT {values} FROM {table} "
+                         f"WHERE rowid > ? AND rowid <= ?", (last_rowid, upper))
+            _save_progress(conn, task, upper)
+        last_rowid = upper
+
+    with transaction(conn):
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        conn.execute(f"DROP TABLE {table}")
+        conn.execute(f"ALTER TABLE {rebuilt} RENAME TO {table}")
+        # Keep AUTOINCREMENT from handing out the ids of deleted rows again.
+        if row:
+            conn.execute("DELETE FROM sqlite_sequence WHERE name = ?", (table,))
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES (?, ?)",
+                         (table, max(row[0], last_rowid)))
+        conn.execute("DELETE FROM schema_progress WHERE task = ?", (task,))
+    if bad_dates:
+        print(f"Repaired {bad_dates} dates in {table}")
+    if bad_amounts:
+        print(f"Cleared {bad_amounts} unreadable amounts in {table}")
+    print(f"Rebuilt {table}")
+
+
+@contextmanager
+def foreign_keys_off(conn):
+    # Foreign keys are off while tables are swapped, as SQLite's documented
+    # procedure for changing a table's definition requires.
+    conn.execute("PRAGMA foreign_keys = OFF")
+    try:
+        yield conn
+    finally:
+        conn.execute("PRAGMA foreign_keys = ON")
+
+
+def _add_date_keys(conn):
+    with foreign_keys_off(conn):
+        for table in LEDGER_TABLES:
+            if 'day_number' not in table_columns(conn, table):
+                _rebuild_table(conn, table)
+        with transaction(conn):
+            # The rollup is re-keyed by month_key and refilled afterwards.
+            conn.execute("DROP TABLE IF EXISTS ledger_rollup")
+            conn.execute(ROLLUP_TABLE)
+
+
+def _store_money_as_paise(conn):
+    with foreign_keys_off(conn):
+        for table in LEDGER_TABLES:
+            column_types = {row[1]: row[2].upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+            if column_types[VALUE_COLUMNS[table]] != 'INTEGER':
+                _rebuild_table(conn, table)
+        with transaction(conn):
+            # Both are refilled from the ledger tables afterwards.
+            conn.execute("DROP TABLE IF EXISTS ledger_rollup")
+            conn.execute(ROLLUP_TABLE)
+            conn.execute("DROP TABLE IF EXISTS ledger_journal")
+            conn.execute(JOURNAL_TABLE)
+
+
+def _move_categories_to_table(conn):
+    with foreign_keys_off(conn):
+        _seed_categories(conn)
+        for table in LEDGER_TABLES:
+            if 'category' in table_columns(conn, table):
+                _rebuild_table(conn, table)
+        with transaction(conn):
+            # The rollup is re-keyed by category_id and refilled afterwards.
+            conn.execute("DROP TABLE IF EXISTS ledger_rollup")
+            conn.execute(ROLLUP_TABLE)
+
+
+def rebuild_rollup(conn=None):
+    conn = conn or get_connection()
+    with transaction(conn):
+        conn.execute("DELETE FROM ledger_rollup")
+        for table in LEDGER_TABLES:
+            category = CATEGORY_COLUMNS[table]
+            category_expr = f"COALESCE({category}, 0)" if category else "0"
+            # A bare 0 in GROUP BY would be read as a column number.
+            group_by = f", {category_expr}" if category else ""
+            conn.execute(f"""
+                INSERT INTO ledger_rollup (store_id, module, period, category_id, total, count)
+                SELECT store_id, '{table}', COALESCE(month_key, 0), {category_expr},
+                       COALESCE(SUM({VALUE_COLUMNS[table]}), 0), COUNT(*)
+                FROM {table}
+                WHERE store_id IS NOT NULL
+                GROUP BY store_id, COALESCE(month_key, 0){group_by}
+            """)
+
+
+def rebuild_search_index(conn=None):
+    conn = conn or get_connection()
+    with transaction(conn):
+        conn.execute("DELETE FROM ledger_search")
+        for table in LEDGER_TABLES:
+            conn.execute(f"""
+                INSERT INTO ledger_search (rowid, body, module, store_id)
+                SELECT {search_rowid(table, 'id')}, {_search_body(table)}, '{table}', store_id
+                FROM {table}
+                WHERE store_id IS NOT NULL
+            """)
+        conn.execute("INSERT INTO ledger_search (ledger_search) VALUES ('optimize')")
+
+
+def rebuild_journal(conn=None):
+    conn = conn or get_connection()
+    with transaction(conn):
+        conn.execute("DELETE FROM ledger_journal")
+        for table in LEDGER_TABLES:
+            conn.execute(f"""
+                INSERT INTO ledger_journal (store_id, date, id, module, value, label)
+                SELECT {_journal_row(table)} FROM {table}
+                WHERE store_id IS NOT NULL
+            """)
+
+
+def _drop_triggers(conn):
+    with transaction(conn):
+        names = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+        for name in names:
+            conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def _add_content_hashes(conn):
+    conn.create_function("content_hash", -1, lambda *values: content_hash(values), deterministic=True)
+    for table in LEDGER_TABLES:
+        if 'content_hash' not in table_columns(conn, table):
+            with transaction(conn):
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN content_hash BLOB")
+        hashed = backfill(conn, f"hash:{table}", table,
+                          f"content_hash = content_hash({', '.join(HASH_COLUMNS[table])})",
+                          where="content_hash IS NULL")
+        print(f"Hashed {hashed} {table} entries")
+
+
+def _create_derived_objects(conn):
+    # Indexes, triggers and the rollup always match the latest table
+    # definitions, so they are rebuilt after every upgrade instead of being
+    # versioned alongside the table changes. Triggers are dropped while the
+    # migrations run, which is why the rollup, the search index and the
+    # journal are recomputed afterwards.
+    with transaction(conn):
+        for sql in INDEXES + ROLLUP_INDEXES + TRIGGERS:
+            conn.execute(sql)
+    rebuild_rollup(conn)
+    rebuild_search_index(conn)
+    rebuild_journal(conn)
+
+
+# Applied in order, each exactly once; PRAGMA user_version records the last
+# one that completed. Never edit or reorder a released migration, add a new
+# one instead.
+MIGRATIONS = [
+    Migration(1, "create base tables", _create_base_tables),
+    Migration(2, "assign default store to legacy ledger rows", _assign_default_store),
+    Migration(3, "seed default admin user", _seed_default_admin),
+    Migration(4, "create ledger rollup table", _create_rollup_table),
+    Migration(5, "create full-text search index", _create_search_table),
+    Migration(6, "track ledger versions per store", _create_versions_table),
+    Migration(7, "create ledger journal", _create_journal_table),
+    Migration(8, "add day and month keys to ledger tables", _add_date_keys),
+    Migration(9, "store money as integer paise", _store_money_as_paise),
+    Migration(10, "move categories into their own table", _move_categories_to_table),
+    Migration(11, "store entry content hashes for import de-duplication", _add_content_hashes),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def migrate(conn=None):
+    conn = conn or get_connection()
+    version = current_version(conn)
+    if version > SCHEMA_VERSION:
+        raise MigrationError(f"Database schema version {version} is newer than this application ({SCHEMA_VERSION}).")
+    if version == SCHEMA_VERSION:
+        return False
+
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_progress (task TEXT PRIMARY KEY, last_rowid INTEGER NOT NULL)")
+    _drop_triggers(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= version:
+            continue
+        print(f"Applying migration {migration.version}: {migration.name}")
+        migration.apply(conn)
+        with transaction(conn):
+            conn.execute(f"PRAGMA user_version = {migration.version}")
+    _create_derived_objects(conn)
+    with transaction(conn):
+        conn.execute("DELETE FROM schema_progress")
+    return True
+
+
+def ensure_schema(conn=None):
+    # Runs the migrations at most once per process. Once the schema is known
+    # to be current, later calls return without touching the database, and an
+    # up-to-date database is only ever read (PRAGMA user_version), never locked
+    # for writing.
+    global _schema_ready
+    if _schema_ready:
+        return
+    with _schema_lock:
+        if not _schema_ready:
+            migrate(conn)
+            _schema_ready = True
@@ -0,0 +1,60 @@
+import re
+
+from db import get_connection
+from money import from_paise
+from schema import LEDGER_TABLES, VALUE_COLUMNS
+
+
+def match_query(text, store_id=None, module=None):
+    # Every word the user typed must appear, each as a prefix, so results
+    # narrow as they type. Quotes and FTS operators in the input are dropped
+    # rather than interpreted.
+    terms = re.findall(r"\w+", text)
+    if not terms:
+        return None
+    parts = []
+    if store_id is not None:
+        parts.append(f'store_id : "{int(store_id)}"')
+    if module is not None:
+        parts.append(f'module : "{module}"')
+    parts.append("body : (" + " ".join(f'"{term}"*' for term in terms) + ")")
+    return " AND ".join(parts)
+
+
+def matching_ids_clause(text, store_id, module):
+    # SQL fragment (and params) restricting a ledger table query to the
+    # entries matching ``text``; None when there is nothing to search for.
+    match = match_query(text, store_id, module)
+    if match is None:
+        return None
+    return "id IN (SELECT rowid / 8 FROM ledger_search WHERE ledger_search MATCH ?)", [match]
+
+
+def search_entries(store_id, text, limit=50, offset=0, conn=None):
+    # Best matches first across every module, as (module, id, date, value,
+    # text) rows, value in Decimal rupees.
+    match = match_query(text, store_id)
+    if match is None:
+        return []
+    conn = conn or get_connection()
+    hits = conn.execute(
+        "SELECT rowid / 8, module, body FROM ledger_search WHERE ledger_search MATCH ? "
+        "ORDER BY bm25(ledger_search, 1.0, 0.0, 0.0) LIMIT ? OFFSET ?",
+        (match, limit, offset)).fetchall()
+
+    details = {}
+    for table in LEDGER_TABLES:
+        ids = [entry_id for entry_id, module, _ in hits if module == table]
+        if ids:
+            c = conn.execute(
+                f"SELECT id, date, {VALUE_COLUMNS[table]} FROM {table} WHERE id IN ({','.join('?' * len(ids))})",
+                ids)
+            for entry_id, date, value in c.fetchall():
+                details[(table, entry_id)] = (date, from_paise(value))
+
+    results = []
+    for entry_id, module, body in hits:
+        if (module, entry_id) in details:
+            date, value = details[(module, entry_id)]
+            results.append((module, entry_id, date, value, body.strip()))
+    return results
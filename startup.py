@@ -0,0 +1,48 @@
+import sys
+import time
+
+# Startup timeline, printed when StoreBook is launched with --profile-startup.
+# main.py imports this module first, so times are measured from (nearly) the
+# moment the interpreter starts running the application.
+
+PROFILE_FLAG = '--profile-startup'
+
+enabled = PROFILE_FLAG in sys.argv
+_start = time.perf_counter()
+_marks = []
+_reported = 0
+
+
+def mark(phase):
+    if enabled:
+        _marks.append((phase, time.perf_counter()))
+
+
+def report():
+    # Prints the phases marked since the last report, so a later milestone
+    # (the dashboard's first data) extends the timeline printed at first paint.
+    global _reported
+    if not enabled or _reported == len(_marks):
+        return
+    if not _reported:
+        print("Startup timeline (ms since launch, ms in phase):")
+    previous = _marks[_reported - 1][1] if _reported else _start
+    for phase, moment in _marks[_reported:]:
+        print(f"  {(moment - _start) * 1000:8.1f}  {(moment - previous) * 1000:+8.1f}  {phase}")
+        previous = moment
+    _reported = len(_marks)
+    sys.stdout.flush()
+
+
+def milestone(phase):
+    # Recorded the first time only; later refreshes are not part of startup.
+    if enabled and phase not in (name for name, _ in _marks):
+        mark(phase)
+        report()
+
+
+def note(text):
+    # Extra detail, outside the timeline, printed only when profiling.
+    if enabled:
+        print(f"  {text}")
+        sys.stdout.flush()
@@ -6,6 +6,8 @@ from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 import traceback
 
+from db import get_connection
+
 class StoreManagement(QWidget):
     def __init__(self, main_window=None, user_id=None):
         super().__init__()
@@ -98,8 +100,7 @@ class StoreManagement(QWidget):
 
     def load_stores(self):
         try:
-            conn = sqlite3.connect('database.db')
-            c = conn.cursor()
+            c = get_connection().cursor()
             c.execute("SELECT id, store_name FROM stores WHERE user_id = ?", (self.user_id,))
             stores = c.fetchall()
             self.store_combo.clear()
@@ -109,7 +110,6 @@ class StoreManagement(QWidget):
                 print(f"Loaded {len(stores)} stores for user_id {self.user_id}")
             else:
                 print(f"No stores found for user_id {self.user_id}")
-            conn.close()
         except sqlite3.Error as e:
             print(f"Error in load_stores: {traceback.format_exc()}")
             QMessageBox.warning(self, "Database Error", f"Failed to load stores: {e}\nCheck console for details.")
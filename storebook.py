@@ -0,0 +1,203 @@
+import argparse
+import csv
+import datetime
+import decimal
+import json
+import os
+import sqlite3
+import sys
+
+import db
+from cancel import Cancelled, CancelToken
+from export import write_financial_report
+from money import format_money, from_paise
+from reports import PROFIT_LOSS_LINES, horizon_range, list_stores, monthly_series, profit_loss
+from schema import SCHEMA_VERSION, current_version
+from summary import store_breakdown
+
+# Usage:
+#   python storebook.py stores [--user ID [--totals]]
+#   python storebook.py pl --store ID              (--store 0 --user ID for all of a user's stores)
+#   python storebook.py monthly --store ID [--user ID] [--months N | --ytd | --from YYYY-MM --to YYYY-MM]
+#   python storebook.py export --store ID [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--output FILE]
+#
+# Common options: --db PATH, --format text|csv|json, --timeout SECONDS.
+# Runs without PyQt, so it works from cron or over ssh.
+
+DEFAULT_MONTHS = 12
+
+
+def month_arg(text):
+    try:
+        date = datetime.datetime.strptime(text, "%Y-%m")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM, got '{text}'") from None
+    return date.year, date.month
+
+
+def positive_int(text):
+    try:
+        value = int(text)
+    except ValueError:
+        value = 0
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"expected a whole number of at least 1, got '{text}'")
+    return value
+
+
+def date_arg(text):
+    try:
+        return datetime.date.fromisoformat(text).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got '{text}'") from None
+
+
+def write_table(out, fmt, headers, keys, rows):
+    if fmt == 'json':
+        json.dump([dict(zip(keys, row)) for row in rows], out, indent=2, ensure_ascii=False, default=float)
+        out.write("\n")
+    elif fmt == 'csv':
+        writer = csv.writer(out)
+        writer.writerow(headers)
+        writer.writerows(rows)
+    else:
+        cells = [[f"{value:.2f}" if isinstance(value, decimal.Decimal) else str(value) for value in row] for row in rows]
+        widths = [max([len(header)] + [len(row[i]) for row in cells]) for i, header in enumerate(headers)]
+        out.write("  ".join(header.ljust(width) for header, width in zip(headers, widths)).rstrip() + "\n")
+        for row in cells:
+            out.write("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() + "\n")
+
+
+def run_stores(args, out, token):
+    if args.totals:
+        if args.user is None:
+            raise ValueError("--totals needs --user")
+        rows = [(store.store_id, store.store_name, *(from_paise(value) for value in store[2:]),
+                 from_paise(store.net_profit)) for store in store_breakdown(args.user)]
+        write_table(out, args.format, ["ID", "Store", "Income", "Expenses", "Capital", "Assets", "Liabilities", "Net"],
+                    ["id", "store_name", "income", "expenses", "capital", "assets", "liabilities", "net"], rows)
+        return
+    rows = list_stores(args.user)
+    write_table(out, args.format, ["ID", "Store", "User"], ["id", "store_name", "user_id"], rows)
+
+
+def run_profit_loss(args, out, token):
+    if args.store == 0 and args.user is None:
+        raise ValueError("--store 0 (all stores) needs --user")
+    lines = profit_loss(args.store, args.user)
+    if args.format == 'json':
+        report = {"store_id": args.store}
+        report.update((field, value) for (_, field), (_, value) in zip(PROFIT_LOSS_LINES, lines))
+        json.dump(report, out, indent=2, default=float)
+        out.write("\n")
+    elif args.format == 'csv':
+        write_table(out, 'csv', ["Line", "Amount"], None, lines)
+    else:
+        *totals, (net_label, net) = lines
+        for label, value in totals:
+            out.write(f"{label}: {format_money(value)}\n")
+        out.write("-----------------------------\n")
+        out.write(f"{net_label}: {format_money(net)}\n")
+
+
+def run_monthly(args, out, token):
+    if args.first or args.last:
+        if not (args.first and args.last):
+            raise ValueError("--from and --to must be given together")
+        start, end = min(args.first, args.last), max(args.first, args.last)
+    else:
+        start, end = horizon_range("ytd" if args.ytd else args.months, datetime.date.today())
+    if args.store == 0 and args.user is None:
+        raise ValueError("--store 0 (all stores) needs --user")
+    series = monthly_series(args.store, start, end, user_id=args.user)
+    rows = [(period, from_paise(income), from_paise(expenses), from_paise(income - expenses))
+            for period, income, expenses in zip(series.periods, series.income, series.expenses)]
+    write_table(out, args.format, ["Month", "Income", "Expenses", "Net"],
+                ["period", "income", "expenses", "net"], rows)
+
+
+def run_export(args, out, token):
+    # Always CSV, in the same layout as the Profit/Loss window's export.
+    if args.output:
+        with open(args.output, 'w', newline='') as f:
+            write_financial_report(f, args.store, token, args.first, args.last)
+    else:
+        write_financial_report(out, args.store, token, args.first, args.last)
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", default=db.DB_PATH, help="database file (default: %(default)s)")
+    common.add_argument("--format", choices=["text", "csv", "json"], default="text")
+    common.add_argument("--timeout", type=float, help="give up after this many seconds")
+
+    parser = argparse.ArgumentParser(prog="storebook", description="StoreBook reports without the GUI.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    stores = commands.add_parser("stores", parents=[common], help="list stores")
+    stores.add_argument("--user", type=int)
+    stores.add_argument("--totals", action="store_true", help="each store's totals (needs --user)")
+    stores.set_defaults(run=run_stores)
+
+    pl = commands.add_parser("pl", parents=[common], help="profit and loss totals")
+    pl.add_argument("--store", type=int, required=True)
+    pl.add_argument("--user", type=int)
+    pl.set_defaults(run=run_profit_loss)
+
+    monthly = commands.add_parser("monthly", parents=[common], help="monthly income and expenses")
+    monthly.add_argument("--store", type=int, required=True)
+    monthly.add_argument("--user", type=int)
+    span = monthly.add_mutually_exclusive_group()
+    span.add_argument("--months", type=positive_int, default=DEFAULT_MONTHS)
+    span.add_argument("--ytd", action="store_true")
+    monthly.add_argument("--from", dest="first", type=month_arg)
+    monthly.add_argument("--to", dest="last", type=month_arg)
+    monthly.set_defaults(run=run_monthly)
+
+    export = commands.add_parser("export", parents=[common], help="full ledger as CSV")
+    export.add_argument("--store", type=int, required=True)
+    export.add_argument("--from", dest="first", type=date_arg)
+    export.add_argument("--to", dest="last", type=date_arg)
+    export.add_argument("--output", help="file to write (default: standard output)")
+    export.set_defaults(run=run_export)
+    return parser
+
+
+def main(argv=None, out=None):
+    args = build_parser().parse_args(argv)
+    if out is None:
+        out = sys.stdout
+        out.reconfigure(newline='')
+    # Connecting would create a missing file, and a mistyped path would then
+    # be reported as an empty database.
+    if not os.path.isfile(args.db):
+        print(f"storebook: no database at '{args.db}'.", file=sys.stderr)
+        return 1
+    db.DB_PATH = args.db
+
+    conn = db.get_connection()
+    token = CancelToken(args.timeout)
+    token.bind(conn)
+    try:
+        version = current_version(conn)
+        if version < SCHEMA_VERSION:
+            print(f"storebook: database is at schema version {version}, expected {SCHEMA_VERSION}; "
+                  "run migrate_db.py first.", file=sys.stderr)
+            return 1
+        args.run(args, out, token)
+    except (Cancelled, sqlite3.OperationalError) as e:
+        if token.expired:
+            print(f"storebook: gave up after {args.timeout:g} seconds.", file=sys.stderr)
+        else:
+            print(f"storebook: {e}", file=sys.stderr)
+        return 1
+    except (sqlite3.Error, ValueError, OSError) as e:
+        print(f"storebook: {e}", file=sys.stderr)
+        return 1
+    finally:
+        token.unbind()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
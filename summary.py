@@ -0,0 +1,161 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from categories import category_name
+from db import get_connection
+
+SUMMARY_CACHE_SIZE = 64
+STORE_CACHE_SIZE = 1024
+
+_SummaryFields = namedtuple(
+    '_SummaryFields',
+    'income expenses capital assets liabilities asset_categories liability_categories'
+)
+
+
+class StoreSummary(_SummaryFields):
+    # Totals are exact integer paise, as summed by SQLite; money.from_paise
+    # turns them into Decimal rupees for display.
+    __slots__ = ()
+
+    @property
+    def net_profit(self):
+        return self.income - self.expenses
+
+
+_StoreTotalsFields = namedtuple(
+    '_StoreTotalsFields',
+    'store_id store_name income expenses capital assets liabilities'
+)
+
+
+class StoreTotals(_StoreTotalsFields):
+    # One row of the "All Stores" breakdown, totals in paise.
+    __slots__ = ()
+
+    @property
+    def net_profit(self):
+        return self.income - self.expenses
+
+
+class VersionedCache:
+    # Small LRU shared by every window in the process. An entry is only
+    # returned while the ledger version it was computed at is still current.
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version, value):
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+
+_summary_cache = VersionedCache(SUMMARY_CACHE_SIZE)
+# Per-store totals behind every summary; large enough to hold each store of
+# a big franchise.
+_store_cache = VersionedCache(STORE_CACHE_SIZE)
+
+
+def store_filter(store_id, user_id=None):
+    # store_id 0 stands for "All Stores" of the logged-in user. The subquery
+    # is one bound statement whatever the number of stores; SQLite answers it
+    # from idx_stores_user and then seeks each store in the index of the
+    # table being filtered.
+    if store_id == 0:
+        return "store_id IN (SELECT id FROM stores WHERE user_id = ?)", (user_id,)
+    return "store_id = ?", (store_id,)
+
+
+def ledger_version(store_id, user_id=None, conn=None):
+    # Changes whenever any entry of the store (or, for "All Stores", of any
+    # of the user's stores) is added, edited or deleted.
+    if conn is None:
+        conn = get_connection()
+    where, params = store_filter(store_id, user_id)
+    return conn.execute(f"SELECT COUNT(*), TOTAL(version) FROM ledger_versions WHERE {where}", params).fetchone()
+
+
+def _store_versions(conn, store_id, user_id):
+    # [(store_id, store_name, version)] of the store, or of each of the
+    # user's stores in id order; a store without entries is at version 0.
+    where = "s.user_id = ?" if store_id == 0 else "s.id = ?"
+    return conn.execute(
+        "SELECT s.id, s.store_name, COALESCE(v.version, 0) FROM stores s "
+        f"LEFT JOIN ledger_versions v ON v.store_id = s.id WHERE {where} ORDER BY s.id",
+        (user_id if store_id == 0 else store_id,)).fetchall()
+
+
+def _store_totals(conn, store_id, version):
+    # {(module, category_id): paise} of one store, from its own rollup rows,
+    # kept until the store's version moves on. "All Stores" therefore only
+    # re-reads the stores that changed since it was last shown.
+    totals = _store_cache.get(store_id, version)
+    if totals is None:
+        totals = {(module, category): total or 0 for module, category, total in conn.execute(
+            "SELECT module, category_id, SUM(total) FROM ledger_rollup WHERE store_id = ? "
+            "GROUP BY module, category_id", (store_id,))}
+        _store_cache.put(store_id, version, totals)
+    return totals
+
+
+def load_summary(store_id, user_id=None, conn=None):
+    # Module totals and the asset/liability category breakdowns, added up
+    # from the per-store totals.
+    if conn is None:
+        conn = get_connection()
+    key = (store_id, user_id)
+    version = ledger_version(store_id, user_id, conn)
+    summary = _summary_cache.get(key, version)
+    if summary is not None:
+        return summary
+
+    combined = {}
+    for sid, _, store_version in _store_versions(conn, store_id, user_id):
+        for group, total in _store_totals(conn, sid, store_version).items():
+            combined[group] = combined.get(group, 0) + total
+
+    totals = {}
+    categories = {"assets": [], "liabilities": []}
+    for (module, category), total in sorted(combined.items()):
+        totals[module] = totals.get(module, 0) + total
+        if module in categories:
+            categories[module].append((category_name(category) or "", total))
+
+    summary = StoreSummary(
+        income=totals.get("income", 0),
+        expenses=totals.get("expenses", 0),
+        capital=totals.get("capital", 0),
+        assets=totals.get("assets", 0),
+        liabilities=totals.get("liabilities", 0),
+        asset_categories=tuple(categories["assets"]),
+        liability_categories=tuple(categories["liabilities"]),
+    )
+    _summary_cache.put(key, version, summary)
+    return summary
+
+
+def store_breakdown(user_id, conn=None):
+    # One StoreTotals per store of the user, in store id order, from the same
+    # per-store totals; stores without entries are listed with zeros.
+    if conn is None:
+        conn = get_connection()
+    rows = []
+    for store_id, store_name, version in _store_versions(conn, 0, user_id):
+        totals = {}
+        for (module, _), total in _store_totals(conn, store_id, version).items():
+            totals[module] = totals.get(module, 0) + total
+        rows.append(StoreTotals(store_id, store_name or "", totals.get("income", 0), totals.get("expenses", 0),
+                                totals.get("capital", 0), totals.get("assets", 0), totals.get("liabilities", 0)))
+    return tuple(rows)
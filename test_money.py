@@ -0,0 +1,31 @@
+import unittest
+from decimal import Decimal
+
+from money import MAX_PAISE, parse_money, to_paise
+
+
+class MoneyRangeTest(unittest.TestCase):
+    def test_amount_beyond_decimal_context_is_invalid(self):
+        for text in ('1e30', '9' * 29):
+            with self.assertRaises(ValueError):
+                parse_money(text)
+            with self.assertRaises(ValueError):
+                to_paise(text)
+
+    def test_amount_beyond_integer_column_is_invalid(self):
+        with self.assertRaises(ValueError):
+            parse_money('99999999999999999999')
+        with self.assertRaises(ValueError):
+            to_paise('99999999999999999999')
+        with self.assertRaises(ValueError):
+            to_paise(Decimal(MAX_PAISE + 1).scaleb(-2))
+
+    def test_largest_amount_is_accepted(self):
+        largest = Decimal(MAX_PAISE).scaleb(-2)
+        self.assertEqual(to_paise(largest), MAX_PAISE)
+        self.assertEqual(to_paise(-largest), -MAX_PAISE)
+        self.assertEqual(parse_money('₹1,234.565'), Decimal('1234.57'))
+
+
+if __name__ == '__main__':
+    unittest.main()
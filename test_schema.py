@@ -0,0 +1,88 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import db
+import schema
+
+# The ledger tables as the original create_db.py made them, NOT NULL columns
+# and REAL amounts included.
+BASELINE_TABLES = [
+    """CREATE TABLE users (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT UNIQUE, password TEXT)""",
+    """CREATE TABLE stores (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, store_name TEXT,
+           FOREIGN KEY(user_id) REFERENCES users(id))""",
+    """CREATE TABLE store_details (id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL,
+           storename TEXT NOT NULL, storetype TEXT NOT NULL, ownername TEXT NOT NULL)""",
+    """CREATE TABLE capital (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, amount REAL NOT NULL,
+           description TEXT, store_id INTEGER, FOREIGN KEY(store_id) REFERENCES stores(id))""",
+    """CREATE TABLE income (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, amount REAL NOT NULL,
+           category TEXT, store_id INTEGER, FOREIGN KEY(store_id) REFERENCES stores(id))""",
+    """CREATE TABLE expenses (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, amount REAL NOT NULL,
+           category TEXT, store_id INTEGER, FOREIGN KEY(store_id) REFERENCES stores(id))""",
+    """CREATE TABLE assets (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, asset_name TEXT NOT NULL,
+           value REAL NOT NULL, category TEXT, store_id INTEGER, FOREIGN KEY(store_id) REFERENCES stores(id))""",
+    """CREATE TABLE liabilities (id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL,
+           liability_name TEXT NOT NULL, amount REAL NOT NULL, category TEXT, store_id INTEGER,
+           FOREIGN KEY(store_id) REFERENCES stores(id))""",
+]
+
+
+class BaselineMigrationTest(unittest.TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(handle)
+        baseline = sqlite3.connect(self.path)
+        for statement in BASELINE_TABLES:
+            baseline.execute(statement)
+        baseline.execute("INSERT INTO stores (user_id, store_name) VALUES (1, 'Main')")
+        self.baseline = baseline
+        self.saved_path = db.DB_PATH
+        db.DB_PATH = self.path
+
+    def tearDown(self):
+        self.baseline.close()
+        db.close_all_connections()
+        db.DB_PATH = self.saved_path
+        schema._schema_ready = False
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
+
+    def add_income(self, date, amount):
+        self.baseline.execute("INSERT INTO income (date, amount, category, store_id) VALUES (?, ?, 'Sales', 1)",
+                              (date, amount))
+        self.baseline.commit()
+
+    def migrate(self):
+        conn = db.get_connection()
+        schema.migrate(conn)
+        self.assertEqual(schema.current_version(conn), schema.SCHEMA_VERSION)
+        return conn
+
+    def test_unreadable_date_is_cleared_and_kept(self):
+        self.add_income('not a date', 5)
+        self.add_income('05/03/2024', 7)
+        self.add_income('2024-03-06', 9.5)
+        conn = self.migrate()
+        self.assertEqual(conn.execute("SELECT id, date, amount FROM income ORDER BY id").fetchall(),
+                         [(1, None, 500), (2, '2024-03-05', 700), (3, '2024-03-06', 950)])
+        self.assertEqual(conn.execute("SELECT module, id, date FROM rejected_dates").fetchall(),
+                         [('income', 1, 'not a date')])
+
+    def test_unreadable_amount_is_cleared_and_kept(self):
+        self.add_income('2024-03-05', 'abc')
+        self.add_income('2024-03-06', '1,200.50')
+        self.baseline.execute("INSERT INTO assets (date, asset_name, value, category, store_id) "
+                              "VALUES ('2024-03-07', 'Van', 'lots', 'Vehicle', 1)")
+        self.baseline.commit()
+        conn = self.migrate()
+        self.assertEqual(conn.execute("SELECT id, amount FROM income ORDER BY id").fetchall(),
+                         [(1, None), (2, 120050)])
+        self.assertEqual(conn.execute("SELECT value FROM assets").fetchall(), [(None,)])
+        self.assertEqual(conn.execute("SELECT module, id, amount FROM rejected_amounts ORDER BY module").fetchall(),
+                         [('assets', 1, 'lots'), ('income', 1, 'abc')])
+
+
+if __name__ == '__main__':
+    unittest.main()
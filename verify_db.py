@@ -1,97 +1,102 @@
+import pathlib
 import sqlite3
+import sys
 
-try:
-    conn = sqlite3.connect('database.db')
-    c = conn.cursor()
+import db
+from schema import LEDGER_TABLES, SCHEMA_VERSION, TABLES, current_version
 
-    # Check and create stores table
-    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='stores'")
-    if not c.fetchone():
-        print("Stores table missing. Creating now...")
-        c.execute("""
-        CREATE TABLE stores (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            store_name TEXT,
-            FOREIGN KEY(user_id) REFERENCES users(id)
-        )
-        """)
-    else:
-        print("Stores table exists.")
+# The queries the windows and the CLI run on every refresh, as they issue
+# them. Each one must be answered by an index search, never a table scan or a
+# temp b-tree.
+HOT_QUERIES = [
+    # summary.ledger_version, for one store and for "All Stores"
+    ("SELECT COUNT(*), TOTAL(version) FROM ledger_versions WHERE store_id = ?", (1,)),
+    ("SELECT COUNT(*), TOTAL(version) FROM ledger_versions WHERE store_id IN (SELECT id FROM stores WHERE user_id = ?)",
+     (1,)),
+    # summary._store_versions and summary._store_totals
+    ("SELECT s.id, s.store_name, COALESCE(v.version, 0) FROM stores s "
+     "LEFT JOIN ledger_versions v ON v.store_id = s.id WHERE s.id = ? ORDER BY s.id", (1,)),
+    ("SELECT s.id, s.store_name, COALESCE(v.version, 0) FROM stores s "
+     "LEFT JOIN ledger_versions v ON v.store_id = s.id WHERE s.user_id = ? ORDER BY s.id", (1,)),
+    ("SELECT module, category_id, SUM(total) FROM ledger_rollup WHERE store_id = ? GROUP BY module, category_id", (1,)),
+    # reports.monthly_series and reports.list_stores
+    ("SELECT period, module, SUM(total) FROM ledger_rollup WHERE store_id = ? AND module IN ('income', 'expenses') "
+     "AND period >= ? AND period <= ? GROUP BY period, module", (1, 202401, 202406)),
+    ("SELECT id, store_name, user_id FROM stores WHERE user_id = ? ORDER BY id", (1,)),
+    # dashboard store title
+    ("SELECT store_name FROM stores WHERE id=?", (1,)),
+    # journal.journal_page: first and later pages
+    ("SELECT date, id, module, value, label FROM ledger_journal WHERE store_id = ? "
+     "ORDER BY date DESC, id DESC, module DESC LIMIT ?", (1, 3)),
+    ("SELECT date, id, module, value, label FROM ledger_journal WHERE store_id = ? AND (date, id, module) < (?, ?, ?) "
+     "ORDER BY date DESC, id DESC, module DESC LIMIT ?", (1, "2024-01-01", 5, "income", 25)),
+    # records_model.fetch_page, sorted by date: first and later pages
+    ("SELECT id, date, amount, category_id FROM expenses WHERE store_id = ? "
+     "ORDER BY day_number DESC, id DESC LIMIT ?", (1, 200)),
+    ("SELECT id, date, amount, category_id FROM expenses WHERE store_id = ? AND ((day_number, id) < (?, ?) "
+     "OR day_number IS NULL) ORDER BY day_number DESC, id DESC LIMIT ?", (1, 19904, 500, 200)),
+    # export.write_financial_report
+    ("SELECT COUNT(*) FROM income WHERE store_id = ? AND day_number >= ? AND day_number <= ?", (1, 19723, 19904)),
+    ("SELECT date, amount, description FROM income WHERE store_id = ? AND day_number >= ? AND day_number <= ? "
+     "ORDER BY day_number, id", (1, 19723, 19904)),
+    # importer.import_csv duplicate check
+    ("SELECT COUNT(*) FROM income WHERE store_id = ? AND content_hash = ?", (1, b"\0" * 16)),
+]
 
-    # Check and create financial tables if missing
-    financial_tables = {
-        'income': """
-        CREATE TABLE IF NOT EXISTS income (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            amount REAL NOT NULL,
-            description TEXT,
-            store_id INTEGER,
-            FOREIGN KEY(store_id) REFERENCES stores(id)
-        )
-        """,
-        'expenses': """
-        CREATE TABLE IF NOT EXISTS expenses (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            amount REAL NOT NULL,
-            category TEXT,
-            store_id INTEGER,
-            FOREIGN KEY(store_id) REFERENCES stores(id)
-        )
-        """,
-        'capital': """
-        CREATE TABLE IF NOT EXISTS capital (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            amount REAL NOT NULL,
-            description TEXT,
-            store_id INTEGER,
-            FOREIGN KEY(store_id) REFERENCES stores(id)
-        )
-        """,
-        'assets': """
-        CREATE TABLE IF NOT EXISTS assets (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            asset_name TEXT NOT NULL,
-            value REAL NOT NULL,
-            store_id INTEGER,
-            FOREIGN KEY(store_id) REFERENCES stores(id)
-        )
-        """,
-        'liabilities': """
-        CREATE TABLE IF NOT EXISTS liabilities (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            date TEXT NOT NULL,
-            liability_name TEXT NOT NULL,
-            amount REAL NOT NULL,
-            store_id INTEGER,
-            FOREIGN KEY(store_id) REFERENCES stores(id)
-        )
-        """
-    }
 
-    for table, sql in financial_tables.items():
-        c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
-        if not c.fetchone():
-            print(f"{table} table missing. Creating now...")
-            c.execute(sql)
+def query_plan(conn, sql, params=()):
+    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def plan_uses_index(plan):
+    for step in plan:
+        if "TEMP B-TREE" in step:
+            return False
+        if step.startswith("SCAN") and "INDEX" not in step:
+            return False
+    return any("USING" in step and ("INDEX" in step or "PRIMARY KEY" in step) for step in plan)
+
+
+def verify_query_plans(conn):
+    ok = True
+    for sql, params in HOT_QUERIES:
+        plan = query_plan(conn, sql, params)
+        if plan_uses_index(plan):
+            print(f"OK    {sql}\n      {' / '.join(plan)}")
         else:
-            print(f"{table} table exists.")
+            ok = False
+            print(f"SLOW  {sql}\n      {' / '.join(plan)}")
+    return ok
+
 
-    # Add store_id column to financial tables if not present
-    for table in financial_tables.keys():
-        c.execute(f"PRAGMA table_info({table})")
-        columns = {row[1] for row in c.fetchall()}
-        if 'store_id' not in columns:
-            print(f"Adding store_id to {table}...")
-            c.execute(f"ALTER TABLE {table} ADD COLUMN store_id INTEGER")
+def open_readonly(path):
+    # Inspecting a database must not change it, so it is opened read-only
+    # rather than through the pool, which enables WAL on open.
+    return sqlite3.connect(f"{pathlib.Path(path).absolute().as_uri()}?mode=ro", uri=True)
 
-    conn.commit()
-    print("Database schema verified and repaired successfully.")
-except sqlite3.Error as e:
-    print(f"Database error: {e}")
-finally:
-    conn.close()
\ No newline at end of file
+
+if __name__ == '__main__':
+    path = sys.argv[1] if len(sys.argv) > 1 else db.DB_PATH
+    try:
+        conn = open_readonly(path)
+        version = current_version(conn)
+        print(f"Schema version {version} (latest: {SCHEMA_VERSION})")
+        if version != SCHEMA_VERSION:
+            print("Run migrate_db.py first; only an up-to-date database can be verified.")
+            sys.exit(1)
+
+        for table in TABLES:
+            c = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (table,))
+            print(f"{table} table exists." if c.fetchone() else f"Warning: {table} table is missing.")
+        for table in LEDGER_TABLES:
+            indexes = [row[1] for row in conn.execute(f"PRAGMA index_list({table})")]
+            print(f"{table} indexes: {', '.join(sorted(indexes)) or 'none'}")
+
+        if verify_query_plans(conn):
+            print("Database schema verified; all hot queries use an index.")
+        else:
+            print("Database schema verified, but some hot queries do not use an index.")
+            sys.exit(1)
+    except sqlite3.Error as e:
+        print(f"Database error: {e}")
+        sys.exit(1)
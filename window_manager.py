@@ -0,0 +1,74 @@
+import functools
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QEvent, QObject, pyqtSignal
+
+import startup
+
+
+class WindowManager(QObject):
+    # Builds each module window once per store and shows the same instance
+    # every time it is opened again, calling its reset() method (when it has
+    # one) if it had been closed in the meantime. Closed windows are hidden,
+    # not destroyed, so window_closed stands in for the destroyed signal the
+    # dashboard used to refresh on.
+    window_closed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._windows = {}
+        self._keys = {}
+
+    def show(self, name, window_class, store_id):
+        key = (name, store_id)
+        window = self._windows.get(key)
+        if window is None:
+            window = window_class(store_id=store_id)
+            window.installEventFilter(self)
+            window.destroyed.connect(functools.partial(self._forget, key))
+            self._windows[key] = window
+            self._keys[window] = key
+        elif not window.isVisible() and hasattr(window, 'reset'):
+            window.reset()
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        startup.note(f"Windows: {self.managed_count()} managed, {self.live_widget_count()} live widgets")
+        return window
+
+    def close_all(self):
+        # Used on logout: the next user starts with no windows kept around.
+        windows = list(self._windows.values())
+        self._windows.clear()
+        self._keys.clear()
+        for window in windows:
+            window.removeEventFilter(self)
+            window.close()
+            window.deleteLater()
+
+    def managed_count(self):
+        return len(self._windows)
+
+    @staticmethod
+    def live_widget_count():
+        return len(QApplication.allWidgets())
+
+    def _forget(self, key, *_):
+        window = self._windows.pop(key, None)
+        if window is not None:
+            self._keys.pop(window, None)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Close and obj in self._keys:
+            self.window_closed.emit(self._keys[obj][0])
+        return False
+
+
+_manager = None
+
+
+def get_window_manager():
+    global _manager
+    if _manager is None:
+        _manager = WindowManager()
+    return _manager
@@ -0,0 +1,137 @@
+import functools
+import sqlite3
+import traceback
+
+from PyQt5.QtCore import QEvent, QObject, QRunnable, QThreadPool, pyqtSignal, pyqtSlot
+
+from cancel import Cancelled, CancelToken
+from db import get_connection
+
+
+class WorkerSignals(QObject):
+    finished = pyqtSignal(int, object)  # generation, result
+    failed = pyqtSignal(int, str)  # generation, error message
+    progress = pyqtSignal(int, int, int)  # generation, done, total
+
+
+class Worker(QRunnable):
+    def __init__(self, generation, fn, *args, timeout=None, **kwargs):
+        super().__init__()
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.token = CancelToken(timeout)
+        self.signals = WorkerSignals()
+        self.token.on_progress = functools.partial(self.signals.progress.emit, generation)
+
+    def cancel(self):
+        self.token.cancel()
+
+    def timeout_message(self):
+        return f"The operation took longer than {self.token.timeout:g} seconds and was stopped."
+
+    def run(self):
+        self.token.bind(get_connection())
+        try:
+            result = self.fn(*self.args, token=self.token, **self.kwargs)
+        except Cancelled:
+            if not self.token.cancelled:
+                self.signals.failed.emit(self.generation, self.timeout_message())
+            return
+        except sqlite3.OperationalError as e:
+            if not self.token.cancelled:
+                message = self.timeout_message() if self.token.expired else str(e)
+                self.signals.failed.emit(self.generation, message)
+            return
+        except Exception as e:
+            print(f"Worker error - Stack trace: {traceback.format_exc()}")
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        finally:
+            self.token.unbind()
+        if not self.token.cancelled:
+            self.signals.finished.emit(self.generation, result)
+
+
+def start_worker(worker):
+    QThreadPool.globalInstance().start(worker)
+    return worker
+
+
+def _cancel_all(workers, *_):
+    for worker in workers:
+        worker.cancel()
+    workers.clear()
+
+
+class TaskRunner(QObject):
+    # Runs one background job at a time on behalf of a window. Starting a new
+    # job cancels the previous one, and closing or destroying the window
+    # cancels whatever is still running, so no query outlives its window.
+    def __init__(self, owner, progress_bar=None, timeout=None):
+        super().__init__(owner)
+        self.progress_bar = progress_bar
+        self.timeout = timeout
+        self.generation = 0
+        self.on_result = None
+        self.on_error = None
+        self._active = []
+        owner.installEventFilter(self)
+        owner.destroyed.connect(functools.partial(_cancel_all, self._active))
+        if self.progress_bar is not None:
+            self.progress_bar.hide()
+
+    @property
+    def busy(self):
+        return bool(self._active)
+
+    def run(self, fn, *args, on_result, on_error=None, **kwargs):
+        self.cancel()
+        self.generation += 1
+        worker = Worker(self.generation, fn, *args, timeout=self.timeout, **kwargs)
+        worker.signals.finished.connect(self.task_finished)
+        worker.signals.failed.connect(self.task_failed)
+        worker.signals.progress.connect(self.task_progress)
+        self.on_result = on_result
+        self.on_error = on_error
+        self._active.append(worker)
+        if self.progress_bar is not None:
+            self.progress_bar.setRange(0, 0)
+            self.progress_bar.show()
+        return start_worker(worker)
+
+    def cancel(self):
+        _cancel_all(self._active)
+        self.done()
+
+    def done(self):
+        self._active.clear()
+        if self.progress_bar is not None:
+            self.progress_bar.hide()
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Close:
+            self.cancel()
+        return False
+
+    @pyqtSlot(int, object)
+    def task_finished(self, generation, result):
+        if generation != self.generation:
+            return
+        self.done()
+        self.on_result(result)
+
+    @pyqtSlot(int, str)
+    def task_failed(self, generation, error):
+        if generation != self.generation:
+            return
+        self.done()
+        if self.on_error is not None:
+            self.on_error(error)
+
+    @pyqtSlot(int, int, int)
+    def task_progress(self, generation, done, total):
+        if generation == self.generation and self.progress_bar is not None:
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)